@@ -0,0 +1,45 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+'''Library behind the ncc scripts: device connection and capability
+helpers, a WAN connection profile, NETCONF sessions multiplexed over
+one SSH connection, an asyncio session pool for driving many devices
+from one event loop, and coordinated multi-device configuration
+changes.
+
+Names are loaded from their submodules on first use, so importing ncc
+(e.g. for LOGGING_TO_ENABLE) does not pull in ncclient or asyncio.
+'''
+import importlib
+
+_EXPORTS = {
+    'Device': 'ncc.device',
+    'LOGGING_TO_ENABLE': 'ncc.device',
+    'NC_CANDIDATE': 'ncc.device',
+    'NC_NOTIF_1_1': 'ncc.device',
+    'NC_WRITABLE_RUNNING': 'ncc.device',
+    'connect': 'ncc.device',
+    'datastores': 'ncc.device',
+    'enable_logging': 'ncc.device',
+    'has_capability': 'ncc.device',
+    'close_channels': 'ncc.channels',
+    'connect_channels': 'ncc.channels',
+    'open_channel': 'ncc.channels',
+    'Limits': 'ncc.pool',
+    'SessionPool': 'ncc.pool',
+    'Transaction': 'ncc.transaction',
+    'WAN_PROFILE': 'ncc.wan',
+    'connect_wan': 'ncc.wan',
+    'AsyncSession': 'nccutil.aio',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module 'ncc' has no attribute %r" % name)
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
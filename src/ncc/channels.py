@@ -0,0 +1,128 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import paramiko
+from ncclient.manager import Manager
+from ncclient.transport.ssh import SSHSession
+from ncc.device import connect
+
+'''Several NETCONF sessions multiplexed over one SSH connection.
+
+SSH carries any number of channels on one transport, and each channel
+can run its own "netconf" subsystem, i.e. its own NETCONF session with
+its own session-id, locks and RPC stream. Opening a channel costs one
+round trip and the NETCONF hello, instead of a TCP connect, key
+exchange and authentication, and a device counts the connection once
+against its SSH session limits (vty lines on IOS XE).
+
+    managers = connect_channels(device, 4)
+    ...
+    close_channels(managers)
+
+The first manager owns the SSH connection; closing it closes every
+channel on it. Channels are only available with paramiko, not libssh.
+'''
+
+
+class ChannelSession(SSHSession):
+    '''An SSHSession on a new channel of an existing, authenticated
+    paramiko transport. Closing it closes only its channel, unless it
+    is the transport's owner.
+    '''
+
+    def __init__(self, device_handler, transport, host=None, owner=False):
+        SSHSession.__init__(self, device_handler)
+        self._transport = transport
+        self._host = host
+        self._owner = owner
+
+    def open(self, timeout=None):
+        '''Open the channel, start the netconf subsystem and exchange
+        hellos.
+        '''
+        error = None
+        for subname in self._device_handler.get_ssh_subsystem_names():
+            channel = self._transport.open_session()
+            try:
+                channel.invoke_subsystem(subname)
+            except paramiko.SSHException as e:
+                error = e
+                channel.close()
+                continue
+            self._channel = channel
+            self._channel_id = channel.get_id()
+            self._channel_name = '%s-subsystem-%s' % (subname,
+                                                      self._channel_id)
+            channel.set_name(self._channel_name)
+            self._connected = True
+            self._closing.clear()
+            self._post_connect(timeout)
+            self.parser = self._device_handler.get_xml_parser(self)
+            return
+        raise error or paramiko.SSHException('no netconf subsystem')
+
+    def close(self):
+        if self._owner:
+            return SSHSession.close(self)
+        self._closing.set()
+        if self._channel:
+            self._channel.close()
+        if self.is_alive() and self is not threading.current_thread():
+            self.join(10)
+        self._channel = None
+        self._connected = False
+
+
+def open_channel(m, timeout=None):
+    '''Open another NETCONF session on the SSH connection of manager m
+    and return a manager for it, with m's device handler, timeout and
+    raise mode.
+    '''
+    session = m._session
+    if not isinstance(session, SSHSession) or session.transport is None:
+        raise ValueError('channels need a paramiko SSH session')
+    channel_session = ChannelSession(m._device_handler, session.transport,
+                                     host=session._host)
+    channel_session.open(timeout if timeout is not None else m.timeout)
+    channel = Manager(channel_session, m._device_handler,
+                      timeout=m.timeout, raise_mode=m.raise_mode)
+    channel.huge_tree = m.huge_tree
+    return channel
+
+
+def connect_channels(device, count, connect=connect):
+    '''Connect to a device once and open count NETCONF sessions on the
+    connection. Returns the managers; the first owns the connection.
+    '''
+    primary = connect(device)
+    if count <= 1:
+        return [primary]
+    # each channel waits a round trip for its hello, so open them
+    # concurrently
+    with ThreadPoolExecutor(max_workers=count - 1) as executor:
+        futures = [executor.submit(open_channel, primary)
+                   for _ in range(count - 1)]
+    managers = [primary]
+    error = None
+    for f in futures:
+        try:
+            managers.append(f.result())
+        except Exception as e:
+            error = error or e
+    if error is not None:
+        close_channels(managers)
+        raise error
+    return managers
+
+
+def close_channels(managers):
+    '''Close the sessions from connect_channels(), the connection's
+    owner last.
+    '''
+    for m in reversed(managers):
+        try:
+            m.close_session()
+        except Exception:
+            pass
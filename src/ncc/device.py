@@ -0,0 +1,124 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import logging
+
+'''Device connection parameters, plus the connect, capability check and
+logging setup that every script otherwise repeats.
+'''
+
+#
+# Add things people want logged here. Just various netconf things for
+# now. SSH disabled as it is just too much right now.
+#
+LOGGING_TO_ENABLE = [
+    'ncclient.transport.ssh',
+    'ncclient.transport.session',
+    'ncclient.operations.rpc'
+]
+
+#
+# Capability constants
+#
+NC_WRITABLE_RUNNING = 'urn:ietf:params:netconf:capability:writable-running:1.0'
+NC_CANDIDATE = 'urn:ietf:params:netconf:capability:candidate:1.0'
+NC_NOTIF_1_1 = 'urn:ietf:params:netconf:capability:notification:1.1'
+
+
+class Device(object):
+    '''Connection parameters for one device. The name defaults to
+    host:port and is what pools and reports key devices by. With wan
+    set the device is connected with ncc.wan's WAN profile.
+    '''
+
+    def __init__(self, host, port=830, username=None, password=None,
+                 device_type=None, timeout=60, use_libssh=False, name=None,
+                 wan=False):
+        self.host = host
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.device_type = device_type
+        self.timeout = timeout
+        self.use_libssh = use_libssh
+        self.name = name or '%s:%s' % (host, self.port)
+        self.wan = wan
+
+    @classmethod
+    def from_dict(cls, d, defaults=None):
+        '''Build a Device from an inventory entry (see
+        nccutil.collector.load_inventory), with missing values taken
+        from defaults. Unknown keys are ignored.
+        '''
+        params = dict(defaults or {})
+        params.update(d)
+        known = ('host', 'port', 'username', 'password', 'device_type',
+                 'timeout', 'use_libssh', 'name', 'wan')
+        return cls(**dict((k, v) for k, v in params.items() if k in known))
+
+    def __repr__(self):
+        return 'Device(%s)' % self.name
+
+
+def unknown_host_cb(host, fingerprint):
+    return True
+
+
+def connect(device, sock=None):
+    '''Connect to a Device (or an inventory dict) and return the
+    manager. Host keys are not verified. sock, if given, is an already
+    connected socket to run SSH over (paramiko only).
+    '''
+    if isinstance(device, dict):
+        device = Device.from_dict(device)
+    if device.wan:
+        from ncc.wan import connect_wan
+        return connect_wan(device, sock=sock)
+    # ncclient (and paramiko under it) is slow to import, so only load
+    # it when a connection is actually made
+    from ncclient import manager
+    device_params = {}
+    if device.device_type:
+        device_params = {'name': device.device_type}
+    kwargs = {}
+    if device.use_libssh:
+        kwargs['use_libssh'] = True
+    else:
+        kwargs['look_for_keys'] = False
+        if sock is not None:
+            kwargs['sock'] = sock
+    return manager.connect(host=device.host,
+                           port=device.port,
+                           timeout=device.timeout,
+                           username=device.username,
+                           password=device.password,
+                           allow_agent=False,
+                           hostkey_verify=False,
+                           device_params=device_params,
+                           unknown_host_cb=unknown_host_cb,
+                           **kwargs)
+
+
+def has_capability(m, uri):
+    '''True if any server capability contains uri. A substring match,
+    because IOS XE advertises some capabilities with extra whitespace.
+    '''
+    for cap in m.server_capabilities:
+        if uri in cap:
+            return True
+    return False
+
+
+def datastores(m):
+    '''Return (writable_running, candidate) for a session.'''
+    return (NC_WRITABLE_RUNNING in m.server_capabilities,
+            NC_CANDIDATE in m.server_capabilities)
+
+
+def enable_logging(loggers=LOGGING_TO_ENABLE, level=logging.DEBUG):
+    '''Send the given loggers to the console at the given level.'''
+    handler = logging.StreamHandler()
+    for l in loggers:
+        logger = logging.getLogger(l)
+        logger.addHandler(handler)
+        logger.setLevel(level)
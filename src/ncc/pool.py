@@ -0,0 +1,169 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from ncc.channels import close_channels
+from ncc.channels import connect_channels
+from ncc.device import Device
+from ncc.device import connect
+from nccutil.aio import AsyncSession
+
+'''Drive many devices from one asyncio event loop.
+
+A SessionPool holds one AsyncSession per device, connected on first use
+and reconnected if the session has dropped. Limits bound the work:
+
+- max_devices: devices being worked on at once
+- per_device: operations at once against any one device
+- max_connects: connection setups at once; these block in paramiko or
+  libssh, so they run on a thread pool of this size
+- window: RPCs outstanding at once on each session
+- channels: NETCONF sessions per device, multiplexed as channels over
+  one SSH connection (paramiko only); an operation gets the session
+  with the fewest RPCs outstanding, so raise per_device to use them
+
+    async def get_version(s, device):
+        return await s.get(filter=('subtree', VERSION_FILTER))
+
+    pool = SessionPool(Limits(max_devices=200))
+    results = await pool.run(devices, get_version)
+    await pool.close()
+
+Note that ncclient still runs a reader thread per open session, so the
+number of sessions open at once is bounded by threads, not the loop.
+'''
+
+logger = logging.getLogger('ncc.pool')
+
+
+class Limits(object):
+    '''Concurrency limits for a SessionPool.'''
+
+    def __init__(self, max_devices=100, per_device=1, max_connects=16,
+                 window=8, channels=1):
+        self.max_devices = max_devices
+        self.per_device = per_device
+        self.max_connects = max_connects
+        self.window = window
+        self.channels = channels
+
+
+class SessionPool(object):
+    '''Connection pool of AsyncSessions keyed by device name. Devices
+    may be Device objects or inventory dicts. sessions holds each
+    device's first session, channels all of them.
+    '''
+
+    def __init__(self, limits=None, connect=connect):
+        self.limits = limits or Limits()
+        self._connect = connect
+        self.sessions = {}
+        self.channels = {}
+        self.connect_times = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.limits.max_connects,
+            thread_name_prefix='ncc-connect')
+        self._devices = None
+        self._locks = {}
+        self._per_device = {}
+
+    def _device(self, device):
+        if isinstance(device, dict):
+            device = Device.from_dict(device)
+        return device
+
+    def _connected(self, name):
+        group = self.channels.get(name)
+        return group is not None and \
+            all(s.manager.connected for s in group)
+
+    def _least_busy(self, name):
+        return min(self.channels[name], key=lambda s: s.inflight)
+
+    async def session(self, device):
+        '''Return the AsyncSession for a device, connecting first if
+        there is none or the last one has dropped. With several
+        channels, the one with the fewest RPCs outstanding is returned,
+        and all are reconnected if any has dropped.
+        '''
+        device = self._device(device)
+        if self._connected(device.name):
+            return self._least_busy(device.name)
+        lock = self._locks.setdefault(device.name, asyncio.Lock())
+        async with lock:
+            if self._connected(device.name):
+                return self._least_busy(device.name)
+            loop = asyncio.get_running_loop()
+            group = self.channels.get(device.name)
+            if group is not None:
+                logger.warning('%s: session dropped, reconnecting',
+                               device.name)
+                live = [s.manager for s in group if s.manager.connected]
+                if live:
+                    await loop.run_in_executor(self._executor,
+                                               close_channels, live)
+            start = time.perf_counter()
+            if self.limits.channels > 1:
+                managers = await loop.run_in_executor(
+                    self._executor, connect_channels, device,
+                    self.limits.channels, self._connect)
+            else:
+                managers = [await loop.run_in_executor(
+                    self._executor, self._connect, device)]
+            self.connect_times[device.name] = time.perf_counter() - start
+            group = [AsyncSession(m, window=self.limits.window)
+                     for m in managers]
+            self.channels[device.name] = group
+            self.sessions[device.name] = group[0]
+            return self._least_busy(device.name)
+
+    @asynccontextmanager
+    async def device(self, device):
+        '''Async context manager yielding a device's session while
+        holding a device slot and a per-device slot.
+        '''
+        device = self._device(device)
+        if self._devices is None:
+            self._devices = asyncio.Semaphore(self.limits.max_devices)
+        per_device = self._per_device.setdefault(
+            device.name, asyncio.Semaphore(self.limits.per_device))
+        async with self._devices:
+            async with per_device:
+                yield await self.session(device)
+
+    async def run(self, devices, fn):
+        '''Call fn(session, device) for every device, within the
+        limits, and return a dict of device name to result. A device
+        that failed maps to the exception raised.
+        '''
+        devices = [self._device(d) for d in devices]
+
+        async def one(device):
+            async with self.device(device) as s:
+                return await fn(s, device)
+
+        results = await asyncio.gather(*[one(d) for d in devices],
+                                       return_exceptions=True)
+        return dict((d.name, r) for d, r in zip(devices, results))
+
+    async def discard(self, device):
+        '''Close and forget a device's session. The device may also be
+        given by name.
+        '''
+        if not isinstance(device, str):
+            device = self._device(device).name
+        self.sessions.pop(device, None)
+        group = self.channels.pop(device, None)
+        if group is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, close_channels,
+                                       [s.manager for s in group])
+
+    async def close(self):
+        '''Close every session and the connect thread pool.'''
+        await asyncio.gather(*[self.discard(n) for n in list(self.sessions)])
+        self._executor.shutdown(wait=False)
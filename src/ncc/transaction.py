@@ -0,0 +1,347 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import asyncio
+import logging
+import sys
+import time
+from ncc.device import Device
+from ncc.device import datastores
+from ncc.device import has_capability
+
+'''Coordinated configuration change across many devices.
+
+A Transaction runs each phase concurrently on every device and only
+moves on to the next phase when it has succeeded everywhere:
+
+    connect   open (or reuse) the session, detect candidate and
+              writable-running support as ncc.py does
+    lock      lock running, then candidate
+    edit      edit-config each device's edits into the candidate
+    validate  validate the candidate, where :validate is supported
+    commit    commit the candidate
+    unlock    release the locks
+
+If connect, lock, edit or validate fails on any device, the change is
+aborted everywhere: candidates are discarded and locks released, so no
+device is changed. A failure in the commit phase itself cannot be
+undone on devices that already committed, and is reported as partial;
+the devices whose commit failed have their candidate discarded.
+
+Devices with only writable-running cannot stage a change. They are
+rejected unless allow_running is set, in which case they are locked
+with the others and their edits are applied straight to running in the
+commit phase, after every candidate device has validated.
+
+With confirmed set, the commit is an RFC 6241 confirmed commit, which
+the devices revert by themselves unless it is confirmed within
+confirm_timeout seconds. While the change is pending, the verify hook
+runs on every device concurrently (config_present() builds a cheap
+targeted get-config check). Only if every device verifies is the
+commit confirmed; otherwise it is cancelled everywhere, as it is if the
+confirmed commit itself fails on any device. Confirmed commit needs a
+candidate datastore, so allow_running is ignored.
+
+Every phase is timed per device, so report() shows which devices hold
+up the change window, and for a confirmed commit how long each device
+spent in its confirm window.
+'''
+
+logger = logging.getLogger('ncc.transaction')
+
+NC_VALIDATE = 'urn:ietf:params:netconf:capability:validate:1.'
+NC_CONFIRMED_COMMIT = 'urn:ietf:params:netconf:capability:confirmed-commit:1.'
+
+#
+# Devices revert a confirmed commit after 600 seconds unless told
+# otherwise
+#
+DEFAULT_CONFIRM_TIMEOUT = 600
+
+PHASES = ['connect', 'lock', 'edit', 'validate', 'commit', 'verify',
+          'confirm', 'cancel', 'unlock']
+
+
+def config_present(filters, source='running'):
+    '''Return a verify hook for Transaction that gets the config
+    selected by a subtree filter and fails unless something is there.
+    filters is one filter for every device, or a dict of device name to
+    filter.
+    '''
+    async def verify(session, state):
+        if isinstance(filters, dict):
+            f = filters[state.name]
+        else:
+            f = filters
+        reply = await session.get_config(source=source,
+                                         filter=('subtree', f))
+        return len(reply.data) > 0
+
+    return verify
+
+
+class DeviceState(object):
+    '''Progress of one device through a Transaction.'''
+
+    def __init__(self, device, edits):
+        self.device = device
+        self.name = device.name
+        self.edits = edits
+        self.session = None
+        self.candidate = False
+        self.running = False
+        self.validate = False
+        self.locked = []
+        self.edited = False
+        self.committed = False
+        self.window_start = None
+        self.window = None
+        self.timings = {}
+        self.error = None
+        self.failed_phase = None
+
+
+class Transaction(object):
+    '''Apply edits to devices as one change. edits is either a list of
+    edit-config payloads for every device, or a dict of device name to
+    list of payloads.
+
+    For a confirmed commit, set confirmed and optionally confirm_timeout
+    (seconds), persist (a token that lets the commit survive the session
+    and be confirmed or cancelled from another) and verify, an async
+    callable taking (session, state) that returns false or raises if
+    the change did not take effect on that device.
+    '''
+
+    def __init__(self, pool, devices, edits, default_op='merge',
+                 allow_running=False, confirmed=False, confirm_timeout=None,
+                 persist=None, verify=None):
+        self.pool = pool
+        self.default_op = default_op
+        self.confirmed = confirmed
+        self.confirm_timeout = confirm_timeout
+        self.persist = persist
+        self.verify = verify
+        self.allow_running = allow_running and not confirmed
+        self.states = []
+        for device in devices:
+            if isinstance(device, dict):
+                device = Device.from_dict(device)
+            if isinstance(edits, dict):
+                device_edits = edits.get(device.name, [])
+            else:
+                device_edits = edits
+            self.states.append(DeviceState(device, device_edits))
+        self.phase_times = {}
+        self.outcome = None
+        self._sem = None
+
+    async def _phase(self, name, fn, states):
+        '''Run fn(state) concurrently for states, timing each one.
+        Returns the states that failed.
+        '''
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.pool.limits.max_devices)
+
+        async def one(state):
+            async with self._sem:
+                start = time.perf_counter()
+                try:
+                    await fn(state)
+                except Exception as e:
+                    if state.failed_phase is None:
+                        state.error = e
+                        state.failed_phase = name
+                    logger.warning('%s: %s failed: %r', state.name, name, e)
+                finally:
+                    state.timings[name] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one(s) for s in states])
+        self.phase_times[name] = time.perf_counter() - start
+        return [s for s in states if s.failed_phase == name]
+
+    async def _connect(self, state):
+        state.session = await self.pool.session(state.device)
+        m = state.session.manager
+        state.running, state.candidate = datastores(m)
+        state.validate = has_capability(m, NC_VALIDATE)
+        if not state.candidate and not (state.running and
+                                        self.allow_running):
+            raise RuntimeError('no candidate datastore')
+        if self.confirmed and not has_capability(m, NC_CONFIRMED_COMMIT):
+            raise RuntimeError('no confirmed-commit capability')
+
+    async def _lock(self, state):
+        targets = ['running']
+        if state.candidate:
+            targets.append('candidate')
+        for target in targets:
+            await state.session.lock(target=target)
+            state.locked.append(target)
+
+    async def _edit(self, state, target='candidate'):
+        for data in state.edits:
+            # set first, an edit that fails may have been applied in part
+            state.edited = True
+            await state.session.edit_config(
+                data, format='xml', target=target,
+                default_operation=self.default_op)
+
+    async def _validate(self, state):
+        if state.candidate and state.validate:
+            await state.session.validate(source='candidate')
+
+    async def _commit(self, state):
+        if not state.candidate:
+            await self._edit(state, target='running')
+        elif self.confirmed:
+            timeout = None
+            if self.confirm_timeout is not None:
+                timeout = str(self.confirm_timeout)
+            await state.session.commit(confirmed=True, timeout=timeout,
+                                       persist=self.persist)
+            state.window_start = time.perf_counter()
+        else:
+            await state.session.commit()
+        state.committed = True
+
+    async def _verify(self, state):
+        if not await self.verify(state.session, state):
+            raise RuntimeError('verification failed')
+
+    def _close_window(self, state):
+        state.window = time.perf_counter() - state.window_start
+
+    async def _confirm(self, state):
+        timeout = self.confirm_timeout or DEFAULT_CONFIRM_TIMEOUT
+        if time.perf_counter() - state.window_start >= timeout:
+            # the device has already reverted, and a confirming commit
+            # now would commit the candidate unconfirmed
+            self._close_window(state)
+            raise RuntimeError('confirm timeout expired')
+        await state.session.commit(persist_id=self.persist)
+        self._close_window(state)
+
+    async def _cancel(self, state):
+        await state.session.cancel_commit(persist_id=self.persist)
+        self._close_window(state)
+        state.committed = False
+
+    async def _unlock(self, state):
+        for target in reversed(list(state.locked)):
+            await state.session.unlock(target=target)
+            state.locked.remove(target)
+
+    async def _abort(self, state):
+        if state.session is None:
+            return
+        if 'candidate' in state.locked:
+            await state.session.discard_changes()
+        await self._unlock(state)
+
+    def _staged(self):
+        return [s for s in self.states if s.candidate]
+
+    async def run(self):
+        '''Run the phases and return the outcome: 'committed',
+        'aborted', 'rolled-back' (a confirmed commit was cancelled) or
+        'partial'.
+        '''
+        states = self.states
+        steps = [
+            ('connect', self._connect, lambda: states),
+            ('lock', self._lock, lambda: states),
+            ('edit', self._edit, self._staged),
+            ('validate', self._validate, self._staged),
+        ]
+        for name, fn, targets in steps:
+            failed = await self._phase(name, fn, targets())
+            if failed:
+                logger.warning('aborting: %s failed on %d device(s)',
+                               name, len(failed))
+                await self._phase('abort', self._abort, states)
+                self.outcome = 'aborted'
+                return self.outcome
+        if self.confirmed:
+            return await self._run_confirmed()
+        failed = await self._phase('commit', self._commit, states)
+        if failed:
+            # don't leave the change staged for the next user
+            await self._phase('abort', self._abort,
+                              [s for s in failed if s.locked])
+        await self._phase('unlock', self._unlock,
+                          [s for s in states if s.locked])
+        self.outcome = 'partial' if failed else 'committed'
+        return self.outcome
+
+    async def _run_confirmed(self):
+        states = self.states
+        failed = await self._phase('commit', self._commit, states)
+        pending = [s for s in states if s.committed]
+        if not failed and self.verify is not None:
+            failed = await self._phase('verify', self._verify, pending)
+        if failed:
+            logger.warning('cancelling confirmed commit: failed on %d '
+                           'device(s)', len(failed))
+            failed = await self._phase('cancel', self._cancel, pending)
+            await self._phase('abort', self._abort,
+                              [s for s in states if s.locked])
+            self.outcome = 'partial' if failed else 'rolled-back'
+            return self.outcome
+        failed = await self._phase('confirm', self._confirm, pending)
+        await self._phase('unlock', self._unlock,
+                          [s for s in states if s.locked])
+        self.outcome = 'partial' if failed else 'committed'
+        return self.outcome
+
+    def report(self, file=sys.stdout):
+        '''Print per-device, per-phase latency (ms), the wall time of
+        each phase with its slowest device and, for a confirmed commit,
+        the confirm window of each device.
+        '''
+        phases = [p for p in PHASES + ['abort'] if p in self.phase_times]
+        if self.confirmed:
+            phases.append('window')
+        print('%-32s %-9s' % ('Device', 'Status') +
+              ''.join('%10s' % p for p in phases), file=file)
+        for state in self.states:
+            if state.failed_phase:
+                status = 'FAILED'
+            elif state.committed:
+                status = 'committed'
+            elif state.window is not None:
+                status = 'cancelled'
+            else:
+                status = 'unchanged'
+            cells = []
+            for p in phases:
+                if p == 'window' and state.window is not None:
+                    cells.append('%10.1f' % (state.window * 1000))
+                elif p in state.timings:
+                    cells.append('%10.1f' % (state.timings[p] * 1000))
+                else:
+                    cells.append('%10s' % '-')
+            print('%-32s %-9s' % (state.name, status) + ''.join(cells),
+                  file=file)
+        for p in phases:
+            if p == 'window':
+                continue
+            timed = [s for s in self.states if p in s.timings]
+            if not timed:
+                continue
+            slowest = max(timed, key=lambda s: s.timings[p])
+            print('%-9s %8.1f ms wall, slowest %s (%.1f ms)' % (
+                p, self.phase_times[p] * 1000, slowest.name,
+                slowest.timings[p] * 1000), file=file)
+        windows = [s for s in self.states if s.window is not None]
+        if windows:
+            longest = max(windows, key=lambda s: s.window)
+            print('confirm window: longest %s (%.1f ms) of %d s timeout' % (
+                longest.name, longest.window * 1000,
+                self.confirm_timeout or DEFAULT_CONFIRM_TIMEOUT), file=file)
+        for state in self.states:
+            if state.error is not None:
+                print('%s: %s failed: %r' % (
+                    state.name, state.failed_phase, state.error), file=file)
+        print('outcome: %s' % self.outcome, file=file)
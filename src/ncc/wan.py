@@ -0,0 +1,147 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import socket
+import paramiko
+from ncclient import manager
+from ncclient.manager import Manager
+from ncc.channels import ChannelSession
+
+'''Connecting over slow, high latency links.
+
+ncclient builds its paramiko transport with the defaults: no
+compression, 2MB channel windows and 32KB packets. connect_wan()
+builds the transport itself from a profile and runs the NETCONF
+session on it:
+
+- compression: zlib, offered to the device; verbose XML typically
+  shrinks by 10x or more, which matters most on low bandwidth links
+- window_size: channel window, i.e. how much the device may send
+  before waiting for us to acknowledge; it bounds throughput to
+  window / round trip time
+- max_packet_size: largest SSH packet we accept, fewer packets for
+  bulk replies
+- keepalive: seconds idle before an SSH keepalive, and TCP
+  keepalive probes at the same interval where the platform can set
+  it, so NAT and firewall state survives between polls
+- socket_buffer: TCP send and receive buffer sizes
+- nodelay: disable Nagle's algorithm, which otherwise holds back the
+  small messages of the SSH handshake and of RPC requests waiting for
+  delayed ACKs
+
+Devices with wan set (or "wan": true in an inventory) connect this way
+through ncc.connect(). The socket counts the bytes it carries, so
+wire_bytes(m) gives what actually crossed the link, after compression
+and encryption. WAN connections need paramiko, not libssh.
+'''
+
+WAN_PROFILE = {
+    'compression': True,
+    'window_size': 16 * 1024 * 1024,
+    'max_packet_size': 64 * 1024,
+    'keepalive': 30,
+    'socket_buffer': 4 * 1024 * 1024,
+    'nodelay': True,
+}
+
+
+class CountingSocket(object):
+    '''A socket that counts the bytes sent and received through it.'''
+
+    def __init__(self, sock):
+        self._sock = sock
+        self.sent = 0
+        self.received = 0
+
+    def send(self, data):
+        n = self._sock.send(data)
+        self.sent += n
+        return n
+
+    def sendall(self, data):
+        self._sock.sendall(data)
+        self.sent += len(data)
+
+    def recv(self, size):
+        data = self._sock.recv(size)
+        self.received += len(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+def open_socket(host, port, timeout=None, profile=None):
+    '''Connect a CountingSocket to host:port, with the socket options
+    of profile if given.
+    '''
+    sock = socket.create_connection((host, port), timeout)
+    if profile:
+        if profile.get('nodelay'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if profile.get('keepalive'):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # the kernel default is 2 hours idle; TCP_KEEPALIVE is the
+            # idle time on macOS
+            for name in ('TCP_KEEPIDLE', 'TCP_KEEPINTVL', 'TCP_KEEPALIVE'):
+                if hasattr(socket, name):
+                    sock.setsockopt(socket.IPPROTO_TCP,
+                                    getattr(socket, name),
+                                    profile['keepalive'])
+        if profile.get('socket_buffer'):
+            for opt in (socket.SO_SNDBUF, socket.SO_RCVBUF):
+                sock.setsockopt(socket.SOL_SOCKET, opt,
+                                profile['socket_buffer'])
+    return CountingSocket(sock)
+
+
+def connect_wan(device, profile=WAN_PROFILE, sock=None):
+    '''Connect to a Device over a paramiko transport built from profile
+    and return the manager. Host keys are not verified.
+    '''
+    if device.use_libssh:
+        raise ValueError('%s: the WAN profile needs paramiko, not libssh'
+                         % device.name)
+    device_params = {}
+    if device.device_type:
+        device_params = {'name': device.device_type}
+    handler = manager.make_device_handler(device_params)
+    if sock is None:
+        sock = open_socket(device.host, device.port, device.timeout,
+                           profile)
+    transport = paramiko.Transport(
+        sock,
+        default_window_size=profile['window_size'],
+        default_max_packet_size=profile['max_packet_size'])
+    transport.use_compression(profile['compression'])
+    try:
+        transport.start_client(timeout=device.timeout)
+        transport.auth_password(device.username, device.password)
+        if profile.get('keepalive'):
+            transport.set_keepalive(profile['keepalive'])
+        session = ChannelSession(handler, transport, host=device.host,
+                                 owner=True)
+        session.open(device.timeout)
+    except Exception:
+        transport.close()
+        raise
+    return Manager(session, handler)
+
+
+def wire_bytes(m):
+    '''(sent, received) bytes on the wire for a manager connected over
+    a CountingSocket, else None. Channels on one connection share the
+    count.
+    '''
+    transport = getattr(m._session, '_transport', None)
+    sock = getattr(transport, 'sock', None)
+    if isinstance(sock, CountingSocket):
+        return sock.sent, sock.received
+    return None
+
+
+def compression(m):
+    '''The compression negotiated for replies on a manager's session,
+    e.g. "zlib@openssh.com" or "none".'''
+    transport = getattr(m._session, '_transport', None)
+    return getattr(transport, 'remote_compression', None)
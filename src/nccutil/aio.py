@@ -0,0 +1,161 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import asyncio
+from ncclient import manager
+from ncclient.operations import retrieve
+from ncclient.operations import edit
+from ncclient.operations import lock
+from ncclient.operations.errors import TimeoutExpiredError
+from ncclient.operations.rpc import RaiseMode
+from ncclient.operations.rpc import RPCError
+from ncclient.xml_ import NCElement
+from ncclient.xml_ import to_ele
+
+'''asyncio API over an ncclient manager.
+
+ncclient already supports asynchronous RPCs: in async mode a request
+returns as soon as it is sent, and the session thread sets an event on
+the RPC object when the reply arrives. AsyncSession builds each RPC
+object itself and hooks its reply delivery before sending, so the
+reply resolves an asyncio future (via call_soon_threadsafe) rather
+than a thread having to block on the event. Up to window RPCs may be
+outstanding on the session at once; NETCONF servers answer them in
+order, so this pipelines requests over the one SSH channel.
+
+    m = await connect(host=..., username=..., password=...)
+    s = AsyncSession(m, window=8)
+    replies = await asyncio.gather(*[s.get(filter=f) for f in filters])
+'''
+
+
+async def connect(**kwargs):
+    '''manager.connect() run on the default executor.'''
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: manager.connect(**kwargs))
+
+
+class AsyncSession(object):
+    '''Issue RPCs on a connected manager from asyncio, with at most
+    window of them outstanding. Replies and errors are returned and
+    raised as they would be by the synchronous manager methods,
+    following the manager's timeout and raise_mode.
+    '''
+
+    def __init__(self, m, window=8):
+        self.manager = m
+        self.window = window
+        self.inflight = 0
+        self.max_inflight = 0
+        self._sem = None
+
+    def _finish(self, rpc):
+        if rpc.error:
+            raise rpc.error
+        reply = rpc.reply
+        reply.parse()
+        m = self.manager
+        if reply.error is not None and \
+           not m._device_handler.is_rpc_error_exempt(reply.error.message):
+            if m.raise_mode == RaiseMode.ALL or (
+                    m.raise_mode == RaiseMode.ERRORS and
+                    reply.error.severity == 'error'):
+                if len(reply.errors) > 1:
+                    raise RPCError(to_ele(reply._raw), errs=reply.errors)
+                raise reply.error
+        transform = m._device_handler.transform_reply()
+        if transform:
+            return NCElement(reply, transform, huge_tree=m.huge_tree)
+        return reply
+
+    async def rpc(self, cls, *args, **kwargs):
+        '''Send an ncclient operation (e.g. retrieve.Get) and wait for
+        its reply without blocking the event loop.
+        '''
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.window)
+        m = self.manager
+        loop = asyncio.get_running_loop()
+        async with self._sem:
+            op = cls(m._session,
+                     device_handler=m._device_handler,
+                     async_mode=True,
+                     timeout=m.timeout,
+                     raise_mode=m.raise_mode,
+                     huge_tree=m.huge_tree)
+            future = loop.create_future()
+
+            def done():
+                if not future.done():
+                    future.set_result(None)
+
+            # hooked before the request is sent, so no reply is missed
+            deliver_reply = op.deliver_reply
+            deliver_error = op.deliver_error
+
+            def hooked_reply(raw):
+                deliver_reply(raw)
+                loop.call_soon_threadsafe(done)
+
+            def hooked_error(err):
+                deliver_error(err)
+                loop.call_soon_threadsafe(done)
+
+            op.deliver_reply = hooked_reply
+            op.deliver_error = hooked_error
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+            try:
+                # in async mode this only queues the request
+                op.request(*args, **kwargs)
+                try:
+                    await asyncio.wait_for(future, m.timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutExpiredError(
+                        'ncclient timed out while waiting for an rpc reply.')
+            finally:
+                self.inflight -= 1
+            return self._finish(op)
+
+    async def get(self, filter=None, with_defaults=None):
+        return await self.rpc(retrieve.Get, filter=filter,
+                              with_defaults=with_defaults)
+
+    async def get_config(self, source='running', filter=None,
+                         with_defaults=None):
+        return await self.rpc(retrieve.GetConfig, source, filter=filter,
+                              with_defaults=with_defaults)
+
+    async def edit_config(self, config, format='xml', target='candidate',
+                          default_operation=None, test_option=None,
+                          error_option=None):
+        return await self.rpc(edit.EditConfig, config, format=format,
+                              target=target,
+                              default_operation=default_operation,
+                              test_option=test_option,
+                              error_option=error_option)
+
+    async def commit(self, confirmed=False, timeout=None, persist=None,
+                     persist_id=None):
+        return await self.rpc(edit.Commit, confirmed=confirmed,
+                              timeout=timeout, persist=persist,
+                              persist_id=persist_id)
+
+    async def cancel_commit(self, persist_id=None):
+        return await self.rpc(edit.CancelCommit, persist_id=persist_id)
+
+    async def validate(self, source='candidate'):
+        return await self.rpc(edit.Validate, source=source)
+
+    async def discard_changes(self):
+        return await self.rpc(edit.DiscardChanges)
+
+    async def lock(self, target='candidate'):
+        return await self.rpc(lock.Lock, target=target)
+
+    async def unlock(self, target='candidate'):
+        return await self.rpc(lock.Unlock, target=target)
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.manager.close_session)
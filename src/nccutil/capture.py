@@ -0,0 +1,186 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import os
+import re
+import struct
+import time
+from collections import namedtuple
+from lxml import etree
+
+'''Compact, append-only, segmented capture files for raw
+notifications, so callback modules can be load-tested by replaying
+real device output without a device.
+
+A capture is a directory of segment files named segment-NNNNNN.ncap.
+Each segment starts with a short magic header and holds a sequence of
+records:
+
+    !dqiHI  rx_time, subscription_id, type, len(event_time), len(payload)
+    bytes   event_time (UTF-8)
+    bytes   payload (the raw notification XML)
+
+Records are never rewritten. A new segment is started when the
+current one exceeds the segment size, and reopening an existing
+capture directory always appends a new segment.
+'''
+
+MAGIC = b'NCAP1\n'
+SEGMENT_FMT = 'segment-%06d.ncap'
+SEGMENT_RE = re.compile(r'^segment-(\d{6})\.ncap$')
+RECORD = struct.Struct('!dqiHI')
+
+#
+# default segment size, in bytes
+#
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+
+#
+# subscription id used for RFC 5277 notifications, which have none
+#
+NO_SUBSCRIPTION = -1
+
+CaptureRecord = namedtuple(
+    'CaptureRecord',
+    ['rx_time', 'subscription_id', 'type', 'event_time', 'payload'])
+
+
+def list_segments(path):
+    '''Return the sorted list of segment file paths in a capture
+    directory.
+    '''
+    segments = []
+    if os.path.isdir(path):
+        for entry in os.listdir(path):
+            m = SEGMENT_RE.match(entry)
+            if m:
+                segments.append((int(m.group(1)), os.path.join(path, entry)))
+    return [p for _, p in sorted(segments)]
+
+
+class CaptureWriter(object):
+    '''Append notifications to a capture directory. Writes are buffered
+    and flushed at most every flush_interval seconds, and always on
+    close().
+    '''
+
+    def __init__(self, path, segment_size=DEFAULT_SEGMENT_SIZE,
+                 flush_interval=1.0):
+        self.path = path
+        self.segment_size = segment_size
+        self.flush_interval = flush_interval
+        self.records = 0
+        self.bytes = 0
+        self._f = None
+        self._last_flush = 0.0
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        existing = list_segments(path)
+        if existing:
+            last = SEGMENT_RE.match(os.path.basename(existing[-1]))
+            self._index = int(last.group(1)) + 1
+        else:
+            self._index = 0
+        self._open_segment()
+
+    def _open_segment(self):
+        if self._f:
+            self._f.close()
+        name = os.path.join(self.path, SEGMENT_FMT % self._index)
+        self._index += 1
+        self._f = open(name, 'ab')
+        self._f.write(MAGIC)
+        self._segment_bytes = len(MAGIC)
+
+    def write(self, payload, rx_time=None, subscription_id=NO_SUBSCRIPTION,
+              type=0, event_time=None):
+        '''Append a single raw notification. The payload may be str or
+        bytes; rx_time defaults to now.
+        '''
+        if rx_time is None:
+            rx_time = time.time()
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        et = (event_time or '').encode('utf-8')
+        if subscription_id is None:
+            subscription_id = NO_SUBSCRIPTION
+        if self._segment_bytes >= self.segment_size:
+            self._open_segment()
+        header = RECORD.pack(rx_time, subscription_id, type or 0,
+                             len(et), len(payload))
+        self._f.write(header)
+        self._f.write(et)
+        self._f.write(payload)
+        n = len(header) + len(et) + len(payload)
+        self._segment_bytes += n
+        self.bytes += n
+        self.records += 1
+        if rx_time - self._last_flush >= self.flush_interval:
+            self._f.flush()
+            self._last_flush = rx_time
+
+    def write_notification(self, notif, rx_time=None):
+        '''Append a notification object as handed to a subscription
+        callback (YANG push) or returned by take_notification() (RFC
+        5277).
+        '''
+        if hasattr(notif, 'datastore_xml'):
+            self.write(notif.datastore_xml,
+                       rx_time=rx_time,
+                       subscription_id=notif.subscription_id,
+                       type=notif.type,
+                       event_time=str(notif.event_time))
+        else:
+            self.write(notif.notification_xml, rx_time=rx_time)
+
+    def close(self):
+        if self._f:
+            self._f.close()
+            self._f = None
+
+
+def read_segment(name):
+    '''Generator of CaptureRecord tuples from a single segment file. A
+    truncated trailing record (e.g. from a crash) is silently dropped.
+    '''
+    with open(name, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('%s is not a capture segment' % name)
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            rx_time, sub_id, type, et_len, p_len = RECORD.unpack(header)
+            et = f.read(et_len)
+            payload = f.read(p_len)
+            if len(et) < et_len or len(payload) < p_len:
+                return
+            yield CaptureRecord(rx_time, sub_id, type,
+                                et.decode('utf-8'), payload)
+
+
+def read_capture(path):
+    '''Generator of CaptureRecord tuples over every segment of a capture
+    directory, in order.
+    '''
+    for name in list_segments(path):
+        for record in read_segment(name):
+            yield record
+
+
+class ReplayNotification(object):
+    '''Stand-in for the notification objects ncclient hands to
+    callbacks, rebuilt from a CaptureRecord. Both the YANG push
+    (datastore_*) and RFC 5277 (notification_*) attributes are
+    provided; the element is parsed once, up front.
+    '''
+
+    def __init__(self, record):
+        self.rx_time = record.rx_time
+        self.event_time = record.event_time
+        self.subscription_id = record.subscription_id
+        self.type = record.type
+        self.datastore_xml = record.payload.decode('utf-8')
+        self.datastore_ele = etree.fromstring(record.payload)
+        self.notification_xml = self.datastore_xml
+        self.notification_ele = self.datastore_ele
@@ -0,0 +1,345 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import heapq
+import json
+import logging
+import re
+import struct
+import threading
+import time
+from ncclient.manager import Manager
+from ncclient.manager import make_device_handler
+from ncclient.transport.session import Session
+from ncclient.transport.session import SessionListener
+from nccutil.capture import CaptureRecord
+from nccutil.capture import NO_SUBSCRIPTION
+
+'''Record a live NETCONF session to a cassette file and replay it
+without the device.
+
+A CassetteRecorder hooks a connected manager's session and writes
+every message it sends and receives, with the time since recording
+started:
+
+    m = connect(device)
+    recorder = CassetteRecorder(m, 'xe-17.9-get.ncas')
+    ...
+    m.close_session()
+    recorder.close()
+
+replay() returns a manager whose session answers from the cassette
+instead: the hello exchange runs as normal against the recorded
+server capabilities, the Nth request gets the replies recorded for the
+Nth request (with its message-id rewritten), and notifications follow
+the request they came after. Replies are delivered after the recorded
+delay divided by speed, or immediately with a speed of 0:
+
+    m = replay('xe-17.9-get.ncas', speed=0)
+    m.get_config(source='running')
+
+Requests are not checked beyond their operation name; a request whose
+operation differs from the recorded one is logged and counted in the
+session's mismatches. Once the recorded requests run out, requests get
+an rpc-error, or with loop set, the cassette starts over. close-session
+is always answered <ok/>, wherever it comes.
+
+A cassette file starts with a magic header and holds records of:
+
+    !dBI   time since recording started, kind, len(payload)
+    bytes  payload (UTF-8)
+
+where the first record is META (a JSON object) and the second HELLO
+(the server's hello), followed by SENT and RECEIVED messages.
+'''
+
+logger = logging.getLogger('ncc.cassette')
+
+MAGIC = b'NCAS1\n'
+RECORD = struct.Struct('!dBI')
+
+META = 0
+HELLO = 1
+SENT = 2
+RECEIVED = 3
+
+NETCONF_NS = 'urn:ietf:params:xml:ns:netconf:base:1.0'
+
+_message_id_re = re.compile(r'message-id="([^"]*)"')
+_op_re = re.compile(r'<(?:[\w-]+:)?rpc\b[^>]*>\s*<(?:[\w-]+:)?([\w-]+)')
+_hello_re = re.compile(r'^\s*(?:<\?xml[^>]*>\s*)?<(?:[\w-]+:)?hello\b')
+_notification_re = re.compile(r'<(?:[\w-]+:)?notification\b')
+_event_time_re = re.compile(r'<(?:[\w-]+:)?eventTime>([^<]*)<')
+
+#
+# message-ids and operations are found near the start of a message
+#
+_HEAD = 1024
+
+_OK = ('<rpc-reply xmlns="%s" message-id="%%s"><ok/></rpc-reply>'
+       % NETCONF_NS)
+
+_EXHAUSTED = (
+    '<rpc-reply xmlns="%s" message-id="%%s"><rpc-error>'
+    '<error-type>application</error-type>'
+    '<error-tag>operation-failed</error-tag>'
+    '<error-severity>error</error-severity>'
+    '<error-message>cassette has no more recorded requests</error-message>'
+    '</rpc-error></rpc-reply>' % NETCONF_NS)
+
+
+def _server_hello(m):
+    caps = ''.join('<capability>%s</capability>' % c
+                   for c in m.server_capabilities)
+    return ('<hello xmlns="%s"><capabilities>%s</capabilities>'
+            '<session-id>%s</session-id></hello>' % (
+                NETCONF_NS, caps, m.session_id))
+
+
+class _Listener(SessionListener):
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def callback(self, root, raw):
+        self.recorder.write(RECEIVED, raw)
+
+    def errback(self, ex):
+        pass
+
+
+class CassetteRecorder(object):
+    '''Record the messages of a connected manager's session to a
+    cassette file until close(). meta is stored with the cassette,
+    e.g. the device type and software version.
+    '''
+
+    def __init__(self, m, path, meta=None):
+        self.path = path
+        self.records = 0
+        self._session = m._session
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._f = open(path, 'wb')
+        self._f.write(MAGIC)
+        info = {'recorded': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'start_time': time.time(),
+                'session_id': m.session_id}
+        info.update(meta or {})
+        self.write(META, json.dumps(info))
+        self.write(HELLO, _server_hello(m))
+        self._listener = _Listener(self)
+        session = self._session
+        session.add_listener(self._listener)
+
+        # looked up per call, so hooks on the class (e.g. rpc_timing)
+        # still apply
+        def send(message):
+            self.write(SENT, message)
+            return type(session).send(session, message)
+        session.send = send
+
+    def write(self, kind, payload):
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        with self._lock:
+            if self._f is None:
+                return
+            self._f.write(RECORD.pack(time.monotonic() - self._start, kind,
+                                      len(payload)))
+            self._f.write(payload)
+            # flushed every message, so a poller stopped with ^C still
+            # leaves a complete cassette
+            self._f.flush()
+            self.records += 1
+
+    def close(self):
+        self._session.remove_listener(self._listener)
+        self._session.__dict__.pop('send', None)
+        with self._lock:
+            if self._f:
+                self._f.close()
+                self._f = None
+
+
+def read_cassette(path):
+    '''Generator of (time, kind, payload) records from a cassette file.
+    A truncated trailing record is silently dropped.
+    '''
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('%s is not a cassette' % path)
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            t, kind, size = RECORD.unpack(header)
+            payload = f.read(size)
+            if len(payload) < size:
+                return
+            yield t, kind, payload.decode('utf-8')
+
+
+def cassette_notifications(path):
+    '''Generator of CaptureRecords for the notifications in a cassette,
+    so they can be replayed into callback modules like a capture.
+    '''
+    start = None
+    for t, kind, payload in read_cassette(path):
+        if kind == META:
+            start = json.loads(payload).get('start_time')
+        if kind != RECEIVED or not _notification_re.search(payload,
+                                                            0, _HEAD):
+            continue
+        m = _event_time_re.search(payload)
+        yield CaptureRecord((start or 0.0) + t, NO_SUBSCRIPTION, 0,
+                            m.group(1) if m else '',
+                            payload.encode('utf-8'))
+
+
+class Cassette(object):
+    '''A cassette loaded for replay: the requests in order, and what was
+    received after each.
+    '''
+
+    def __init__(self, path):
+        self.meta = {}
+        self.hello = None
+        self.requests = []
+        #
+        # received messages keyed by the index of the request they
+        # answer or followed (-1 for before the first request), as
+        # (delay after that request, recorded message-id, payload)
+        #
+        self.followups = {}
+        by_id = {}
+        closing = set()
+        for t, kind, payload in read_cassette(path):
+            if kind == META:
+                self.meta = json.loads(payload)
+            elif kind == HELLO:
+                self.hello = payload
+            elif kind == SENT:
+                m = _message_id_re.search(payload, 0, _HEAD)
+                op = _op_re.search(payload, 0, _HEAD)
+                op = op.group(1) if op else None
+                if op == 'close-session':
+                    # answered by the replaying session itself
+                    if m:
+                        closing.add(m.group(1))
+                    continue
+                if m:
+                    by_id[m.group(1)] = len(self.requests)
+                self.requests.append((t, op))
+            elif kind == RECEIVED:
+                m = _message_id_re.search(payload, 0, _HEAD)
+                message_id = m.group(1) if m else None
+                if message_id in closing:
+                    continue
+                if message_id in by_id:
+                    i = by_id[message_id]
+                else:
+                    i = len(self.requests) - 1
+                    message_id = None
+                sent = self.requests[i][0] if i >= 0 else 0.0
+                self.followups.setdefault(i, []).append(
+                    (t - sent, message_id, payload))
+        if self.hello is None:
+            raise ValueError('%s has no server hello' % path)
+
+
+class CassetteSession(Session):
+    '''An ncclient session that replays a Cassette.'''
+
+    def __init__(self, device_handler, cassette, speed=1.0, loop=False):
+        Session.__init__(self, device_handler.get_capabilities())
+        self._device_handler = device_handler
+        self.cassette = cassette
+        self.speed = speed
+        self.loop = loop
+        self.mismatches = 0
+        self._next = 0
+        self._heap = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._stop = False
+
+    def connect(self, timeout=60):
+        self._connected = True
+        self._post_connect(timeout)
+        self._schedule(-1, time.monotonic())
+
+    def _push(self, due, raw):
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._heap, (due, self._seq, raw))
+            self._cond.notify()
+
+    def _schedule(self, i, now, message_id=None):
+        for delay, recorded_id, raw in self.cassette.followups.get(i, []):
+            if recorded_id is not None and message_id is not None:
+                raw = raw.replace('message-id="%s"' % recorded_id,
+                                  'message-id="%s"' % message_id, 1)
+            self._push(now + (delay / self.speed if self.speed > 0 else 0),
+                       raw)
+
+    def send(self, message):
+        now = time.monotonic()
+        if _hello_re.match(message):
+            self._push(now, self.cassette.hello)
+            return
+        m = _message_id_re.search(message, 0, _HEAD)
+        message_id = m.group(1) if m else None
+        op = _op_re.search(message, 0, _HEAD)
+        op = op.group(1) if op else None
+        if op == 'close-session':
+            self._push(now, _OK % message_id)
+            return
+        requests = self.cassette.requests
+        if self._next >= len(requests) and self.loop and requests:
+            self._next = 0
+        if self._next >= len(requests):
+            self._push(now, _EXHAUSTED % message_id)
+            return
+        i = self._next
+        self._next += 1
+        if op != requests[i][1]:
+            self.mismatches += 1
+            logger.warning('request %d is %s, cassette has %s', i, op,
+                           requests[i][1])
+        self._schedule(i, now, message_id)
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._stop and (
+                        not self._heap or
+                        self._heap[0][0] > time.monotonic()):
+                    self._cond.wait(
+                        self._heap[0][0] - time.monotonic()
+                        if self._heap else None)
+                if self._stop:
+                    return
+                _, _, raw = heapq.heappop(self._heap)
+            self._dispatch_message(raw)
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        self._connected = False
+
+
+def replay(path, speed=1.0, loop=False, device_type=None, timeout=30):
+    '''Return a manager replaying the cassette at path. A speed of 1 is
+    recorded speed, 0 as fast as possible.
+    '''
+    cassette = Cassette(path)
+    device_params = {}
+    device_type = device_type or cassette.meta.get('device_type')
+    if device_type:
+        device_params = {'name': device_type}
+    handler = make_device_handler(device_params)
+    session = CassetteSession(handler, cassette, speed=speed, loop=loop)
+    session.connect(timeout)
+    return Manager(session, handler, timeout=timeout)
@@ -0,0 +1,241 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import time
+from collections import deque
+from copy import deepcopy
+from lxml import etree
+
+'''Send an oversized edit-config payload as a series of smaller ones.
+
+One edit-config carrying a 100k entry ACL or prefix list can run into
+the device's RPC timeout or memory limits, and ncclient's own handling
+of a payload that size is slower than linear. edit_chunked() splits a
+<config> along its list entries and sends the pieces one after another
+to the candidate, to be committed once afterwards:
+
+    sizer = ChunkSizer(entries=5000, latency=10)
+    edit_chunked(m, config, sizer)
+    m.commit()
+    print(sizer.summary())
+
+Without YANG, list entries are recognised as elements whose tag repeats
+among their siblings; where a repeated element itself holds repeats
+(several ACLs of many rules each) the innermost entries are split.
+Every chunk carries the containers above its entries with their leaves
+(so list keys are kept), while operation attributes on those
+containers and any other content are only sent with the first chunk
+that holds them: a "replace" or "create" of a whole list applies to
+the first chunk, and later chunks merge into it. Likewise with a
+default-operation of replace, each top-level element of the <config>
+carries operation="replace" in the first chunk that holds it, and the
+chunks are sent with merge; otherwise each chunk would replace what the
+chunks before it sent, or a subtree first sent in a later chunk would
+only be merged.
+
+A ChunkSizer bounds chunks by entries and optionally bytes. Given a
+target latency it starts at a tenth of the entry budget and then sizes
+each chunk from the entries per second measured so far, growing at
+most twofold per chunk and shrinking at once after a chunk that took
+longer than the target, so chunks settle at about that latency on the
+device at hand. It also keeps the totals for reporting throughput.
+'''
+
+NETCONF_NS = 'urn:ietf:params:xml:ns:netconf:base:1.0'
+
+#
+# operation attributes, qualified as they should be or not, as in some
+# snippets
+#
+OPERATIONS = ('{%s}operation' % NETCONF_NS, 'operation')
+
+
+class ChunkSizer(object):
+    '''Entries per chunk, within an entry budget and optional byte
+    budget, adapted to take about latency seconds each if given.
+    Totals of what was sent are kept in chunks, sent and seconds.
+    '''
+
+    def __init__(self, entries=1000, max_bytes=None, latency=None,
+                 minimum=1):
+        self.budget = max(minimum, entries)
+        self.max_bytes = max_bytes
+        self.latency = latency
+        self.minimum = minimum
+        self.entries = self.budget
+        if latency:
+            self.entries = max(minimum, self.budget // 10)
+        self.rate = None
+        self.chunks = 0
+        self.sent = 0
+        self.seconds = 0.0
+        self.smallest = None
+        self.largest = None
+
+    def record(self, entries, seconds):
+        '''Account for a chunk, and size the next one.'''
+        self.chunks += 1
+        self.sent += entries
+        self.seconds += seconds
+        self.smallest = min(entries, self.smallest or entries)
+        self.largest = max(entries, self.largest or 0)
+        if not self.latency or entries == 0:
+            return
+        rate = entries / max(seconds, 1e-3)
+        # smoothed, so one fast chunk doesn't double the next
+        self.rate = rate if self.rate is None else (self.rate + rate) / 2
+        size = min(self.budget, self.entries * 2, self.rate * self.latency)
+        if seconds > self.latency:
+            # but a chunk over the target latency never grows the next
+            size = min(size, rate * self.latency)
+        self.entries = int(max(self.minimum, size))
+
+    def summary(self):
+        return ('Chunked edit: %d entries in %d chunks (%d to %d entries '
+                'each) in %.2fs, %.1f entries/s' % (
+                    self.sent, self.chunks, self.smallest or 0,
+                    self.largest or 0, self.seconds,
+                    self.sent / self.seconds if self.seconds else 0.0))
+
+
+class EntrySplitter(object):
+    '''Split a <config> (a string or element) into chunks of its list
+    entries. next_chunk() returns the next chunk as a string with the
+    number of entries in it, or None when all have been returned. With
+    replace, top-level elements without an operation are replaced the
+    first time they are sent.
+    '''
+
+    def __init__(self, config, replace=False):
+        if isinstance(config, str):
+            parser = etree.XMLParser(huge_tree=True, remove_blank_text=True)
+            config = etree.fromstring(config.encode(), parser=parser)
+        self.root = config
+        self.replace = replace
+        # elements holding repeats below them, and per element of a path
+        # down to entries, its other content
+        self._repeats = set()
+        self._fixed = {}
+        self._units = deque()
+        self._started = set()
+        self._done = False
+        self._mark(config)
+        self._collect(config, (config,))
+        self.total = len(self._units)
+
+    @property
+    def remaining(self):
+        return len(self._units)
+
+    def _mark(self, ele):
+        found = False
+        tags = set()
+        for c in ele:
+            if not isinstance(c.tag, str):
+                continue
+            if self._mark(c) or c.tag in tags:
+                found = True
+            tags.add(c.tag)
+        if found:
+            self._repeats.add(ele)
+        return found
+
+    def _collect(self, ele, path):
+        children = [c for c in ele if isinstance(c.tag, str)]
+        seen = {}
+        for c in children:
+            seen[c.tag] = seen.get(c.tag, 0) + 1
+        fixed = []
+        for c in children:
+            if c in self._repeats:
+                self._collect(c, path + (c,))
+            elif seen[c.tag] > 1:
+                self._units.append((path, c))
+            else:
+                fixed.append(c)
+        self._fixed[ele] = fixed
+
+    def _replace(self, attrib):
+        if self.replace and not any(op in attrib for op in OPERATIONS):
+            attrib[OPERATIONS[0]] = 'replace'
+
+    def _copy_path(self, path, copies):
+        parent = None
+        for depth, ele in enumerate(path):
+            if ele in copies:
+                parent = copies[ele]
+                continue
+            first = ele not in self._started
+            self._started.add(ele)
+            attrib = dict(ele.attrib)
+            if not first:
+                for op in OPERATIONS:
+                    attrib.pop(op, None)
+            elif depth == 1:
+                self._replace(attrib)
+            if parent is None:
+                copy = etree.Element(ele.tag, attrib, nsmap=ele.nsmap)
+            else:
+                copy = etree.SubElement(parent, ele.tag, attrib,
+                                        nsmap=ele.nsmap)
+            for c in self._fixed[ele]:
+                is_op = any(c.get(op) for op in OPERATIONS)
+                if len(c) == 0 and not is_op:
+                    # leaves, including list keys, go with every chunk
+                    copy.append(deepcopy(c))
+                elif first:
+                    if ele is self.root:
+                        self._replace(c.attrib)
+                    copy.append(c)
+            copies[ele] = parent = copy
+        return parent
+
+    def next_chunk(self, entries, max_bytes=None):
+        if not self._units:
+            if self._done or self.total:
+                return None
+            # nothing to split
+            self._done = True
+            for c in self.root:
+                if isinstance(c.tag, str):
+                    self._replace(c.attrib)
+            return etree.tostring(self.root).decode(), 0
+        copies = {}
+        count = 0
+        size = 0
+        while self._units and count < max(1, entries):
+            path, unit = self._units[0]
+            if max_bytes:
+                n = len(etree.tostring(unit))
+                if count and size + n > max_bytes:
+                    break
+                size += n
+            self._units.popleft()
+            if len(path) == 1:
+                self._replace(unit.attrib)
+            self._copy_path(path, copies).append(unit)
+            count += 1
+        return etree.tostring(copies[self.root]).decode(), count
+
+
+def edit_chunked(m, config, sizer, target='candidate',
+                 default_operation=None):
+    '''Send config to target as a series of edit-configs sized by
+    sizer, one after another. Committing is left to the caller.
+    '''
+    replace = default_operation == 'replace'
+    splitter = EntrySplitter(config, replace=replace)
+    operation = 'merge' if replace else default_operation
+    while True:
+        # timed from building the chunk to its reply
+        start = time.perf_counter()
+        chunk = splitter.next_chunk(sizer.entries, sizer.max_bytes)
+        if chunk is None:
+            break
+        payload, entries = chunk
+        m.edit_config(payload,
+                      format='xml',
+                      target=target,
+                      default_operation=operation)
+        sizer.record(entries, time.perf_counter() - start)
+    return sizer
@@ -0,0 +1,325 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Full, Empty
+from ncclient.transport.session import SessionListener
+from ncclient.transport.session import NotificationHandler
+from ncclient.transport.notify import Notification
+from ncclient.xml_ import qualify
+from ncc.device import Device
+from ncc.device import connect
+from nccutil.supervisor import SupervisedSession
+
+'''Hold telemetry subscriptions to many devices in a single process and
+feed every notification into one shared callback pipeline.
+
+ncclient already runs a reader thread per session, so notifications
+arrive on those threads; the collector does no more than enqueue them
+(tagged with the device name) and leaves the real work to a small pool
+of pipeline workers calling a regular init/callback/errback module.
+Connection setup runs on a bounded thread pool so hundreds of devices
+can be brought up concurrently. With reconnect enabled, each device is
+a SupervisedSession and one monitor thread schedules reconnects for
+lost sessions on the same pool.
+'''
+
+logger = logging.getLogger('ncc.collector')
+
+NETCONF_NOTIFICATION_NS = 'urn:ietf:params:xml:ns:netconf:notification:1.0'
+
+
+def load_inventory(path, defaults=None):
+    '''Load a device inventory. A file ending in .json holds a list of
+    dicts with keys name, host, port, username, password and
+    device_type; anything missing is taken from defaults. Any other
+    file is read as one "host[:port]" per line, with "#" comments.
+    '''
+    defaults = defaults or {}
+    devices = []
+    with open(path) as f:
+        if path.endswith('.json'):
+            entries = json.load(f)
+        else:
+            entries = []
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                host, _, port = line.partition(':')
+                entry = {'host': host}
+                if port:
+                    entry['port'] = int(port)
+                entries.append(entry)
+    for entry in entries:
+        device = dict(defaults)
+        device.update(entry)
+        device.setdefault('name', '%s:%s' % (device['host'],
+                                             device.get('port', 830)))
+        devices.append(device)
+    return devices
+
+
+def connect_device(device, timeout=60):
+    '''Connect to a single inventory device.'''
+    return connect(Device.from_dict(device, defaults={'timeout': timeout}))
+
+
+class CallbackPipeline(object):
+    '''A bounded queue of (device, notification) pairs drained by a small
+    pool of worker threads that call the selected callback. The
+    device name is made available to the callback as notif.device.
+    When the queue is full, notifications are dropped and counted
+    rather than blocking the ncclient session threads.
+    '''
+
+    def __init__(self, callback, errback=None, workers=1, maxsize=10000):
+        self.callback = callback
+        self.errback = errback
+        self.workers = workers
+        self.dropped = 0
+        self.errors = 0
+        self._q = Queue(maxsize)
+        self._threads = []
+        self._stop = threading.Event()
+
+    @property
+    def depth(self):
+        return self._q.qsize()
+
+    def put(self, device, notif):
+        try:
+            self._q.put_nowait((device, notif))
+            return True
+        except Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                device, notif = self._q.get(timeout=0.5)
+            except Empty:
+                continue
+            try:
+                notif.device = device
+            except AttributeError:
+                pass
+            try:
+                self.callback(notif)
+            except Exception as e:
+                self.errors += 1
+                logger.warning('callback failed for %s: %r', device, e)
+                if self.errback:
+                    self.errback(e)
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, daemon=True,
+                                 name='pipeline-%d' % i)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+
+class DeviceRates(object):
+    '''Per-device notification counters, with rates computed between
+    successive calls to snapshot().
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._last = {}
+        self._last_time = time.monotonic()
+
+    def count(self, device):
+        with self._lock:
+            self._counts[device] = self._counts.get(device, 0) + 1
+
+    def snapshot(self):
+        '''Return a sorted list of (device, total, rate-per-second).'''
+        now = time.monotonic()
+        with self._lock:
+            counts = dict(self._counts)
+        interval = now - self._last_time
+        result = []
+        for device in sorted(counts):
+            delta = counts[device] - self._last.get(device, 0)
+            rate = delta / interval if interval > 0 else 0.0
+            result.append((device, counts[device], rate))
+        self._last = counts
+        self._last_time = now
+        return result
+
+
+class StreamListener(SessionListener):
+    '''Session listener for RFC 5277 event streams that hands each
+    notification straight to a function, instead of leaving it on the
+    session queue for take_notification().
+    '''
+
+    def __init__(self, handler):
+        self._handler = handler
+
+    def callback(self, root, raw):
+        tag, _ = root
+        if tag == qualify('notification', NETCONF_NOTIFICATION_NS):
+            self._handler(Notification(raw))
+
+    def errback(self, ex):
+        pass
+
+
+class Collector(object):
+    '''Subscribe to every device in an inventory and funnel all
+    notifications into a CallbackPipeline. Use either xpaths with a
+    period/dampening period (YANG push, via establish_subscription) or
+    an RFC 5277 stream name (via create_subscription).
+    '''
+
+    def __init__(self, devices, pipeline, xpaths=None, period=None,
+                 dampening_period=None, streamident=None, streamns=None,
+                 stream=None, connect_workers=16, timeout=60,
+                 reconnect=False, max_backoff=60.0):
+        self.devices = devices
+        self.pipeline = pipeline
+        self.xpaths = xpaths or []
+        self.period = period
+        self.dampening_period = dampening_period
+        self.streamident = streamident
+        self.streamns = streamns
+        self.stream = stream
+        self.connect_workers = connect_workers
+        self.timeout = timeout
+        self.reconnect = reconnect
+        self.max_backoff = max_backoff
+        self.rates = DeviceRates()
+        self.sessions = {}
+        self.failed = {}
+        self._pool = None
+        self._pending = {}
+        self._monitor = None
+        self._stop = threading.Event()
+
+    def _handler(self, name, supervised=None):
+        def handle(notif):
+            if supervised:
+                supervised.notified()
+            self.rates.count(name)
+            self.pipeline.put(name, notif)
+        return handle
+
+    def _errback(self, name):
+        def errback(ex):
+            logger.warning('%s: subscription error %r', name, ex)
+        return errback
+
+    def subscribe(self, name, m, supervised=None):
+        '''Create the configured subscriptions on an open session and
+        return the list of subscription ids.
+        '''
+        handler = self._handler(name, supervised)
+        subs = []
+        if self.stream:
+            session = m._session
+            default = session.get_listener_instance(NotificationHandler)
+            if default:
+                session.remove_listener(default)
+            session.add_listener(StreamListener(handler))
+            m.create_subscription(stream_name=self.stream)
+            return [self.stream]
+        for xpath in self.xpaths:
+            s = m.establish_subscription(
+                handler,
+                self._errback(name),
+                xpath=xpath,
+                period=self.period,
+                dampening_period=self.dampening_period,
+                streamident=self.streamident,
+                streamns=self.streamns)
+            if s.subscription_result.endswith('ok'):
+                subs.append(s.subscription_id)
+            else:
+                logger.warning('%s: subscription to %s failed: %s',
+                               name, xpath, s.subscription_result)
+        if supervised and supervised.lost and not subs:
+            raise RuntimeError('No subscriptions re-established')
+        return subs
+
+    def _start_device(self, device):
+        name = device['name']
+        supervised = SupervisedSession(
+            name,
+            lambda: connect_device(device, timeout=self.timeout),
+            lambda m: self.subscribe(name, m, supervised),
+            max_backoff=self.max_backoff)
+        try:
+            supervised.start(retry=self.reconnect)
+        except Exception as e:
+            self.failed[name] = e
+            return
+        self.sessions[name] = supervised
+
+    def _supervise(self):
+        while not self._stop.wait(1.0):
+            for name, supervised in list(self.sessions.items()):
+                pending = self._pending.get(name)
+                if pending is not None and not pending.done():
+                    continue
+                if supervised.lost or not supervised.manager.connected:
+                    self._pending[name] = self._pool.submit(supervised.check)
+
+    def start(self):
+        '''Connect and subscribe to all devices concurrently.'''
+        self.pipeline.start()
+        self._pool = ThreadPoolExecutor(max_workers=self.connect_workers)
+        list(self._pool.map(self._start_device, self.devices))
+        if self.reconnect:
+            self._monitor = threading.Thread(target=self._supervise,
+                                             daemon=True, name='supervisor')
+            self._monitor.start()
+        return len([s for s in self.sessions.values() if not s.lost])
+
+    def report(self, file=sys.stderr):
+        '''Print per-device totals and rates since the last report.'''
+        rates = dict((d, (t, r)) for d, t, r in self.rates.snapshot())
+        print('%-32s %4s %10s %10s %10s %10s' % (
+            'Device', 'Up', 'Total', 'Rate/s', 'Reconnects', 'Gap(s)'),
+              file=file)
+        for name in sorted(self.sessions):
+            st = self.sessions[name].stats()
+            total, rate = rates.get(name, (0, 0.0))
+            gap = st['gap_open'] if st['gap_open'] is not None \
+                else st['last_gap']
+            print('%-32s %4s %10d %10.2f %10d %10s' % (
+                name, 'yes' if st['up'] else 'no', total, rate,
+                st['reconnects'], '%.2f' % gap if gap is not None else '-'),
+                  file=file)
+        up = len([s for s in self.sessions.values() if not s.lost])
+        print('sessions up %d, down %d, failed %d, queue depth %d, '
+              'dropped %d, callback errors %d' % (
+                  up, len(self.sessions) - up, len(self.failed),
+                  self.pipeline.depth, self.pipeline.dropped,
+                  self.pipeline.errors), file=file)
+
+    def close(self):
+        self._stop.set()
+        if self._monitor:
+            self._monitor.join()
+        if self._pool:
+            self._pool.shutdown(wait=False)
+        for name, supervised in self.sessions.items():
+            supervised.close()
+        self.sessions = {}
+        self.pipeline.stop()
@@ -0,0 +1,262 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import hashlib
+import time
+
+'''Change detection between successive poll replies.
+
+Each reply is turned into a keyed index of subtrees: list entries are
+keyed by a key leaf (by default the first of name, id or index found
+among an entry's direct leaves), falling back to position for
+repeated elements without one, or among entries sharing a key value. Repeated leaves (leaf-lists) are kept
+as a sorted tuple of their values, and report added and removed
+values. Every node carries a digest (BLAKE2b) of its leaves and of its
+children's digests, so diffing two indexes skips unchanged subtrees
+without looking inside them, and only added (+), removed (-) or
+changed (~) leaves are reported, with paths like:
+
+    /interfaces/interface[name=GigabitEthernet1]/statistics/in-octets
+
+Run this module directly to benchmark indexing and diffing of large
+interface lists:
+
+    python -m nccutil.delta --entries 10000 --change 1
+'''
+
+DEFAULT_KEYS = ('name', 'id', 'index')
+
+
+class Node(object):
+    __slots__ = ('leaves', 'children', 'digest')
+
+    def __init__(self, leaves, children):
+        self.leaves = leaves
+        self.children = children
+        #
+        # a cryptographic digest rather than hash(), so that subtrees
+        # skipped as unchanged really are
+        #
+        self.digest = hashlib.blake2b(repr((
+            tuple(leaves.items()),
+            tuple((k, c.digest) for k, c in children.items()))).encode(),
+            digest_size=16).digest()
+
+
+def _value_order(value):
+    # empty leaves (None) sort first
+    return (value is not None, value or '')
+
+
+#
+# local names are looked up for every element, and replies repeat the
+# same few tags many times over
+#
+_names = {}
+
+
+def local_name(tag):
+    name = _names.get(tag)
+    if name is None:
+        name = _names[tag] = tag.rpartition('}')[2]
+    return name
+
+
+def build_index(ele, keys=DEFAULT_KEYS):
+    '''Build the index Node for an lxml element.'''
+    leaves = {}
+    children = {}
+    seen = None
+    repeated = None
+    for child in ele:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue
+        name = local_name(tag)
+        if len(child) == 0:
+            if name not in leaves:
+                leaves[name] = child.text
+                continue
+            # a leaf-list
+            if repeated is None:
+                repeated = set()
+            if name not in repeated:
+                repeated.add(name)
+                leaves[name] = [leaves[name]]
+            leaves[name].append(child.text)
+            continue
+        node = build_index(child, keys)
+        key = None
+        for k in keys:
+            if k in node.leaves:
+                key = '%s[%s=%s]' % (name, k, node.leaves[k])
+                break
+        if key is None:
+            if seen is None:
+                seen = {}
+            n = seen.get(name, 0)
+            seen[name] = n + 1
+            key = name if n == 0 else '%s[%d]' % (name, n + 1)
+        elif key in children:
+            # entries sharing a key value (e.g. process names) are told
+            # apart by their position among them
+            if seen is None:
+                seen = {}
+            n = seen.get(key, 1)
+            seen[key] = n + 1
+            key = '%s[%d]' % (key, n + 1)
+        children[key] = node
+    for name in repeated or ():
+        leaves[name] = tuple(sorted(leaves[name], key=_value_order))
+    return Node(leaves, children)
+
+
+def _leaf(op, path, value, changes):
+    if isinstance(value, tuple):
+        for v in value:
+            changes.append((op, path, v))
+    else:
+        changes.append((op, path, value))
+
+
+def _walk(node, path, op, changes):
+    for name, value in node.leaves.items():
+        _leaf(op, '%s/%s' % (path, name), value, changes)
+    for key, child in node.children.items():
+        _walk(child, '%s/%s' % (path, key), op, changes)
+
+
+def diff(old, new, path=''):
+    '''Return a list of (op, path, value) tuples describing how new
+    differs from old. Changed leaves report the new value.
+    '''
+    changes = []
+    if old is None:
+        _walk(new, path, '+', changes)
+        return changes
+    if old.digest == new.digest:
+        return changes
+    for name, value in new.leaves.items():
+        sub = '%s/%s' % (path, name)
+        if name not in old.leaves:
+            _leaf('+', sub, value, changes)
+            continue
+        was = old.leaves[name]
+        if was == value:
+            continue
+        if isinstance(was, tuple) or isinstance(value, tuple):
+            # leaf-list values added and removed
+            was = set(was if isinstance(was, tuple) else (was,))
+            now = set(value if isinstance(value, tuple) else (value,))
+            for v in sorted(now - was, key=_value_order):
+                changes.append(('+', sub, v))
+            for v in sorted(was - now, key=_value_order):
+                changes.append(('-', sub, v))
+        else:
+            changes.append(('~', sub, value))
+    for name, value in old.leaves.items():
+        if name not in new.leaves:
+            _leaf('-', '%s/%s' % (path, name), value, changes)
+    for key, child in new.children.items():
+        sub = '%s/%s' % (path, key)
+        if key in old.children:
+            changes.extend(diff(old.children[key], child, sub))
+        else:
+            _walk(child, sub, '+', changes)
+    for key, child in old.children.items():
+        if key not in new.children:
+            _walk(child, '%s/%s' % (path, key), '-', changes)
+    return changes
+
+
+class DeltaTracker(object):
+    '''Keep the index of the last reply and report changes against it.
+    The first update reports everything as added.
+    '''
+
+    def __init__(self, keys=DEFAULT_KEYS):
+        self.keys = keys
+        self.last = None
+
+    def update(self, ele):
+        index = build_index(ele, self.keys)
+        changes = diff(self.last, index)
+        self.last = index
+        return changes
+
+
+def format_change(change):
+    op, path, value = change
+    return '%s %s = %s' % (op, path, value)
+
+
+if __name__ == '__main__':
+
+    #
+    # local imports
+    #
+    import random
+    from argparse import ArgumentParser
+    from lxml import etree
+
+    parser = ArgumentParser(description='Delta benchmark params:')
+    parser.add_argument('--entries', type=int, default=10000,
+                        help='Number of interfaces in the reply')
+    parser.add_argument('--change', type=float, default=1.0,
+                        help='Percentage of interfaces with changed counters')
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='Number of polls to simulate')
+    args = parser.parse_args()
+
+    ns = 'urn:ietf:params:xml:ns:yang:ietf-interfaces'
+    counters = ['in-octets', 'in-unicast-pkts', 'in-errors',
+                'out-octets', 'out-unicast-pkts', 'out-errors']
+
+    def make_reply(values):
+        data = etree.Element('data')
+        intfs = etree.SubElement(data, '{%s}interfaces-state' % ns)
+        for i, row in enumerate(values):
+            intf = etree.SubElement(intfs, '{%s}interface' % ns)
+            etree.SubElement(intf, '{%s}name' % ns).text = \
+                'GigabitEthernet1/0/%d' % i
+            etree.SubElement(intf, '{%s}oper-status' % ns).text = 'up'
+            stats = etree.SubElement(intf, '{%s}statistics' % ns)
+            for c, v in zip(counters, row):
+                etree.SubElement(stats, '{%s}%s' % (ns, c)).text = str(v)
+        return data
+
+    values = [[0] * len(counters) for _ in range(args.entries)]
+    replies = []
+    for _ in range(args.rounds):
+        for i in random.sample(range(args.entries),
+                               int(args.entries * args.change / 100)):
+            values[i] = [v + random.randint(1, 1000) for v in values[i]]
+        replies.append(make_reply(values))
+
+    full = 0.0
+    for reply in replies:
+        t0 = time.perf_counter()
+        out = etree.tostring(reply, pretty_print=True)
+        full += time.perf_counter() - t0
+    print('Full pretty-print: %.1f ms/poll, %d bytes/poll' % (
+        full / args.rounds * 1000, len(out)))
+
+    tracker = DeltaTracker()
+    t_index = t_diff = 0.0
+    emitted = 0
+    for n, reply in enumerate(replies):
+        t0 = time.perf_counter()
+        index = build_index(reply, tracker.keys)
+        t1 = time.perf_counter()
+        changes = diff(tracker.last, index)
+        t2 = time.perf_counter()
+        tracker.last = index
+        if n > 0:
+            t_index += t1 - t0
+            t_diff += t2 - t1
+            emitted += sum(len(format_change(c)) + 1 for c in changes)
+    polls = max(args.rounds - 1, 1)
+    print('Changes only     : %.1f ms/poll (index %.1f, diff %.1f), '
+          '%d bytes/poll' % (
+              (t_index + t_diff) / polls * 1000, t_index / polls * 1000,
+              t_diff / polls * 1000, emitted // polls))
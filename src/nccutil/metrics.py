@@ -0,0 +1,461 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import threading
+import time
+
+'''Metrics for long-running ncc processes, exposed over HTTP in the
+Prometheus text format (or OpenMetrics, if the scraper asks for it).
+
+Counters, gauges and histograms live in a Registry. Each has a fixed
+set of label names; labels(...) returns the child for one set of label
+values, which is what gets updated. Children are cheap to update (a
+lock and an add), so hot paths should look a child up once and keep
+it. A child can instead be given a function, called at scrape time,
+for values that already exist elsewhere (queue depths, reconnects).
+
+    REGISTRY.counter('ncc_polls_total', 'Polls', ['job'])
+    serve(9464)
+
+The helpers below wire up the usual collector health metrics:
+
+    instrument_rpcs()       ncc_rpc_duration_seconds{rpc}
+                            ncc_rpc_transport_errors_total{rpc}
+    watch_session(m, dev)   ncc_received_bytes_total{device}
+                            ncc_received_messages_total{device,type}
+                            ncc_notification_queue_depth{device}
+    instrument_callback()   ncc_notifications_total{device,subscription}
+                            ncc_callback_duration_seconds{device}
+    watch_supervised(s)     ncc_session_up{device}
+                            ncc_reconnects_total{device}
+                            ncc_notification_gap_seconds_total{device}
+    watch_poller(engine)    ncc_poll_inflight, ncc_poll_waiting
+                            ncc_polls_total{job}
+                            ncc_poll_errors_total{job}
+                            ncc_poll_overruns_total{job}
+                            ncc_poll_cadence_seconds{job}
+
+Notifications per second per subscription is
+rate(ncc_notifications_total[1m]) in PromQL.
+'''
+
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0)
+
+TEXT_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = \
+    'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n') \
+                     .replace('"', r'\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = ['%s="%s"' % (n, _escape(v)) for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append('%s="%s"' % extra)
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join(pairs)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return '%d' % value
+    return repr(value)
+
+
+class _Value(object):
+    '''A counter or gauge child.'''
+
+    def __init__(self):
+        self._value = 0.0
+        self._fn = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+
+    def set_function(self, fn):
+        '''Take the value from fn() at scrape time.'''
+        self._fn = fn
+
+    def get(self):
+        if self._fn is not None:
+            return self._fn()
+        return self._value
+
+
+class _HistogramValue(object):
+    '''A histogram child.'''
+
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * len(buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            for i, bound in enumerate(self._buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+            self._sum += value
+            self._count += 1
+
+    def time(self):
+        '''Context manager observing the duration of its block.'''
+        return _Timer(self)
+
+    def get(self):
+        with self._lock:
+            counts = list(self._counts)
+            return counts, self._sum, self._count
+
+
+class _Timer(object):
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class Metric(object):
+    '''A metric family: a name, help text, label names and a child per
+    set of label values.
+    '''
+
+    type = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        return _Value()
+
+    def labels(self, *values):
+        if len(values) != len(self.label_names):
+            raise ValueError('%s takes labels %s' % (
+                self.name, ', '.join(self.label_names)))
+        values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def remove(self, *values):
+        with self._lock:
+            self._children.pop(tuple(str(v) for v in values), None)
+
+    #
+    # a metric without labels updates its only child directly
+    #
+    def __getattr__(self, name):
+        if name in ('inc', 'dec', 'set', 'set_function', 'observe', 'time'):
+            return getattr(self.labels(), name)
+        raise AttributeError(name)
+
+    def _items(self):
+        with self._lock:
+            return sorted(self._children.items(), key=lambda i: i[0])
+
+    def samples(self):
+        '''Yield (suffix, label values, extra label, value).'''
+        for values, child in self._items():
+            yield '', values, None, child.get()
+
+
+class Counter(Metric):
+    type = 'counter'
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        Metric.__init__(self, name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def samples(self):
+        for values, child in self._items():
+            counts, total, count = child.get()
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                yield '_bucket', values, ('le', _format_value(bound)), \
+                    cumulative
+            yield '_bucket', values, ('le', '+Inf'), count
+            yield '_sum', values, None, total
+            yield '_count', values, None, count
+
+
+class Registry(object):
+    '''A set of metrics, rendered together. The counter, gauge and
+    histogram methods return the existing metric of that name if there
+    is one, so independent code can share a metric.
+    '''
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help, labels, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls) or \
+                    metric.label_names != tuple(labels):
+                raise ValueError('%s already registered differently' % name)
+            return metric
+
+    def counter(self, name, help, labels=()):
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help, labels=()):
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self, openmetrics=False):
+        '''All metrics in the Prometheus text format, or OpenMetrics.'''
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            family = metric.name
+            if openmetrics and metric.type == 'counter' and \
+                    family.endswith('_total'):
+                family = family[:-len('_total')]
+            lines.append('# HELP %s %s' % (family, metric.help))
+            lines.append('# TYPE %s %s' % (family, metric.type))
+            for suffix, values, extra, value in metric.samples():
+                lines.append('%s%s%s %s' % (
+                    metric.name, suffix,
+                    _format_labels(metric.label_names, values, extra),
+                    _format_value(value)))
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def serve(port, addr='127.0.0.1', registry=REGISTRY):
+    '''Serve registry on http://addr:port/metrics from a daemon thread.
+    Returns the server; call shutdown() on it to stop.
+    '''
+    from http.server import BaseHTTPRequestHandler
+    from http.server import ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            openmetrics = 'application/openmetrics-text' in \
+                self.headers.get('Accept', '')
+            body = registry.render(openmetrics=openmetrics).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE
+                             if openmetrics else TEXT_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True,
+                              name='metrics-http')
+    thread.start()
+    return server
+
+
+_instrumented = set()
+
+
+def instrument_rpcs(registry=REGISTRY):
+    '''Time every ncclient RPC, sync or async, from the request being
+    built to the reply (or a transport error) being delivered, by RPC
+    class name. Idempotent per registry.
+    '''
+    if id(registry) in _instrumented:
+        return
+    _instrumented.add(id(registry))
+    from ncclient.operations.rpc import RPC
+
+    duration = registry.histogram('ncc_rpc_duration_seconds',
+                                  'NETCONF RPC latency', ['rpc'])
+    errors = registry.counter('ncc_rpc_transport_errors_total',
+                              'RPCs failed by a transport error', ['rpc'])
+    wrap = RPC._wrap
+    deliver_reply = RPC.deliver_reply
+    deliver_error = RPC.deliver_error
+
+    def timed_wrap(self, subele):
+        self._ncc_metrics_start = time.perf_counter()
+        return wrap(self, subele)
+
+    def timed_deliver_reply(self, raw):
+        start = getattr(self, '_ncc_metrics_start', None)
+        if start is not None:
+            duration.labels(type(self).__name__).observe(
+                time.perf_counter() - start)
+        return deliver_reply(self, raw)
+
+    def counted_deliver_error(self, err):
+        errors.labels(type(self).__name__).inc()
+        return deliver_error(self, err)
+
+    RPC._wrap = timed_wrap
+    RPC.deliver_reply = timed_deliver_reply
+    RPC.deliver_error = counted_deliver_error
+
+
+def _message_listener(received_bytes, messages):
+    # ncclient is only imported by the helpers that need it
+    from ncclient.transport.session import SessionListener
+
+    class MessageListener(SessionListener):
+        '''Count every message a session receives, and its bytes.'''
+
+        def callback(self, root, raw):
+            received_bytes.inc(len(raw))
+            tag = root[0]
+            messages.get(tag.rsplit('}', 1)[-1], messages['other']).inc()
+
+        def errback(self, ex):
+            pass
+
+    return MessageListener()
+
+
+def watch_session(m, device, registry=REGISTRY):
+    '''Count the messages and bytes a manager's session receives and
+    export the depth of its notification queue (the one
+    take_notification() reads). Call again after a reconnect.
+    '''
+    received_bytes = registry.counter(
+        'ncc_received_bytes_total', 'NETCONF message bytes received',
+        ['device']).labels(device)
+    messages = registry.counter(
+        'ncc_received_messages_total', 'NETCONF messages received',
+        ['device', 'type'])
+    by_type = dict((t, messages.labels(device, t))
+                   for t in ('rpc-reply', 'notification', 'other'))
+    m._session.add_listener(_message_listener(received_bytes, by_type))
+    q = getattr(m._session, '_notification_q', None)
+    if q is not None:
+        registry.gauge(
+            'ncc_notification_queue_depth',
+            'Notifications received but not yet taken',
+            ['device']).labels(device).set_function(q.qsize)
+
+
+def instrument_callback(callback, device, subscription=None,
+                        registry=REGISTRY):
+    '''Wrap a notification callback to count notifications and time
+    the callback. Notifications are counted under subscription if
+    given, otherwise under the notification's subscription id, if any.
+    '''
+    notifications = registry.counter(
+        'ncc_notifications_total', 'Notifications received',
+        ['device', 'subscription'])
+    duration = registry.histogram(
+        'ncc_callback_duration_seconds', 'Notification callback duration',
+        ['device']).labels(device)
+    children = {}
+
+    def instrumented_callback(notif):
+        sub = subscription
+        if sub is None:
+            sub = getattr(notif, 'subscription_id', '')
+        child = children.get(sub)
+        if child is None:
+            child = children[sub] = notifications.labels(device, sub)
+        child.inc()
+        start = time.perf_counter()
+        try:
+            return callback(notif)
+        finally:
+            duration.observe(time.perf_counter() - start)
+
+    return instrumented_callback
+
+
+def watch_supervised(session, registry=REGISTRY):
+    '''Export a SupervisedSession's health at scrape time.'''
+    name = session.name
+    registry.gauge('ncc_session_up', 'Session connected and subscribed',
+                   ['device']).labels(name).set_function(
+                       lambda: 0 if session.lost else 1)
+    registry.counter('ncc_reconnects_total', 'Successful reconnects',
+                     ['device']).labels(name).set_function(
+                         lambda: session.reconnects)
+    registry.counter('ncc_notification_gap_seconds_total',
+                     'Seconds without notifications due to outages',
+                     ['device']).labels(name).set_function(
+                         lambda: session.total_gap)
+
+
+def watch_poller(engine, registry=REGISTRY):
+    '''Export a PollingEngine's queue depths and per-job counts at
+    scrape time.
+    '''
+    registry.gauge('ncc_poll_inflight', 'Polls running').set_function(
+        lambda: engine._inflight)
+    registry.gauge('ncc_poll_waiting',
+                   'Polls due but waiting for a slot').set_function(
+                       lambda: len(engine._waiting))
+    polls = registry.counter('ncc_polls_total', 'Polls made', ['job'])
+    errors = registry.counter('ncc_poll_errors_total', 'Polls failed',
+                              ['job'])
+    overruns = registry.counter('ncc_poll_overruns_total',
+                                'Poll slots skipped', ['job'])
+    cadence = registry.gauge('ncc_poll_cadence_seconds',
+                             'Current poll cadence', ['job'])
+    for job in engine.jobs:
+        polls.labels(job.name).set_function(lambda job=job: job.polls)
+        errors.labels(job.name).set_function(lambda job=job: job.errors)
+        overruns.labels(job.name).set_function(lambda job=job: job.overruns)
+        cadence.labels(job.name).set_function(lambda job=job: job.cadence)
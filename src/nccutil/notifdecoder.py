@@ -0,0 +1,267 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import re
+from lxml import etree
+
+'''Decode YANG push notification payloads straight from the lxml
+element that ncclient already holds (notif.datastore_ele) into simple
+Python rows, without re-serializing and re-parsing the XML as
+jxmlease.parse(notif.datastore_xml) does.
+
+A decoder is created once from the xpaths a callback module is handed
+in init(xpaths). Each xpath is compiled into an extraction plan (a
+single precompiled lxml XPath object) that selects the row elements;
+each selected element becomes a dict of its leaf children, plus the
+key leaves of any ancestor list entries named in the xpath
+predicates. Values are typed on the way out. With nested, containers
+and lists below a row are decoded too, as dicts and lists of dicts.
+
+Predicates of the form [key="value"] (or 'value') select only the
+list entries with that key value. Other predicates, e.g. positions or
+functions, are not applied: every entry of the list is decoded.
+
+Typical usage in a callback module:
+
+    decoder = None
+
+    def init(xpaths):
+        global decoder
+        decoder = NotificationDecoder(xpaths)
+
+    def callback(notif):
+        for row in decoder.decode(notif.datastore_ele):
+            ...
+'''
+
+#
+# Values that look like integers are converted, as the callback
+# modules have always done for Redis.
+#
+_re_int = re.compile(r'^-?\d+$')
+
+
+def typed_value(text):
+    '''Default leaf value conversion; integers become int, empty leaves
+    become None and everything else is left as a string.
+    '''
+    if text is None:
+        return None
+    if _re_int.match(text):
+        return int(text)
+    return text
+
+
+def local_name(tag):
+    '''Strip any namespace from an lxml tag.'''
+    return tag.rpartition('}')[2]
+
+
+_re_key = re.compile(r'\[\s*(?:[\w\-\.]+:)?([\w\-\.]+)\s*=')
+
+_re_match = re.compile(
+    r'\[\s*(?:[\w\-\.]+:)?([\w\-\.]+)\s*=\s*'
+    r'(?:"([^"]*)"|\'([^\']*)\')\s*\]')
+
+
+def _steps(xpath):
+    '''Split an xpath into its location steps, predicates included.
+    Slashes and brackets inside quoted predicate values are handled.
+    '''
+    steps = []
+    step = ''
+    depth = 0
+    quote = None
+    for c in xpath.strip():
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in '\'"':
+            quote = c
+        elif c == '[':
+            depth += 1
+        elif c == ']':
+            depth -= 1
+        elif c == '/' and depth == 0:
+            if step:
+                steps.append(step)
+            step = ''
+            continue
+        step += c
+    if step:
+        steps.append(step)
+    return steps
+
+
+def _step_name(step):
+    return step.split('[', 1)[0].strip().rpartition(':')[2]
+
+
+def _predicates(step):
+    return step[len(step.split('[', 1)[0]):]
+
+
+def split_xpath(xpath):
+    '''Split a subscription xpath into a list of (name, keys) tuples, one
+    per location step. Namespace prefixes are dropped from names, and
+    keys is the list of leaf names used in the step's predicates
+    (e.g. [name="GigabitEthernet1/0/1"] gives ['name']).
+    '''
+    return [(_step_name(s), _re_key.findall(_predicates(s)))
+            for s in _steps(xpath)]
+
+
+def key_matches(xpath):
+    '''The [key="value"] predicates of each location step of an xpath,
+    as a list of lists of (key, value) tuples.
+    '''
+    return [[(k, v1 if v2 == '' else v2)
+             for k, v1, v2 in _re_match.findall(_predicates(s))]
+            for s in _steps(xpath)]
+
+
+class ExtractionPlan(object):
+    '''A compiled plan for a single subscription xpath. The notification
+    datastore element may either be the wrapper element (e.g.
+    datastore-contents-xml) or the top-level container itself, so the
+    first step matches either a child or the context node.
+    '''
+
+    def __init__(self, xpath, types=None, nested=False):
+        self.xpath = xpath
+        self.steps = split_xpath(xpath)
+        if len(self.steps) == 0:
+            raise ValueError('Empty xpath %r' % xpath)
+        self.root = self.steps[0][0]
+        self.types = types or {}
+        self.nested = nested
+
+        #
+        # build a namespace-agnostic XPath over local names, keeping
+        # [key="value"] predicates as XPath variables
+        #
+        variables = {}
+
+        def ln(name, matches):
+            step = '*[local-name()="%s"]' % name
+            for key, value in matches:
+                var = 'v%d' % len(variables)
+                variables[var] = value
+                step += '[*[local-name()="%s"]=$%s]' % (key, var)
+            return step
+        matches = key_matches(xpath)
+        first = ln(self.root, matches[0])
+        path = '(%s | self::%s)' % (first, first)
+        for (name, _), m in zip(self.steps[1:], matches[1:]):
+            path += '/' + ln(name, m)
+        select = etree.XPath(path)
+        self._select = lambda ele: select(ele, **variables)
+
+        #
+        # number of levels up from a row element to each ancestor list
+        # entry whose keys we want to carry into the row
+        #
+        n = len(self.steps)
+        self._ancestor_keys = [
+            (n - 1 - i, keys)
+            for i, (_, keys) in enumerate(self.steps[:-1]) if keys]
+
+    def _convert(self, name, text):
+        conv = self.types.get(name)
+        if conv is not None:
+            return conv(text) if text is not None else None
+        return typed_value(text)
+
+    def _tree(self, ele, row):
+        # the children of ele into row, lists for repeated names
+        for child in ele:
+            if not isinstance(child.tag, str):
+                continue
+            name = local_name(child.tag)
+            if len(child):
+                value = self._tree(child, {})
+            else:
+                value = self._convert(name, child.text)
+            if name not in row:
+                row[name] = value
+            elif isinstance(row[name], list):
+                row[name].append(value)
+            else:
+                row[name] = [row[name], value]
+        return row
+
+    def decode(self, ele):
+        '''Return a list of dict rows for the elements this plan selects
+        from the provided element.
+        '''
+        rows = []
+        for target in self._select(ele):
+            row = {}
+            for up, keys in self._ancestor_keys:
+                anc = target
+                for _ in range(up):
+                    anc = anc.getparent()
+                    if anc is None:
+                        break
+                if anc is None:
+                    continue
+                for child in anc:
+                    if not isinstance(child.tag, str):
+                        continue
+                    name = local_name(child.tag)
+                    if name in keys:
+                        row[name] = self._convert(name, child.text)
+            if len(target) == 0:
+                # the xpath selected a leaf
+                name = local_name(target.tag)
+                row[name] = self._convert(name, target.text)
+            elif self.nested:
+                self._tree(target, row)
+            else:
+                for child in target:
+                    if not isinstance(child.tag, str) or len(child):
+                        continue
+                    name = local_name(child.tag)
+                    row[name] = self._convert(name, child.text)
+            rows.append(row)
+        return rows
+
+
+class NotificationDecoder(object):
+    '''Decode notification payloads for a set of subscription xpaths.
+    Plans are indexed by their top-level container name so each
+    notification is only run against the plans that can match it.
+
+    The optional types dict maps leaf names to conversion callables,
+    overriding the default typed_value() conversion. With nested, rows
+    hold the containers and lists below them too.
+    '''
+
+    def __init__(self, xpaths, types=None, nested=False):
+        if isinstance(xpaths, str):
+            xpaths = [xpaths]
+        self.plans = {}
+        for xpath in xpaths or []:
+            plan = ExtractionPlan(xpath, types=types, nested=nested)
+            self.plans.setdefault(plan.root, []).append(plan)
+
+    def _candidates(self, ele):
+        name = local_name(ele.tag)
+        if name in self.plans:
+            return self.plans[name]
+        candidates = []
+        for child in ele:
+            if isinstance(child.tag, str):
+                candidates.extend(self.plans.get(local_name(child.tag), []))
+        return candidates
+
+    def decode(self, ele):
+        '''Decode an lxml element (normally notif.datastore_ele) into a
+        list of dict rows.
+        '''
+        rows = []
+        if ele is None:
+            return rows
+        for plan in self._candidates(ele):
+            rows.extend(plan.decode(ele))
+        return rows
@@ -0,0 +1,144 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import json
+from lxml import etree
+
+'''Render edit-config templates once per parameter set in a stream.
+
+A parameter stream is NDJSON: one JSON object per line, each a set of
+template parameters, e.g. one VLAN or ACL entry per line:
+
+    {"VLAN": 100, "NAME": "users"}
+    {"VLAN": 101, "NAME": "voice"}
+
+payloads() is a generator pipeline over it: rows are read one line at
+a time, every template is rendered with each row (over any base
+parameters), and the rendered <config> documents are merged into one
+edit-config payload per batch of rows. Only the current batch is held,
+so memory stays flat however long the stream is:
+
+    with open('vlans.ndjson') as f:
+        for rows, payload in payloads(templates, read_rows(f), 1000):
+            m.edit_config(payload, target='candidate')
+    m.commit()
+
+Merging shares containers and collects list entries side by side (see
+merge_configs()), so a batch of 1000 VLAN rows is one <vlan> container
+with 1000 <vlan-list> entries rather than 1000 copies of the template.
+A row that cannot be rendered or does not render to XML raises a
+RowError naming its line.
+'''
+
+
+class RowError(Exception):
+    '''A row of a parameter stream that could not be used.'''
+
+    def __init__(self, name, line, message):
+        Exception.__init__(self, '%s:%d: %s' % (name, line, message))
+        self.line = line
+
+
+def read_rows(f, name='<stream>'):
+    '''Generator of (line number, dict) for the JSON objects in an
+    NDJSON file. Blank lines are skipped.
+    '''
+    for line, text in enumerate(f, 1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as e:
+            raise RowError(name, line, 'invalid JSON: %s' % e)
+        if not isinstance(row, dict):
+            raise RowError(name, line, 'not a JSON object')
+        yield line, row
+
+
+def render_rows(templates, rows, base=None, name='<stream>'):
+    '''Generator of (line number, rendered text), rendering every
+    template with each row from read_rows(), over the base parameters.
+    '''
+    from jinja2.exceptions import TemplateError
+    for line, row in rows:
+        params = dict(base or {})
+        params.update(row)
+        for tmpl in templates:
+            try:
+                yield line, tmpl.render(params)
+            except TemplateError as e:
+                raise RowError(name, line, '%s: %s' % (tmpl.name, e))
+
+
+def _key(ele):
+    # an element and its leaves; list entries differ in their key leaf
+    return (ele.tag, tuple((c.tag, (c.text or '').strip())
+                           for c in ele
+                           if len(c) == 0 and isinstance(c.tag, str)))
+
+
+def _merge(target, source, path, index):
+    # children of target by key, and the last child with each tag
+    children = index.get(path)
+    if children is None:
+        children = index[path] = {}
+        for c in target:
+            if isinstance(c.tag, str):
+                children[_key(c)] = children[c.tag] = c
+    for child in list(source):
+        if not isinstance(child.tag, str):
+            continue
+        key = _key(child)
+        existing = children.get(key)
+        if existing is None:
+            # keep the entries of a list together
+            last = children.get(child.tag)
+            if last is None:
+                target.append(child)
+            else:
+                last.addnext(child)
+            children[key] = children[child.tag] = child
+        elif len(child):
+            _merge(existing, child, path + (key,), index)
+
+
+def merge_configs(roots):
+    '''Merge <config> element trees into the first. Elements with the
+    same tag and leaves are merged, so containers are shared and list
+    entries, which differ in their keys, are collected side by side.
+    '''
+    merged = None
+    index = {}
+    for root in roots:
+        if merged is None:
+            merged = root
+        else:
+            _merge(merged, root, (), index)
+    return merged
+
+
+def payloads(templates, rows, batch_size=1000, base=None, name='<stream>'):
+    '''Generator of (rows, payload): each payload is one <config>
+    merged from the templates rendered for up to batch_size rows.
+    '''
+    per_batch = max(1, batch_size) * len(templates)
+    merged = None
+    index = {}
+    count = 0
+    for line, text in render_rows(templates, rows, base=base, name=name):
+        try:
+            root = etree.fromstring(text.encode())
+        except etree.XMLSyntaxError as e:
+            raise RowError(name, line, 'rendered XML is invalid: %s' % e)
+        if merged is None:
+            merged = root
+        else:
+            _merge(merged, root, (), index)
+        count += 1
+        if count == per_batch:
+            yield count // len(templates), etree.tostring(merged).decode()
+            merged = None
+            index = {}
+            count = 0
+    if merged is not None:
+        yield count // len(templates), etree.tostring(merged).decode()
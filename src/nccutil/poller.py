@@ -0,0 +1,571 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import datetime
+import heapq
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
+from ncclient.operations.errors import TimeoutExpiredError
+from ncc.channels import close_channels
+from ncc.channels import connect_channels
+from nccutil.delta import DeltaTracker
+from nccutil.delta import format_change
+
+'''Building blocks for polling scripts: a fixed-cadence scheduler on the
+monotonic clock, display tag extraction compiled once into a single
+lxml XPath pass over a reply's data element, and a polling engine that
+runs many (device, filter, cadence) jobs concurrently from one process.
+Polling can adapt to a slow device, stretching the cadence (and, at the
+limit, narrowing the filter) while get latency is high or gets time
+out, then recovering when it drops again.
+'''
+
+logger = logging.getLogger('ncc.poller')
+
+
+class Scheduler(object):
+    '''Fixed-rate scheduler. Slots are at start + N * cadence on the
+    monotonic clock, so the period does not drift by the time the work
+    in each slot takes. If the work overruns one or more slots, they
+    are skipped (not bunched up) and counted, and the next run waits
+    for the next slot still ahead.
+    '''
+
+    def __init__(self, cadence, start=None):
+        self.cadence = float(cadence)
+        self.overruns = 0
+        self.missed = 0
+        self.due = None
+        self._next = start
+
+    def wait(self):
+        '''Sleep until the next slot and return the number of slots
+        missed because the previous iteration overran.
+        '''
+        now = time.monotonic()
+        if self._next is None:
+            self._next = now
+        missed = 0
+        if now >= self._next + self.cadence:
+            # every slot up to now is gone, wait for the next one
+            missed = int((now - self._next) // self.cadence) + 1
+            self.overruns += 1
+            self.missed += missed
+            self._next += missed * self.cadence
+        if now < self._next:
+            time.sleep(self._next - now)
+        self.due = self._next
+        self._next += self.cadence
+        return missed
+
+    def set_cadence(self, cadence):
+        '''Change the cadence, starting from the slot after the current
+        one.
+        '''
+        self.cadence = float(cadence)
+        if self.due is not None:
+            self._next = self.due + self.cadence
+
+
+class AdaptiveCadence(object):
+    '''Adjust a polling cadence to how the device is coping.
+
+    A poll is slow if it timed out or its latency exceeded
+    slow_latency (default half the base cadence). Each slow poll
+    multiplies the cadence by factor, up to max_cadence; once at
+    max_cadence, a further slow poll switches to the narrow filter if
+    there is one. After recover_after consecutive polls under half of
+    slow_latency, the narrow filter is dropped first, then the cadence
+    steps back down towards the base cadence.
+
+    Every adjustment is logged on the 'ncc.poller' logger and counted
+    in stats().
+    '''
+
+    def __init__(self, cadence, max_cadence=None, slow_latency=None,
+                 factor=2.0, recover_after=3, can_narrow=False, name=''):
+        self.base = float(cadence)
+        self.cadence = self.base
+        self.max_cadence = float(max_cadence or self.base * 8)
+        self.slow_latency = float(slow_latency or self.base / 2)
+        self.factor = factor
+        self.recover_after = recover_after
+        self.can_narrow = can_narrow
+        self.name = name
+        self.narrowed = False
+        self.polls = 0
+        self.slow_polls = 0
+        self.timeouts = 0
+        self.backoffs = 0
+        self.recoveries = 0
+        self.narrows = 0
+        self.last_latency = None
+        self._fast = 0
+
+    def _adjust(self, level, event, reason, old):
+        logger.log(level, '%s: %s (%s), cadence %.1fs -> %.1fs%s',
+                   self.name, event, reason, old, self.cadence,
+                   ', narrow filter' if self.narrowed else '')
+
+    def observe(self, latency, timed_out=False):
+        '''Record one poll. Returns True if the cadence or filter was
+        adjusted.
+        '''
+        self.polls += 1
+        self.last_latency = latency
+        old = self.cadence
+        if timed_out or latency > self.slow_latency:
+            self._fast = 0
+            self.slow_polls += 1
+            if timed_out:
+                self.timeouts += 1
+                reason = 'timed out after %.2fs' % latency
+            else:
+                reason = 'latency %.2fs > %.2fs' % (latency,
+                                                    self.slow_latency)
+            if self.cadence < self.max_cadence:
+                self.cadence = min(self.cadence * self.factor,
+                                   self.max_cadence)
+                self.backoffs += 1
+                self._adjust(logging.WARNING, 'backing off', reason, old)
+                return True
+            if self.can_narrow and not self.narrowed:
+                self.narrowed = True
+                self.narrows += 1
+                self._adjust(logging.WARNING, 'narrowing filter', reason, old)
+                return True
+            return False
+        if latency < self.slow_latency / 2:
+            self._fast += 1
+        else:
+            self._fast = 0
+        if self._fast < self.recover_after:
+            return False
+        self._fast = 0
+        reason = '%d polls under %.2fs' % (self.recover_after,
+                                          self.slow_latency / 2)
+        if self.narrowed:
+            self.narrowed = False
+            self.recoveries += 1
+            self._adjust(logging.INFO, 'restoring filter', reason, old)
+            return True
+        if self.cadence > self.base:
+            self.cadence = max(self.cadence / self.factor, self.base)
+            self.recoveries += 1
+            self._adjust(logging.INFO, 'recovering', reason, old)
+            return True
+        return False
+
+    def stats(self):
+        '''Controller state and counters as a dict, for reporting.'''
+        return {
+            'name': self.name,
+            'cadence': self.cadence,
+            'base_cadence': self.base,
+            'narrowed': self.narrowed,
+            'polls': self.polls,
+            'slow_polls': self.slow_polls,
+            'timeouts': self.timeouts,
+            'backoffs': self.backoffs,
+            'recoveries': self.recoveries,
+            'narrows': self.narrows,
+            'last_latency': self.last_latency,
+        }
+
+
+class TagExtractor(object):
+    '''Find the text of a set of element names in a reply with one
+    compiled XPath evaluation, ignoring namespaces.
+    '''
+
+    def __init__(self, tags):
+        self.tags = list(tags)
+        predicate = ' or '.join(
+            ['local-name()="%s"' % t for t in self.tags])
+        self._find = etree.XPath('descendant-or-self::*[%s]' % predicate)
+
+    def extract(self, ele):
+        '''Return a dict of tag name to list of texts, in document order.
+        Tags with no match have an empty list.
+        '''
+        found = dict((t, []) for t in self.tags)
+        if ele is None:
+            return found
+        for e in self._find(ele):
+            name = e.tag.rpartition('}')[2]
+            found[name].append(''.join(e.itertext()))
+        return found
+
+    def format(self, ele):
+        '''Return "tag = value" strings in display tag order.'''
+        values = []
+        for tag, texts in self.extract(ele).items():
+            for text in texts:
+                values.append(tag + " = " + text)
+        return values
+
+
+class PollJob(object):
+    '''A single polling job: one filter against one device on a cadence.
+    Exactly one of subtree or xpath should be given. With adaptive set,
+    the cadence follows an AdaptiveCadence controller, and
+    narrow_subtree or narrow_xpath is polled instead while the device
+    is at its slowest.
+    '''
+
+    def __init__(self, device, cadence, subtree=None, xpath=None,
+                 name=None, display_tags=None, changes_only=False,
+                 adaptive=False, max_cadence=None, slow_latency=None,
+                 narrow_subtree=None, narrow_xpath=None):
+        self.device = device
+        self.cadence = float(cadence)
+        self.subtree = subtree
+        self.xpath = xpath
+        self.name = name or '%s/%s' % (device, subtree or xpath)
+        self.extractor = TagExtractor(display_tags) if display_tags else None
+        self.delta = DeltaTracker() if changes_only else None
+        self.narrow_subtree = narrow_subtree
+        self.narrow_xpath = narrow_xpath
+        self.adaptive = None
+        if adaptive:
+            self.adaptive = AdaptiveCadence(
+                cadence, max_cadence=max_cadence, slow_latency=slow_latency,
+                can_narrow=bool(narrow_subtree or narrow_xpath),
+                name=self.name)
+        self.next_due = None
+        self.last_due = None
+        self.running = False
+        self.waiting = False
+        self.polls = 0
+        self.errors = 0
+        self.overruns = 0
+        self.latency = 0.0
+
+    def get(self, m):
+        if self.adaptive and self.adaptive.narrowed:
+            if self.narrow_subtree:
+                return m.get(filter=('subtree', self.narrow_subtree))
+            return m.get(filter=('xpath', self.narrow_xpath))
+        if self.subtree:
+            return m.get(filter=('subtree', self.subtree))
+        elif self.xpath:
+            return m.get(filter=('xpath', self.xpath))
+        else:
+            return m.get()
+
+
+def load_jobs(path, devices):
+    '''Load a JSON list of jobs. Each job is a dict with device (a device
+    name from the inventory, or "*" for every device), cadence, and
+    subtree or xpath, plus optional name, display_tags, changes_only,
+    and adaptive with its max_cadence, slow_latency and narrow_subtree
+    or narrow_xpath.
+    '''
+    with open(path) as f:
+        entries = json.load(f)
+    jobs = []
+    for entry in entries:
+        entry = dict(entry)
+        device = entry.pop('device', '*')
+        names = [d['name'] for d in devices]
+        if device != '*' and device not in names:
+            raise ValueError('Job device %s not in inventory' % device)
+        targets = names if device == '*' else [device]
+        for target in targets:
+            job = dict(entry)
+            if device == '*' and 'name' in job:
+                job['name'] = '%s/%s' % (target, job['name'])
+            jobs.append(PollJob(target, **job))
+    return jobs
+
+
+class StdoutSink(object):
+    '''Print results as they arrive, in the same style as
+    ncc-simple-poller.py.
+    '''
+
+    def __init__(self, file=sys.stdout):
+        self.file = file
+        self._lock = threading.Lock()
+
+    def __call__(self, job, st, latency, reply, error):
+        with self._lock:
+            if error is not None:
+                print("{} {}: error {!r}".format(st, job.name, error),
+                      file=self.file)
+            elif job.delta:
+                changes = job.delta.update(reply.data_ele)
+                if changes:
+                    print("{} {}: {} change(s)".format(
+                        st, job.name, len(changes)), file=self.file)
+                    for change in changes:
+                        print(format_change(change), file=self.file)
+            elif job.extractor:
+                print("{} {}: {}".format(
+                    st, job.name,
+                    ", ".join(job.extractor.format(reply.data_ele))),
+                      file=self.file)
+            else:
+                print("{} {} ({:.3f}s)".format(st, job.name, latency),
+                      file=self.file)
+                print(etree.tostring(reply.data_ele,
+                                     pretty_print=True).decode('utf-8'),
+                      file=self.file)
+
+
+class JsonLinesSink(object):
+    '''Append one JSON object per result to a file. The reply is
+    included as an XML string, as extracted tag values when the job
+    has display tags, or as a list of [op, path, value] changes when
+    the job reports changes only (with no record if nothing changed).
+    '''
+
+    def __init__(self, path):
+        self._f = open(path, 'a')
+        self._lock = threading.Lock()
+
+    def __call__(self, job, st, latency, reply, error):
+        record = {
+            'time': st,
+            'device': job.device,
+            'job': job.name,
+            'latency': latency,
+        }
+        if job.adaptive:
+            record['cadence'] = job.adaptive.cadence
+            record['narrowed'] = job.adaptive.narrowed
+        if error is not None:
+            record['error'] = repr(error)
+        elif job.delta:
+            changes = job.delta.update(reply.data_ele)
+            if not changes:
+                return
+            record['changes'] = changes
+        elif job.extractor:
+            record['values'] = job.extractor.extract(reply.data_ele)
+        else:
+            record['data'] = etree.tostring(reply.data_ele).decode('utf-8')
+        line = json.dumps(record)
+        with self._lock:
+            self._f.write(line + '\n')
+            self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+
+class PollingEngine(object):
+    '''Run many PollJobs against many devices from one process.
+
+    - one NETCONF session per device, shared by all that device's jobs
+      and opened on first use; or, with channels, that many sessions
+      multiplexed over one SSH connection, taken in turn by the jobs
+    - jobs with the same cadence have their start times spread evenly
+      across the interval rather than all firing together
+    - at most max_inflight RPCs run at once overall, and at most
+      per_device against any one device; jobs that are due but over a
+      limit wait in FIFO order for a slot
+    - a job whose previous poll is still running skips its slot and
+      counts an overrun, as with Scheduler
+    - an adaptive job is rescheduled from its last slot whenever its
+      controller changes the cadence
+    - results go to sink(job, timestamp, latency, reply, error)
+    - opened(m, device_name), if given, is called for every session
+      opened, channels included
+    '''
+
+    def __init__(self, devices, jobs, sink, connect,
+                 max_inflight=32, per_device=1, channels=1, opened=None):
+        self.devices = dict((d['name'], d) for d in devices)
+        self.jobs = jobs
+        self.sink = sink
+        self.connect = connect
+        self.max_inflight = max_inflight
+        self.per_device = per_device
+        self.channels = channels
+        self.opened = opened
+        self.sessions = {}
+        self._next_channel = dict((n, 0) for n in self.devices)
+        self._connect_locks = dict((n, threading.Lock())
+                                   for n in self.devices)
+        self._inflight = 0
+        self._device_inflight = dict((n, 0) for n in self.devices)
+        self._waiting = deque()
+        self._heap = []
+        self._cond = threading.Condition()
+        self._stop = False
+        self._pool = None
+        self._thread = None
+
+    def _spread(self, start):
+        by_cadence = {}
+        for job in self.jobs:
+            by_cadence.setdefault(job.cadence, []).append(job)
+        seq = 0
+        for cadence, jobs in by_cadence.items():
+            for i, job in enumerate(jobs):
+                job.next_due = start + cadence * i / len(jobs)
+                heapq.heappush(self._heap, (job.next_due, seq, job))
+                seq += 1
+        self._seq = seq
+
+    def _connected(self, name):
+        managers = self.sessions.get(name)
+        return managers is not None and all(m.connected for m in managers)
+
+    def _pick(self, name):
+        managers = self.sessions[name]
+        with self._cond:
+            i = self._next_channel[name] % len(managers)
+            self._next_channel[name] = i + 1
+        return managers[i]
+
+    def _session(self, name):
+        if self._connected(name):
+            return self._pick(name)
+        with self._connect_locks[name]:
+            if not self._connected(name):
+                managers = self.sessions.get(name)
+                if managers is not None:
+                    close_channels([m for m in managers if m.connected])
+                managers = connect_channels(self.devices[name],
+                                            self.channels,
+                                            connect=self.connect)
+                if self.opened:
+                    for m in managers:
+                        self.opened(m, name)
+                self.sessions[name] = managers
+        return self._pick(name)
+
+    def _run(self, job):
+        st = datetime.datetime.fromtimestamp(time.time()).strftime(
+            '%Y-%m-%d %H:%M:%S')
+        reply = None
+        error = None
+        t0 = time.monotonic()
+        try:
+            m = self._session(job.device)
+            t0 = time.monotonic()
+            reply = job.get(m)
+        except Exception as e:
+            error = e
+        latency = time.monotonic() - t0
+        job.polls += 1
+        job.latency += latency
+        if error is not None:
+            job.errors += 1
+        adjusted = False
+        if job.adaptive and (error is None or
+                             isinstance(error, TimeoutExpiredError)):
+            adjusted = job.adaptive.observe(
+                latency, isinstance(error, TimeoutExpiredError))
+        try:
+            self.sink(job, st, latency, reply, error)
+        except Exception:
+            # the pool would keep the exception in a future nobody reads
+            logger.exception('%s: sink failed', job.name)
+        finally:
+            with self._cond:
+                if adjusted and job.cadence != job.adaptive.cadence:
+                    # the old heap entry is left behind and skipped
+                    job.cadence = job.adaptive.cadence
+                    job.next_due = job.last_due + job.cadence
+                    self._seq += 1
+                    heapq.heappush(self._heap,
+                                   (job.next_due, self._seq, job))
+                job.running = False
+                self._inflight -= 1
+                self._device_inflight[job.device] -= 1
+                self._cond.notify()
+
+    def _can_start(self, job):
+        return self._inflight < self.max_inflight and \
+            self._device_inflight[job.device] < self.per_device
+
+    def _start(self, job):
+        job.running = True
+        self._inflight += 1
+        self._device_inflight[job.device] += 1
+        self._pool.submit(self._run, job)
+
+    def _dispatch(self):
+        with self._cond:
+            while not self._stop:
+                # jobs already due and waiting for capacity go first
+                for _ in range(len(self._waiting)):
+                    job = self._waiting.popleft()
+                    if self._can_start(job):
+                        job.waiting = False
+                        self._start(job)
+                    else:
+                        self._waiting.append(job)
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    due, _, job = heapq.heappop(self._heap)
+                    if due != job.next_due:
+                        continue
+                    missed = int((now - job.next_due) // job.cadence)
+                    job.last_due = due + missed * job.cadence
+                    job.next_due += (missed + 1) * job.cadence
+                    self._seq += 1
+                    heapq.heappush(self._heap,
+                                   (job.next_due, self._seq, job))
+                    if job.running or job.waiting:
+                        job.overruns += 1
+                        continue
+                    if missed:
+                        job.overruns += 1
+                    if self._can_start(job):
+                        self._start(job)
+                    else:
+                        job.waiting = True
+                        self._waiting.append(job)
+                timeout = None
+                if self._heap:
+                    timeout = max(0.0, self._heap[0][0] - time.monotonic())
+                self._cond.wait(timeout)
+
+    def start(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.max_inflight)
+        self._spread(time.monotonic())
+        self._thread = threading.Thread(target=self._dispatch, daemon=True,
+                                        name='poll-dispatch')
+        self._thread.start()
+
+    def report(self, file=sys.stderr):
+        '''Print per-job poll counts, errors, overruns, mean latency and
+        current cadence (marked * while an adaptive job is narrowed).
+        '''
+        print('%-48s %8s %8s %8s %10s %10s' % (
+            'Job', 'Polls', 'Errors', 'Overruns', 'Mean(s)', 'Cadence'),
+              file=file)
+        for job in self.jobs:
+            mean = job.latency / job.polls if job.polls else 0.0
+            cadence = '%.1f' % job.cadence
+            if job.adaptive and job.adaptive.narrowed:
+                cadence += '*'
+            print('%-48s %8d %8d %8d %10.3f %10s' % (
+                job.name, job.polls, job.errors, job.overruns, mean,
+                cadence), file=file)
+        print('in flight %d, waiting %d, sessions %d' % (
+            self._inflight, len(self._waiting),
+            sum(len(managers) for managers in self.sessions.values())),
+              file=file)
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+        if self._pool:
+            self._pool.shutdown(wait=True)
+        for managers in self.sessions.values():
+            close_channels(managers)
+        self.sessions = {}
@@ -0,0 +1,126 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import re
+from ncclient.operations import retrieve
+from ncclient.operations.errors import TimeoutExpiredError
+from ncclient.operations.rpc import RaiseMode
+from ncclient.operations.rpc import RPCError
+from ncclient.xml_ import to_ele
+
+'''Fetch replies without parsing them.
+
+A synchronous ncclient get or get-config parses the whole reply into
+an lxml tree, and printing it then serializes the tree again. When the
+reply is only being archived both passes are wasted. get_raw() and
+get_config_raw() return the reply text as the device sent it, and
+write_data() writes its <data> element straight from that text:
+
+    raw = get_config_raw(m, filter=('subtree', f))
+    write_data(raw, sys.stdout)
+
+The <data> start tag is given the namespace declarations it inherits
+from <rpc-reply>, so the output is a well-formed document on its own.
+It is not pretty-printed. A reply is only parsed if it contains an
+rpc-error, so errors are raised as the manager's raise_mode says.
+'''
+
+_data_re = re.compile(r'<(?:([\w.-]+):)?data(?=[\s/>])[^>]*>')
+_reply_re = re.compile(r'<(?:[\w.-]+:)?rpc-reply(?=[\s/>])[^>]*>')
+_xmlns_re = re.compile(r'''\s(xmlns(?::[\w.-]+)?)=("[^"]*"|'[^']*')''')
+
+#
+# the <data> start tag is near the start of a reply; look there first
+#
+_HEAD = 64 * 1024
+
+#
+# written in slices so a large reply is not copied whole
+#
+_WRITE_SIZE = 1024 * 1024
+
+
+def request_raw(m, cls, *args, **kwargs):
+    '''Send an ncclient operation (e.g. retrieve.Get) on manager m and
+    return the reply text, unparsed.
+    '''
+    op = cls(m._session,
+             device_handler=m._device_handler,
+             async_mode=True,
+             timeout=m.timeout,
+             raise_mode=m.raise_mode,
+             huge_tree=m.huge_tree)
+    op.request(*args, **kwargs)
+    op.event.wait(m.timeout)
+    if not op.event.is_set():
+        raise TimeoutExpiredError(
+            'ncclient timed out while waiting for an rpc reply.')
+    if op.error:
+        raise op.error
+    reply = op.reply
+    if 'rpc-error' in reply._raw:
+        # rare, and may just be in the data; parse to find out
+        reply.parse()
+        if reply.error is not None and \
+           not m._device_handler.is_rpc_error_exempt(reply.error.message):
+            if m.raise_mode == RaiseMode.ALL or (
+                    m.raise_mode == RaiseMode.ERRORS and
+                    reply.error.severity == 'error'):
+                if len(reply.errors) > 1:
+                    raise RPCError(to_ele(reply._raw), errs=reply.errors)
+                raise reply.error
+    return reply._raw
+
+
+def get_raw(m, filter=None, with_defaults=None):
+    return request_raw(m, retrieve.Get, filter=filter,
+                       with_defaults=with_defaults)
+
+
+def get_config_raw(m, source='running', filter=None, with_defaults=None):
+    return request_raw(m, retrieve.GetConfig, source, filter=filter,
+                       with_defaults=with_defaults)
+
+
+def data_span(raw):
+    '''Locate the <data> element of a reply. Returns (start_tag, body
+    start, body end, end_tag), with the start tag carrying the
+    namespace declarations of <rpc-reply>; None if there is no data
+    element.
+    '''
+    m = _data_re.search(raw, 0, _HEAD) or _data_re.search(raw)
+    if m is None:
+        return None
+    start_tag = m.group(0)
+    reply = _reply_re.search(raw, 0, m.start())
+    if reply is not None:
+        declared = set(n for n, _ in _xmlns_re.findall(start_tag))
+        extra = ''.join(' %s=%s' % (n, v)
+                        for n, v in _xmlns_re.findall(reply.group(0))
+                        if n not in declared)
+        close = 2 if start_tag.endswith('/>') else 1
+        start_tag = start_tag[:-close] + extra + start_tag[-close:]
+    if m.group(0).endswith('/>'):
+        return start_tag, m.end(), m.end(), ''
+    prefix = m.group(1) + ':' if m.group(1) else ''
+    end_tag = '</%sdata>' % prefix
+    end = raw.rfind(end_tag)
+    if end < m.end():
+        return None
+    return start_tag, m.end(), end, end_tag
+
+
+def write_data(raw, file):
+    '''Write the <data> element of a reply to file, followed by a
+    newline. Returns False if the reply has no data element.
+    '''
+    span = data_span(raw)
+    if span is None:
+        return False
+    start_tag, start, end, end_tag = span
+    file.write(start_tag)
+    for i in range(start, end, _WRITE_SIZE):
+        file.write(raw[i:min(i + _WRITE_SIZE, end)])
+    file.write(end_tag)
+    file.write('\n')
+    return True
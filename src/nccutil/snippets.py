@@ -0,0 +1,147 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import filecmp
+import os
+import shutil
+import tarfile
+import tempfile
+import urllib.request
+
+'''Fetch just the snippets directories (snippets, snippets-xe, ...) of
+the ncc repository and install or update them in a target directory.
+
+The source may be:
+
+- a git URL: cloned depth 1 with a blobless, sparse checkout of only
+  the snippets directories, falling back to a plain depth 1 clone when
+  the git client or server cannot do that
+- a tarball (.tar, .tar.gz, .tgz), as a local path or http(s) URL,
+  e.g. a GitHub archive; only snippets members are extracted
+- a local directory, such as an existing checkout or mirror
+
+Installing over an existing snippets tree copies only files that are
+new or whose contents changed, and can optionally prune files that no
+longer exist in the source.
+'''
+
+SNIPPET_PREFIX = 'snippets'
+
+TARBALL_SUFFIXES = ('.tar', '.tar.gz', '.tgz')
+
+
+def _is_snippet_dir(name):
+    return name.startswith(SNIPPET_PREFIX)
+
+
+def fetch_git(url, workdir):
+    '''Sparse, shallow clone of url into workdir; returns workdir.'''
+    from git import Repo
+    from git.exc import GitCommandError
+    try:
+        repo = Repo.clone_from(url, workdir, depth=1, filter='blob:none',
+                               sparse=True)
+        repo.git.sparse_checkout('set', '--no-cone',
+                                 '/%s*/' % SNIPPET_PREFIX)
+    except GitCommandError:
+        shutil.rmtree(workdir, ignore_errors=True)
+        Repo.clone_from(url, workdir, depth=1)
+    return workdir
+
+
+def fetch_tarball(source, workdir):
+    '''Extract the snippets directories of a tarball into workdir and
+    return workdir. A leading top-level directory, as in GitHub
+    archives (ncc-master/snippets/...), is stripped.
+    '''
+    path = source
+    if source.startswith(('http://', 'https://')):
+        path = os.path.join(workdir, 'snippets.tar.gz')
+        with urllib.request.urlopen(source) as r, open(path, 'wb') as f:
+            shutil.copyfileobj(r, f)
+    outdir = os.path.join(workdir, 'tree')
+    with tarfile.open(path) as tar:
+        members = []
+        for member in tar.getmembers():
+            parts = member.name.split('/')
+            if not _is_snippet_dir(parts[0]):
+                if len(parts) > 1 and _is_snippet_dir(parts[1]):
+                    member.name = '/'.join(parts[1:])
+                else:
+                    continue
+            members.append(member)
+        if hasattr(tarfile, 'data_filter'):
+            tar.extractall(outdir, members=members, filter='data')
+        else:
+            tar.extractall(outdir, members=members)
+    return outdir
+
+
+def sync_tree(src, dst, prune=False):
+    '''Copy files from src to dst where they are missing or their
+    contents differ. With prune, remove files in dst that are not in
+    src. Returns a dict of counts: added, updated, unchanged, removed.
+    '''
+    stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    seen = set()
+    for root, dirs, files in os.walk(src):
+        dirs[:] = [d for d in dirs if d != '.git']
+        rel = os.path.relpath(root, src)
+        target = os.path.normpath(os.path.join(dst, rel))
+        os.makedirs(target, exist_ok=True)
+        for name in files:
+            s = os.path.join(root, name)
+            d = os.path.join(target, name)
+            seen.add(os.path.normpath(d))
+            if not os.path.exists(d):
+                shutil.copy2(s, d)
+                stats['added'] += 1
+            elif not filecmp.cmp(s, d, shallow=False):
+                shutil.copy2(s, d)
+                stats['updated'] += 1
+            else:
+                stats['unchanged'] += 1
+    if prune:
+        for root, dirs, files in os.walk(dst):
+            for name in files:
+                d = os.path.normpath(os.path.join(root, name))
+                if d not in seen:
+                    os.remove(d)
+                    stats['removed'] += 1
+    return stats
+
+
+def install(source, target_dir='.', prune=False):
+    '''Fetch the snippets directories from source and install them in
+    target_dir, updating any already there. Returns a dict of snippets
+    directory name to sync_tree counts.
+    '''
+    workdir = tempfile.mkdtemp()
+    try:
+        if os.path.isdir(source):
+            tree = source
+        elif source.endswith(TARBALL_SUFFIXES):
+            tree = fetch_tarball(source, workdir)
+        else:
+            tree = fetch_git(source, os.path.join(workdir, 'repo'))
+        results = {}
+        for entry in sorted(os.listdir(tree)):
+            path = os.path.join(tree, entry)
+            if _is_snippet_dir(entry) and os.path.isdir(path):
+                results[entry] = sync_tree(
+                    path, os.path.join(target_dir, entry), prune=prune)
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def install_snippets(source, target_dir='.', prune=False):
+    '''install() for the scripts' --install-snippets: installs the
+    snippets directories from source in target_dir and prints what
+    changed in each.
+    '''
+    results = install(source, target_dir, prune=prune)
+    for name, st in sorted(results.items()):
+        print('%s: %d added, %d updated, %d unchanged, %d removed' % (
+            name, st['added'], st['updated'], st['unchanged'],
+            st['removed']))
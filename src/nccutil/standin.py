@@ -0,0 +1,345 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import itertools
+import logging
+import re
+import socket
+import threading
+import time
+import paramiko
+from nccutil import synthetic
+
+'''A local stand-in NETCONF server for benchmarks and tests.
+
+It speaks NETCONF over SSH (the "netconf" subsystem), accepts any
+username and password, and answers every RPC from a small set of
+canned behaviours rather than a datastore:
+
+- get and get-config return a small <data> payload, unless the filter
+  contains a bench element with a bytes attribute, in which case
+  roughly that many bytes of list entries are generated and streamed:
+
+      <bench xmlns="urn:ncc:bench" bytes="1048576"/>
+
+  or a dataset attribute, in which case count entries of that
+  nccutil.synthetic dataset are served, operational for get and
+  config for get-config (override with oper="true" or "false"):
+
+      <bench xmlns="urn:ncc:bench" dataset="interfaces" count="100000"/>
+
+- close-session replies <ok/> and closes the channel
+- anything else replies <ok/>
+
+Both base:1.0 (end-of-message) and base:1.1 (chunked) framing are
+supported, as is SSH compression if the client asks for it. rate
+limits what the server sends to that many bytes per second, to stand
+in for a slow link. Run from the command line to serve a fixed port:
+
+    python -m nccutil.standin --port 8830
+'''
+
+logger = logging.getLogger('ncc.standin')
+
+BENCH_NS = 'urn:ncc:bench'
+
+NETCONF_NS = 'urn:ietf:params:xml:ns:netconf:base:1.0'
+
+BASE_1_0 = 'urn:ietf:params:netconf:base:1.0'
+BASE_1_1 = 'urn:ietf:params:netconf:base:1.1'
+
+CAPABILITIES = [
+    BASE_1_0,
+    BASE_1_1,
+    'urn:ietf:params:netconf:capability:candidate:1.0',
+    'urn:ietf:params:netconf:capability:writable-running:1.0',
+    'urn:ietf:params:netconf:capability:validate:1.1',
+    'urn:ietf:params:netconf:capability:confirmed-commit:1.1',
+]
+
+EOM = b']]>]]>'
+
+WRITE_SIZE = 256 * 1024
+
+SMALL_DATA = ('<system xmlns="urn:ncc:bench"><hostname>standin</hostname>'
+              '</system>')
+
+#
+# one generated list entry is about 100 bytes; entries are built in
+# blocks so large replies can be streamed without building them whole
+#
+_ENTRY = ('<entry><name>entry-%08d</name><value>%s</value>'
+          '<state>up</state></entry>')
+_BLOCK_ENTRIES = 1024
+
+_message_id_re = re.compile(r'message-id="([^"]*)"')
+_op_re = re.compile(r'<(?:[\w-]+:)?rpc\b[^>]*>\s*<(?:[\w-]+:)?([\w-]+)')
+_chunk_re = re.compile(rb'\s*\n#(\d+|#)\n')
+_bench_re = re.compile(r'<(?:[\w-]+:)?bench\b([^>]*)>')
+_attr_re = re.compile(r'([\w-]+)="([^"]*)"')
+
+
+def _hello():
+    caps = ''.join('<capability>%s</capability>' % c for c in CAPABILITIES)
+    return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<hello xmlns="%s"><capabilities>%s</capabilities>'
+            '<session-id>1</session-id></hello>' % (NETCONF_NS, caps))
+
+
+def generate(size):
+    '''Yield byte blocks of list entries totalling about size bytes.'''
+    sent = 0
+    n = 0
+    while sent < size:
+        block = ''.join(_ENTRY % (n + i, 'x' * 16)
+                        for i in range(_BLOCK_ENTRIES)).encode()
+        if sent + len(block) > size:
+            # trim to whole entries
+            per_entry = len(block) // _BLOCK_ENTRIES
+            count = max(1, (size - sent) // per_entry)
+            block = ''.join(_ENTRY % (n + i, 'x' * 16)
+                            for i in range(count)).encode()
+        n += _BLOCK_ENTRIES
+        sent += len(block)
+        yield block
+
+
+class _Framing(object):
+    '''Read and write NETCONF messages on a channel.'''
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.chunked = False
+        # a bytearray, so large messages are not copied on every recv
+        self._buf = bytearray()
+
+    def _recv(self):
+        data = self.channel.recv(65536)
+        if not data:
+            raise EOFError()
+        self._buf += data
+
+    def read(self):
+        if not self.chunked:
+            start = 0
+            end = self._buf.find(EOM)
+            while end < 0:
+                # only search what is new since the last recv
+                start = max(0, len(self._buf) - len(EOM) + 1)
+                self._recv()
+                end = self._buf.find(EOM, start)
+            msg = bytes(self._buf[:end])
+            del self._buf[:end + len(EOM)]
+            return msg.decode()
+        parts = []
+        while True:
+            m = _chunk_re.match(self._buf)
+            while m is None:
+                self._recv()
+                m = _chunk_re.match(self._buf)
+            size = m.group(1)
+            del self._buf[:m.end()]
+            if size == b'#':
+                return b''.join(parts).decode()
+            size = int(size)
+            while len(self._buf) < size:
+                self._recv()
+            parts.append(bytes(self._buf[:size]))
+            del self._buf[:size]
+
+    def write(self, blocks):
+        '''Send a message given as an iterable of byte blocks. Blocks
+        are coalesced into sends of up to WRITE_SIZE bytes, so a small
+        reply goes out as one SSH packet rather than several.
+        '''
+        out = []
+        pending = 0
+        for block in blocks:
+            if self.chunked:
+                out.append(b'\n#%d\n' % len(block))
+            out.append(block)
+            pending += len(block)
+            if pending >= WRITE_SIZE:
+                self.channel.sendall(b''.join(out))
+                out = []
+                pending = 0
+        out.append(b'\n##\n' if self.chunked else EOM)
+        self.channel.sendall(b''.join(out))
+
+
+class _NetconfHandler(paramiko.SubsystemHandler):
+
+    def start_subsystem(self, name, transport, channel):
+        framing = _Framing(channel)
+        try:
+            framing.write([_hello().encode()])
+            hello = framing.read()
+            framing.chunked = BASE_1_1 in hello
+            while True:
+                if not self._handle(framing, framing.read()):
+                    break
+        except (EOFError, socket.error):
+            pass
+        except Exception:
+            logger.exception('standin session failed')
+        finally:
+            channel.close()
+
+    def _handle(self, framing, msg):
+        m = _message_id_re.search(msg)
+        message_id = m.group(1) if m else ''
+        m = _op_re.search(msg)
+        op = m.group(1) if m else ''
+        head = ('<rpc-reply xmlns="%s" message-id="%s">' % (
+            NETCONF_NS, message_id)).encode()
+        tail = b'</rpc-reply>'
+        if op in ('get', 'get-config'):
+            m = _bench_re.search(msg)
+            attrs = dict(_attr_re.findall(m.group(1))) if m else {}
+            if 'dataset' in attrs:
+                oper = attrs.get('oper', str(op == 'get').lower()) == 'true'
+                try:
+                    body = synthetic.generate(
+                        attrs['dataset'], int(attrs.get('count', 1000)),
+                        oper=oper, seed=int(attrs.get('seed', 0)))
+                    # fail on an unknown dataset before replying
+                    first = next(body)
+                except ValueError as e:
+                    framing.write([head, self._error(str(e)), tail])
+                    return True
+                framing.write(self._wrap(
+                    head, itertools.chain([first], body), tail))
+            elif 'bytes' in attrs:
+                body = itertools.chain(
+                    [('<bench xmlns="%s">' % BENCH_NS).encode()],
+                    generate(int(attrs['bytes'])), [b'</bench>'])
+                framing.write(self._wrap(head, body, tail))
+            else:
+                framing.write([head, b'<data>', SMALL_DATA.encode(),
+                               b'</data>', tail])
+        else:
+            framing.write([head, b'<ok/>', tail])
+        return op != 'close-session'
+
+    @staticmethod
+    def _error(message):
+        return ('<rpc-error><error-type>application</error-type>'
+                '<error-tag>invalid-value</error-tag>'
+                '<error-severity>error</error-severity>'
+                '<error-message>%s</error-message></rpc-error>'
+                % message).encode()
+
+    @staticmethod
+    def _wrap(head, body, tail):
+        yield head
+        yield b'<data>'
+        for block in body:
+            yield block
+        yield b'</data>'
+        yield tail
+
+
+class _Server(paramiko.ServerInterface):
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+
+class _ThrottledSocket(object):
+    '''A socket whose sends are paced to rate bytes per second.'''
+
+    def __init__(self, sock, rate):
+        self._sock = sock
+        self._rate = float(rate)
+        self._next = time.monotonic()
+
+    def send(self, data):
+        now = time.monotonic()
+        if self._next > now:
+            time.sleep(self._next - now)
+        n = self._sock.send(data)
+        self._next = max(now, self._next) + n / self._rate
+        return n
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+class StandinServer(object):
+    '''Serve NETCONF on addr:port (port 0 picks a free port) from daemon
+    threads. The port actually bound is in self.port.
+    '''
+
+    def __init__(self, addr='127.0.0.1', port=0, host_key=None, rate=None):
+        self.host_key = host_key or paramiko.RSAKey.generate(2048)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((addr, port))
+        self._sock.listen(100)
+        self.addr = addr
+        self.port = self._sock.getsockname()[1]
+        self.rate = rate
+        self._transports = []
+        self._thread = None
+        self._stop = False
+
+    def _accept(self):
+        while not self._stop:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                break
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.rate:
+                client = _ThrottledSocket(client, self.rate)
+            t = paramiko.Transport(client)
+            t.use_compression(True)
+            t.add_server_key(self.host_key)
+            t.set_subsystem_handler('netconf', _NetconfHandler)
+            try:
+                t.start_server(server=_Server())
+            except (paramiko.SSHException, EOFError):
+                continue
+            self._transports.append(t)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._accept, daemon=True,
+                                        name='standin-accept')
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._stop = True
+        self._sock.close()
+        for t in self._transports:
+            t.close()
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description='Local stand-in NETCONF server:')
+    parser.add_argument('--addr', type=str, default='127.0.0.1',
+                        help="Address to listen on (default 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8830,
+                        help="Port to listen on (default 8830)")
+    parser.add_argument('--rate', type=int,
+                        help="Limit what is sent to this many bytes per "
+                        "second, to stand in for a slow link")
+    args = parser.parse_args()
+
+    server = StandinServer(args.addr, args.port, rate=args.rate).start()
+    print('NETCONF stand-in listening on %s:%d' % (server.addr, server.port))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.close()
@@ -0,0 +1,201 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import logging
+import random
+import time
+from ncclient.transport.session import SessionListener
+
+'''Supervised NETCONF sessions for long-running telemetry.
+
+A SupervisedSession owns a manager created by a connect function and
+the subscriptions created on it by a subscribe function. It notices
+transport loss (the session's main loop reporting an error, or the
+session no longer being connected), reconnects with exponential
+backoff and re-runs subscribe, so every xpath is subscribed again.
+
+There is no thread per session; callers drive it by calling check()
+periodically (from a main loop or a shared monitor thread). The
+callback wrapper returned by wrap() records notification arrival, so
+the gap in notifications across an outage can be measured as well as
+how long the reconnect itself took.
+'''
+
+logger = logging.getLogger('ncc.supervisor')
+
+
+class _LossListener(SessionListener):
+    '''Flag transport loss reported by the ncclient session thread, as
+    long as the manager it was attached to is still the current one.
+    '''
+
+    def __init__(self, supervised, m):
+        self._supervised = supervised
+        self._m = m
+
+    def callback(self, root, raw):
+        pass
+
+    def errback(self, ex):
+        if self._supervised.manager is self._m:
+            self._supervised._transport_lost(ex)
+
+
+class SupervisedSession(object):
+    '''Keep a session and its subscriptions alive. connect() must return
+    a connected manager; subscribe(m) must create the subscriptions and
+    return a list of subscription ids.
+    '''
+
+    def __init__(self, name, connect, subscribe,
+                 min_backoff=1.0, max_backoff=60.0):
+        self.name = name
+        self._connect = connect
+        self._subscribe = subscribe
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.manager = None
+        self.subscriptions = []
+        self.reconnects = 0
+        self.attempts = 0
+        self.last_gap = None
+        self.last_reconnect_latency = None
+        self.total_gap = 0.0
+        self.last_notification = None
+        self.lost_at = None
+        self.last_error = None
+        self._backoff = min_backoff
+        self._next_attempt = 0.0
+        self._gap_start = None
+        self._recovering = False
+
+    def _attach(self, m):
+        self.manager = m
+        m._session.add_listener(_LossListener(self, m))
+
+    def start(self, retry=False):
+        '''Initial connect and subscribe. Failures are raised to the
+        caller, unless retry is set, in which case the session is
+        treated as lost and check() will keep trying to bring it up.
+        '''
+        try:
+            self._attach(self._connect())
+            self.subscriptions = self._subscribe(self.manager)
+        except Exception as e:
+            if not retry:
+                raise
+            self._transport_lost(e)
+        return self.subscriptions
+
+    def wrap(self, callback):
+        '''Return a callback that records notification arrival before
+        calling the provided callback.
+        '''
+        def supervised_callback(notif):
+            self.notified()
+            callback(notif)
+        return supervised_callback
+
+    def notified(self):
+        now = time.time()
+        if self._gap_start is not None and not self.lost:
+            self.last_gap = now - self._gap_start
+            self.total_gap += self.last_gap
+            self._gap_start = None
+            logger.warning('%s: notifications resumed after %.2fs gap',
+                           self.name, self.last_gap)
+        self.last_notification = now
+
+    def _transport_lost(self, ex=None):
+        if self.lost_at is not None:
+            return
+        self.lost_at = time.time()
+        self.last_error = ex
+        self._gap_start = self.last_notification or self.lost_at
+        self._backoff = self.min_backoff
+        self._next_attempt = time.monotonic()
+        logger.warning('%s: transport lost: %r', self.name, ex)
+
+    @property
+    def lost(self):
+        return self.lost_at is not None
+
+    def check(self):
+        '''Detect loss and, when the backoff has expired, make one
+        reconnect attempt. Returns True if the session is up.
+        '''
+        if not self.lost and self.manager is not None \
+           and not self.manager.connected:
+            self._transport_lost()
+        if not self.lost:
+            return True
+        if self._recovering or time.monotonic() < self._next_attempt:
+            return False
+        return self.recover()
+
+    def recover(self):
+        '''One reconnect and resubscribe attempt.'''
+        self._recovering = True
+        self.attempts += 1
+        m = None
+        try:
+            try:
+                if self.manager is not None:
+                    self.manager.close_session()
+            except Exception:
+                pass
+            m = self._connect()
+            subs = self._subscribe(m)
+        except Exception as e:
+            if m is not None:
+                try:
+                    m.close_session()
+                except Exception:
+                    pass
+            self.last_error = e
+            delay = self._backoff * (0.5 + random.random() / 2)
+            self._next_attempt = time.monotonic() + delay
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+            logger.warning('%s: reconnect attempt %d failed (%r), '
+                           'retrying in %.1fs',
+                           self.name, self.attempts, e, delay)
+            return False
+        finally:
+            self._recovering = False
+        self._attach(m)
+        self.subscriptions = subs
+        self.last_reconnect_latency = time.time() - self.lost_at
+        self.reconnects += 1
+        self.attempts = 0
+        self.lost_at = None
+        logger.warning('%s: resubscribed %d subscription(s) %.2fs after '
+                       'transport loss', self.name, len(subs),
+                       self.last_reconnect_latency)
+        return True
+
+    def stats(self):
+        '''Health of the session as a dict, for reporting and alerting.
+        gap_open is how long notifications have currently been missing
+        due to an outage (None when there is no outage).
+        '''
+        gap_open = None
+        if self._gap_start is not None:
+            gap_open = time.time() - self._gap_start
+        return {
+            'name': self.name,
+            'up': not self.lost,
+            'subscriptions': len(self.subscriptions),
+            'reconnects': self.reconnects,
+            'attempts': self.attempts,
+            'gap_open': gap_open,
+            'last_gap': self.last_gap,
+            'total_gap': self.total_gap,
+            'last_reconnect_latency': self.last_reconnect_latency,
+        }
+
+    def close(self):
+        if self.manager is not None:
+            try:
+                self.manager.close_session()
+            except Exception:
+                pass
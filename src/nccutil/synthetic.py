@@ -0,0 +1,384 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import random
+import socket
+import struct
+
+'''Synthetic datasets of any size for scaling tests.
+
+Each dataset is one large list modelled on a YANG module that real
+devices serve, in both its config and its operational form:
+
+    interfaces  ietf-interfaces interface / interfaces-state
+    acl         Cisco-IOS-XE-acl extended ACL entries /
+                Cisco-IOS-XE-acl-oper match counters
+    bgp         openconfig-bgp neighbors, config / state
+
+generate() yields the <data> content for count list entries as byte
+blocks, so a 100k entry reply can be streamed without being built
+whole; data() returns it as one string, and edit_config() returns a
+<config> payload creating the same entries. Counters are drawn from a
+random.Random(seed), so a given dataset, count and seed always
+produce the same bytes:
+
+    payload = edit_config('acl', 50000, operation='create')
+
+The stand-in server (nccutil.standin) serves datasets for get (oper)
+and get-config (config) when a filter contains, e.g.:
+
+    <bench xmlns="urn:ncc:bench" dataset="interfaces" count="100000"/>
+
+capabilities() returns a server capability list of a given size, in
+the proportions of an IOS XE hello (mostly Cisco native models, then
+OpenConfig, IETF and MIB modules), for code that scans capabilities.
+
+Snippet templates can be scaled up too: expand_template() renders a
+template once per entry, formatting {i}, {n}, {ip} and {asn} in the
+params with each entry's values, and merges the renders into one
+<config>. Run this module directly to write a dataset or an expanded
+snippet:
+
+    python -m nccutil.synthetic bgp --count 10000 --edit
+    python -m nccutil.synthetic \\
+        --template snippets-cl/editconfigs/cl-bgp-nbr-create.tmpl \\
+        --count 10000 --params '{"NBR_ID": "{ip}", "REMOTE_AS": "{asn}"}'
+'''
+
+NETCONF_NS = 'urn:ietf:params:xml:ns:netconf:base:1.0'
+
+#
+# entries are formatted in blocks, so that large datasets stream in
+# pieces of about 100KB
+#
+_BLOCK_ENTRIES = 1024
+
+
+def ipv4(i, base='10.0.0.0'):
+    '''The i'th IPv4 address after base.'''
+    value = struct.unpack('!I', socket.inet_aton(base))[0] + i
+    return socket.inet_ntoa(struct.pack('!I', value & 0xffffffff))
+
+
+def _operation(operation):
+    return ' nc:operation="%s"' % operation if operation else ''
+
+
+#
+# Each dataset is a list of count entries: head() and tail() give the
+# containers around the list, and entry() formats one entry.
+#
+class Interfaces(object):
+
+    name = 'interfaces'
+    ns = 'urn:ietf:params:xml:ns:yang:ietf-interfaces'
+    counters = ['in-octets', 'in-unicast-pkts', 'in-discards', 'in-errors',
+                'out-octets', 'out-unicast-pkts', 'out-discards',
+                'out-errors']
+
+    _type = ('<type xmlns:ianaift="urn:ietf:params:xml:ns:yang:iana-if-type">'
+             'ianaift:ethernetCsmacd</type>')
+
+    def head(self, oper):
+        return '<%s xmlns="%s">' % (
+            'interfaces-state' if oper else 'interfaces', self.ns)
+
+    def tail(self, oper):
+        return '</interfaces-state>' if oper else '</interfaces>'
+
+    @staticmethod
+    def intf_name(i):
+        # 48 ports per line card
+        return 'GigabitEthernet%d/0/%d' % (i // 48 + 1, i % 48 + 1)
+
+    def entry(self, i, rnd, oper, operation):
+        name = self.intf_name(i)
+        if oper:
+            stats = ''.join('<%s>%d</%s>' % (c, rnd.getrandbits(40), c)
+                            for c in self.counters)
+            return ('<interface><name>%s</name>%s'
+                    '<admin-status>up</admin-status>'
+                    '<oper-status>%s</oper-status>'
+                    '<phys-address>00:50:56:%02x:%02x:%02x</phys-address>'
+                    '<speed>1000000000</speed>'
+                    '<statistics>%s</statistics></interface>' % (
+                        name, self._type,
+                        'down' if rnd.random() < 0.05 else 'up',
+                        i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff, stats))
+        return ('<interface%s><name>%s</name>'
+                '<description>synthetic interface %d</description>%s'
+                '<enabled>true</enabled>'
+                '<ipv4 xmlns="urn:ietf:params:xml:ns:yang:ietf-ip">'
+                '<address><ip>%s</ip><prefix-length>31</prefix-length>'
+                '</address></ipv4></interface>' % (
+                    _operation(operation), name, i, self._type,
+                    ipv4(2 * i)))
+
+
+class Acl(object):
+
+    name = 'acl'
+    acl_name = 'SYNTHETIC-ACL'
+
+    def head(self, oper):
+        if oper:
+            return ('<access-lists '
+                    'xmlns="http://cisco.com/ns/yang/Cisco-IOS-XE-acl-oper">'
+                    '<access-list><access-control-list-name>%s'
+                    '</access-control-list-name><access-list-entries>'
+                    % self.acl_name)
+        return ('<native xmlns="http://cisco.com/ns/yang/Cisco-IOS-XE-native">'
+                '<ip><access-list>'
+                '<extended xmlns="http://cisco.com/ns/yang/Cisco-IOS-XE-acl">'
+                '<name>%s</name>' % self.acl_name)
+
+    def tail(self, oper):
+        if oper:
+            return '</access-list-entries></access-list></access-lists>'
+        return '</extended></access-list></ip></native>'
+
+    def entry(self, i, rnd, oper, operation):
+        sequence = (i + 1) * 10
+        if oper:
+            return ('<access-list-entry><rule-name>%d</rule-name>'
+                    '<access-list-entries-oper-data>'
+                    '<match-counter>%d</match-counter>'
+                    '</access-list-entries-oper-data></access-list-entry>'
+                    % (sequence, rnd.getrandbits(32)))
+        return ('<access-list-seq-rule%s><sequence>%d</sequence><ace-rule>'
+                '<action>%s</action><protocol>tcp</protocol>'
+                '<ipv4-address>%s</ipv4-address><mask>0.0.0.255</mask>'
+                '<dst-any/><dst-eq>%d</dst-eq>'
+                '</ace-rule></access-list-seq-rule>' % (
+                    _operation(operation), sequence,
+                    'deny' if i % 10 == 9 else 'permit',
+                    ipv4(256 * i), 1024 + i % 60000))
+
+
+class Bgp(object):
+
+    name = 'bgp'
+    local_as = 65000
+
+    def head(self, oper):
+        kind = 'state' if oper else 'config'
+        return ('<bgp xmlns="http://openconfig.net/yang/bgp"><global><%s>'
+                '<as>%d</as><router-id>192.0.2.1</router-id></%s></global>'
+                '<neighbors>' % (kind, self.local_as, kind))
+
+    def tail(self, oper):
+        return '</neighbors></bgp>'
+
+    @staticmethod
+    def peer_as(i):
+        # private AS numbers
+        return 64512 + i % 1000
+
+    def entry(self, i, rnd, oper, operation):
+        address = ipv4(i, base='172.16.0.0')
+        if oper:
+            messages = ''.join(
+                '<%s><UPDATE>%d</UPDATE><NOTIFICATION>%d</NOTIFICATION>'
+                '</%s>' % (d, rnd.getrandbits(24), rnd.getrandbits(2), d)
+                for d in ('sent', 'received'))
+            return ('<neighbor><neighbor-address>%s</neighbor-address>'
+                    '<state><neighbor-address>%s</neighbor-address>'
+                    '<peer-as>%d</peer-as>'
+                    '<session-state>%s</session-state>'
+                    '<messages>%s</messages></state></neighbor>' % (
+                        address, address, self.peer_as(i),
+                        'ACTIVE' if rnd.random() < 0.02 else 'ESTABLISHED',
+                        messages))
+        return ('<neighbor%s><neighbor-address>%s</neighbor-address>'
+                '<config><neighbor-address>%s</neighbor-address>'
+                '<peer-as>%d</peer-as>'
+                '<description>synthetic peer %d</description>'
+                '</config></neighbor>' % (
+                    _operation(operation), address, address,
+                    self.peer_as(i), i))
+
+
+DATASETS = dict((d.name, d) for d in (Interfaces(), Acl(), Bgp()))
+
+
+def _dataset(name):
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise ValueError('unknown dataset %s (one of %s)' % (
+            name, ', '.join(sorted(DATASETS))))
+
+
+def generate(name, count, oper=False, seed=0, operation=None):
+    '''Yield the dataset's containers and count entries as UTF-8 byte
+    blocks. operation, e.g. "create", is set on every config entry.
+    '''
+    dataset = _dataset(name)
+    rnd = random.Random(seed)
+    yield dataset.head(oper).encode()
+    for start in range(0, count, _BLOCK_ENTRIES):
+        yield ''.join(dataset.entry(i, rnd, oper, operation)
+                      for i in range(start, min(start + _BLOCK_ENTRIES,
+                                                count))).encode()
+    yield dataset.tail(oper).encode()
+
+
+def data(name, count, oper=False, seed=0):
+    '''The dataset as a <data> element, as in a get or get-config
+    reply.
+    '''
+    return '<data xmlns="%s">%s</data>' % (
+        NETCONF_NS,
+        b''.join(generate(name, count, oper=oper, seed=seed)).decode())
+
+
+def edit_config(name, count, operation=None, seed=0):
+    '''An edit-config <config> payload with count entries.'''
+    return '<config xmlns="%s" xmlns:nc="%s">%s</config>' % (
+        NETCONF_NS, NETCONF_NS,
+        b''.join(generate(name, count, seed=seed,
+                          operation=operation)).decode())
+
+
+#
+# the base capabilities, and module name stems and suffixes from which
+# module capabilities are made
+#
+_BASE_CAPABILITIES = [
+    'urn:ietf:params:netconf:base:1.0',
+    'urn:ietf:params:netconf:base:1.1',
+    'urn:ietf:params:netconf:capability:writable-running:1.0',
+    'urn:ietf:params:netconf:capability:xpath:1.0',
+    'urn:ietf:params:netconf:capability:validate:1.0',
+    'urn:ietf:params:netconf:capability:validate:1.1',
+    'urn:ietf:params:netconf:capability:rollback-on-error:1.0',
+    'urn:ietf:params:netconf:capability:notification:1.0',
+    'urn:ietf:params:netconf:capability:interleave:1.0',
+    'urn:ietf:params:netconf:capability:with-defaults:1.0'
+    '?basic-mode=explicit&also-supported=report-all-tagged',
+    'urn:ietf:params:netconf:capability:yang-library:1.0'
+    '?revision=2016-06-21&module-set-id=730825758336af65af9606c071685c05',
+    'urn:ietf:params:netconf:capability:yang-library:1.1'
+    '?revision=2019-01-04&content-id=730825758336af65af9606c071685c05',
+]
+
+_STEMS = ['aaa', 'acl', 'arp', 'bfd', 'bgp', 'cdp', 'crypto', 'dhcp',
+          'eigrp', 'environment', 'flow', 'hsrp', 'igmp', 'interfaces',
+          'ip', 'isis', 'lisp', 'lldp', 'mdt', 'memory', 'mpls', 'nat',
+          'ntp', 'ospf', 'platform', 'policy', 'process-cpu', 'qos',
+          'rip', 'route-map', 'sla', 'snmp', 'spanning-tree', 'switch',
+          'tunnel', 'vlan', 'vrf', 'vrrp', 'wireless', 'zone']
+
+_KINDS = [
+    # (share of modules, namespace and module format)
+    (0.70, 'http://cisco.com/ns/yang/%s', 'Cisco-IOS-XE-%s%s',
+     ['', '-oper', '-cfg', '-rpc', '-types', '-deviation']),
+    (0.10, 'http://openconfig.net/yang/%s', 'openconfig-%s%s',
+     ['', '-types', '-policy', '-ext']),
+    (0.10, 'urn:ietf:params:xml:ns:yang:%s', 'ietf-%s%s',
+     ['', '-types', '-state']),
+    (0.10, 'urn:ietf:params:xml:ns:yang:smiv2:%s', '%s-MIB%s',
+     ['', '-EXT', '-CAPABILITY']),
+]
+
+
+def capabilities(count=1200, seed=0):
+    '''A server capability list of about count capabilities.'''
+    rnd = random.Random(seed)
+    caps = list(_BASE_CAPABILITIES)
+    modules = max(0, count - len(caps))
+    for share, ns, fmt, suffixes in _KINDS:
+        for i in range(int(modules * share)):
+            stem = _STEMS[i % len(_STEMS)]
+            suffix = suffixes[i // len(_STEMS) % len(suffixes)]
+            module = fmt % (stem.upper() if 'MIB' in fmt else stem, suffix)
+            generation = i // (len(_STEMS) * len(suffixes))
+            if generation:
+                module += '-%d' % generation
+            cap = '%s?module=%s&revision=20%02d-%02d-01' % (
+                ns % module, module, rnd.randint(15, 25), rnd.randint(1, 12))
+            if rnd.random() < 0.1:
+                cap += '&features=%s-stats,%s-config' % (stem, stem)
+            if rnd.random() < 0.05:
+                cap += '&deviations=%s-deviation' % module
+            caps.append(cap)
+    return caps
+
+
+def entry_params(params, i):
+    '''params with {i} (0-based), {n} (1-based), {ip} and {asn} in its
+    string values replaced by entry i's values.
+    '''
+    fields = {'i': i, 'n': i + 1, 'ip': ipv4(i, base='172.16.0.0'),
+              'asn': Bgp.peer_as(i)}
+    return dict((k, v.format(**fields) if isinstance(v, str) else v)
+                for k, v in params.items())
+
+
+def expand_template(tmpl, count, params=None):
+    '''Render a jinja2 snippet template count times, with params
+    formatted for each entry by entry_params(), and return the merged
+    <config> as a string.
+    '''
+    from lxml import etree
+    from nccutil.paramstream import merge_configs
+    params = params or {}
+    merged = merge_configs(
+        etree.fromstring(tmpl.render(entry_params(params, i)))
+        for i in range(count))
+    return etree.tostring(merged).decode()
+
+
+if __name__ == '__main__':
+    import json
+    import os
+    import sys
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description='Synthetic dataset parameters:')
+    parser.add_argument('dataset', type=str, nargs='?',
+                        choices=sorted(DATASETS),
+                        help="Dataset to write")
+    parser.add_argument('--count', type=int, default=1000,
+                        help="Number of list entries (default 1000)")
+    parser.add_argument('--oper', action='store_true',
+                        help="Write the operational form of the dataset")
+    parser.add_argument('--edit', action='store_true',
+                        help="Write an edit-config <config> payload")
+    parser.add_argument('--operation', type=str,
+                        help="With --edit, the nc:operation of each entry")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="Seed for counters (default 0)")
+    parser.add_argument('--template', type=str,
+                        help="Expand this snippet template instead of a "
+                        "dataset")
+    parser.add_argument('--params', type=str, default='{}',
+                        help="JSON params for --template; {i}, {n}, {ip} "
+                        "and {asn} are formatted per entry")
+    parser.add_argument('--output', type=str,
+                        help="Write to this file (default stdout)")
+    args = parser.parse_args()
+
+    if not args.dataset and not args.template:
+        parser.error('a dataset or --template is required')
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        if args.template:
+            from jinja2 import Environment
+            from jinja2 import FileSystemLoader
+            env = Environment(loader=FileSystemLoader(
+                os.path.dirname(os.path.abspath(args.template))))
+            tmpl = env.get_template(os.path.basename(args.template))
+            out.write(expand_template(tmpl, args.count,
+                                      json.loads(args.params)))
+        elif args.edit:
+            out.write(edit_config(args.dataset, args.count,
+                                  operation=args.operation, seed=args.seed))
+        else:
+            out.write(data(args.dataset, args.count, oper=args.oper,
+                           seed=args.seed))
+        out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
@@ -0,0 +1,195 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+'''Per-phase timing for the ncc scripts.
+
+A PhaseTimer accumulates wall time and a count per named phase:
+
+    timer = PhaseTimer()
+    with timer.phase('connect'):
+        m = connect(device)
+    with rpc_timing(timer):
+        reply = m.get_config(source='running')
+    timer.report()
+
+rpc_timing() hooks ncclient for the duration of the block and splits
+every RPC into where its time went:
+
+    rpc-build    building the request XML (ours)
+    rpc-send     handing the request to the session (ours/SSH)
+    rpc-wait     request sent to reply framed, i.e. the device plus
+                 SSH transfer both ways
+    reply-parse  parsing the reply XML and checking for rpc-errors
+                 (ours)
+
+so a slow operation can be pinned on the device, SSH or our own XML
+handling. profile() wraps a block in cProfile or pyinstrument for a
+function-level view of our own code.
+'''
+
+RPC_PHASES = ['rpc-build', 'rpc-send', 'rpc-wait', 'reply-parse']
+
+
+class PhaseTimer(object):
+    '''Accumulated time and count per phase, in the order phases were
+    first seen. Safe to add to from ncclient's session threads. info
+    holds other figures for the report, e.g. bytes on the wire.
+    '''
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.info = {}
+        self.totals = {}
+        self.counts = {}
+        self.order = []
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            if name not in self.totals:
+                self.order.append(name)
+                self.totals[name] = 0.0
+                self.counts[name] = 0
+            self.totals[name] += seconds
+            self.counts[name] += 1
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def as_dict(self):
+        '''Phases as a dict, with the wall time since the timer was
+        created. Times are in milliseconds.
+        '''
+        return {
+            'wall_ms': (time.perf_counter() - self.start) * 1000,
+            'info': dict(self.info),
+            'phases': [{
+                'phase': name,
+                'count': self.counts[name],
+                'total_ms': self.totals[name] * 1000,
+                'mean_ms': self.totals[name] * 1000 / self.counts[name],
+            } for name in self.order],
+        }
+
+    def report(self, file=sys.stderr, format='table'):
+        '''Print the phases as a table or as JSON.'''
+        d = self.as_dict()
+        if format == 'json':
+            print(json.dumps(d, indent=2), file=file)
+            return
+        wall = d['wall_ms']
+        print('%-16s %6s %12s %12s %7s' % (
+            'Phase', 'Count', 'Total(ms)', 'Mean(ms)', 'Wall%'), file=file)
+        for p in d['phases']:
+            print('%-16s %6d %12.3f %12.3f %6.1f%%' % (
+                p['phase'], p['count'], p['total_ms'], p['mean_ms'],
+                100.0 * p['total_ms'] / wall if wall else 0.0), file=file)
+        print('%-16s %6s %12.3f' % ('wall', '', wall), file=file)
+        for name, value in d['info'].items():
+            print('%s: %s' % (name, value), file=file)
+
+
+@contextmanager
+def rpc_timing(timer):
+    '''Split the time of every ncclient RPC made in the block into
+    RPC_PHASES, added to timer. Hooks the ncclient classes, so it
+    covers every session, and restores them on exit.
+    '''
+    from ncclient.operations.rpc import RPC
+    from ncclient.operations.rpc import RPCReply
+    from ncclient.transport.session import Session
+
+    wrap = RPC._wrap
+    send = Session.send
+    deliver_reply = RPC.deliver_reply
+    parse = RPCReply.parse
+    local = threading.local()
+
+    def timed_wrap(self, subele):
+        start = time.perf_counter()
+        try:
+            return wrap(self, subele)
+        finally:
+            self._ncc_sent = time.perf_counter()
+            local.rpc = self
+            timer.add('rpc-build', self._ncc_sent - start)
+
+    def timed_send(self, message):
+        start = time.perf_counter()
+        try:
+            return send(self, message)
+        finally:
+            end = time.perf_counter()
+            timer.add('rpc-send', end - start)
+            rpc = getattr(local, 'rpc', None)
+            if rpc is not None:
+                # the wait is counted from when the send returned
+                rpc._ncc_sent = end
+                local.rpc = None
+
+    def timed_deliver_reply(self, raw):
+        sent = getattr(self, '_ncc_sent', None)
+        if sent is not None:
+            timer.add('rpc-wait', time.perf_counter() - sent)
+        return deliver_reply(self, raw)
+
+    def timed_parse(self):
+        if self._parsed:
+            return parse(self)
+        start = time.perf_counter()
+        try:
+            return parse(self)
+        finally:
+            timer.add('reply-parse', time.perf_counter() - start)
+
+    RPC._wrap = timed_wrap
+    Session.send = timed_send
+    RPC.deliver_reply = timed_deliver_reply
+    RPCReply.parse = timed_parse
+    try:
+        yield timer
+    finally:
+        RPC._wrap = wrap
+        Session.send = send
+        RPC.deliver_reply = deliver_reply
+        RPCReply.parse = parse
+
+
+@contextmanager
+def profile(kind, file=sys.stderr, limit=25):
+    '''Run the block under a Python profiler, kind being "cprofile" or
+    "pyinstrument" (which must be installed), and print the result.
+    '''
+    if kind == 'pyinstrument':
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            print(profiler.output_text(unicode=True, color=False), file=file)
+    elif kind == 'cprofile':
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            stats = pstats.Stats(profiler, stream=file)
+            stats.sort_stats('cumulative').print_stats(limit)
+    else:
+        raise ValueError('unknown profiler %r' % kind)
@@ -3,8 +3,9 @@
 # dynamically. This is the same as in ncc-establish-subscription.py.
 #
 from lxml import etree
+from nccutil.notifdecoder import NotificationDecoder
+from nccutil.notifdecoder import split_xpath
 import json
-import jxmlease
 import redis
 import time
 
@@ -15,6 +16,14 @@ import time
 conn = redis.Redis()
 
 
+#
+# the events logged are CPU usage processes, which is what we decode
+# whatever xpaths are subscribed
+#
+CPU_USAGE_PROCESS_XPATH = '/cpu-usage/cpu-utilization/cpu-usage-processes/cpu-usage-process'
+decoder = NotificationDecoder(CPU_USAGE_PROCESS_XPATH)
+
+
 #
 # log an "event"
 #
@@ -35,7 +44,16 @@ def log_items(rx_time, events):
 # subscribed to.
 #
 def init(xpaths):
-    pass
+    #
+    # only cpu-usage-process rows are logged, so the subscription has to
+    # cover them
+    #
+    rows = [name for name, _ in split_xpath(CPU_USAGE_PROCESS_XPATH)]
+    for xpath in xpaths or []:
+        names = [name for name, _ in split_xpath(xpath)]
+        if rows[:len(names)] != names:
+            print('Subscription %s has no %s rows, they are not logged'
+                  % (xpath, CPU_USAGE_PROCESS_XPATH))
 
 #
 # the callback for subscription events
@@ -46,17 +64,11 @@ def callback(notif):
     print('Event time      : %s' % notif.event_time)
     print('Subscription Id : %d' % notif.subscription_id)
     print('Type            : %d' % notif.type)
-    j = jxmlease.parse(notif.datastore_xml)
-    try:
-        cpu_usage_process = j["datastore-contents-xml"]["cpu-usage"]["cpu-utilization"]["cpu-usage-processes"]["cpu-usage-process"]
-        if isinstance(cpu_usage_process, dict):
-            log_items(rx_time, [cpu_usage_process])
-        elif isinstance(cpu_usage_process, list):
-            log_items(rx_time, cpu_usage_process)
-        else:
-            print('Event is unknown!')
-    except e:
-        print(e)
+    events = decoder.decode(notif.datastore_ele)
+    if len(events) > 0:
+        log_items(rx_time, events)
+    else:
+        print('Event is unknown!')
     print('<<--')
 
 
@@ -2,11 +2,11 @@
 # Simple sample module showing a way to register a callback
 # dynamically. This is the same as in ncc-establish-subscription.py.
 #
+from nccutil.notifdecoder import NotificationDecoder
+from nccutil.notifdecoder import split_xpath
 import json
-import jxmlease
 import redis
 import time
-import re
 
 
 #
@@ -15,9 +15,12 @@ import re
 conn = redis.Redis()
 
 #
-# Match only digits
+# the events published are CPU usage processes, which is what we
+# decode whatever xpaths are subscribed; the decoder already turns
+# digit-only leaves into ints
 #
-d = re.compile('^\d+$')
+CPU_USAGE_PROCESS_XPATH = '/cpu-usage/cpu-utilization/cpu-usage-processes/cpu-usage-process'
+decoder = NotificationDecoder(CPU_USAGE_PROCESS_XPATH)
 
 #
 # Publish a stats event in JSON on a Redis channel called 'yangpush'.
@@ -25,9 +28,6 @@ d = re.compile('^\d+$')
 def log_items(rx_time, events):
     for event in events:
         id = conn.incr('cpu_usage:id')
-        for k, v in event.items():
-            if isinstance(v, str) and d.match(v):
-                event[k] = int(v)
         event['id'] = id
         event['timestamp'] = rx_time
         event_json = json.dumps(event)
@@ -40,7 +40,16 @@ def log_items(rx_time, events):
 # subscribed to.
 #
 def init(xpaths):
-    pass
+    #
+    # only cpu-usage-process rows are published, so the subscription has to
+    # cover them
+    #
+    rows = [name for name, _ in split_xpath(CPU_USAGE_PROCESS_XPATH)]
+    for xpath in xpaths or []:
+        names = [name for name, _ in split_xpath(xpath)]
+        if rows[:len(names)] != names:
+            print('Subscription %s has no %s rows, they are not published'
+                  % (xpath, CPU_USAGE_PROCESS_XPATH))
 
 
 #
@@ -52,23 +61,11 @@ def callback(notif):
     print('Event time      : %s' % notif.event_time)
     print('Subscription Id : %d' % notif.subscription_id)
     print('Type            : %d' % notif.type)
-    j = jxmlease.parse(notif.datastore_xml)
-    try:
-        #cpu_usage_process = j["datastore-contents-xml"]["cpu-usage"]["cpu-utilization"]["cpu-usage-processes"]["cpu-usage-process"]
-        cpu_usage_process = j.get(
-            "datastore-contents-xml").get(
-                "cpu-usage").get(
-                    "cpu-utilization").get(
-                        "cpu-usage-processes").get(
-                            "cpu-usage-process")
-        if isinstance(cpu_usage_process, dict):
-            log_items(rx_time, [cpu_usage_process])
-        elif isinstance(cpu_usage_process, list):
-            log_items(rx_time, cpu_usage_process)
-        else:
-            print('Event is unknown!')
-    except e:
-        print(e)
+    events = decoder.decode(notif.datastore_ele)
+    if len(events) > 0:
+        log_items(rx_time, events)
+    else:
+        print('Event is unknown!')
     print('<<--')
 
 
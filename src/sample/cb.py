@@ -3,15 +3,23 @@
 # dynamically. This is the same as in ncc-establish-subscription.py.
 #
 from lxml import etree
+from nccutil.notifdecoder import NotificationDecoder
 import json
-import jxmlease
+
+#
+# decoder compiled from the subscribed xpaths in init(), dumping the
+# whole tree below each row
+#
+decoder = None
+
 
 #
 # If we need to do any pre-analysis based on xpaths that will be
 # subscribed to.
 #
 def init(xpaths):
-    pass
+    global decoder
+    decoder = NotificationDecoder(xpaths, nested=True)
 
 
 def callback(notif):
@@ -20,8 +28,8 @@ def callback(notif):
     print('Subscription Id : %d' % notif.subscription_id)
     print('Type            : %d' % notif.type)
     print('Data            :')
-    j = jxmlease.parse(notif.datastore_xml)
-    print(json.dumps(j, indent=2, sort_keys=True))
+    rows = decoder.decode(notif.datastore_ele)
+    print(json.dumps(rows, indent=2, sort_keys=True))
     print('<<--')
 
 
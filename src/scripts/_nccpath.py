@@ -0,0 +1,12 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+# Imported first by the scripts in this directory that use the ncc
+# package. Run as "python scripts/<script>.py", this directory is first
+# on sys.path, and ncc.py in it would otherwise shadow the package.
+#
+import os
+import sys
+
+_here = os.path.dirname(os.path.realpath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.realpath(p or '.') != _here]
@@ -3,34 +3,33 @@
 # Copyright (c) 2018 Cisco and/or its affiliates
 #
 from __future__ import print_function
+import asyncio
 import json
-import logging
 import os
 import re
-import shutil
 import sys
-import tempfile
+import time
 
 from argparse import ArgumentParser
-from git import Repo
 from jinja2 import Environment
 from jinja2 import FileSystemLoader
 from jinja2 import StrictUndefined
 from jinja2 import meta
 from jinja2.exceptions import UndefinedError
 from lxml import etree
-from ncclient import manager
 from ncclient.operations.rpc import RPCError
 
-#
-# Add things people want logged here. Just various netconf things for
-# now. SSH disabled as it is just too much right now.
-#
-LOGGING_TO_ENABLE = [
-    'ncclient.transport.ssh',
-    'ncclient.transport.session',
-    'ncclient.operations.rpc'
-]
+# keeps ncc.py here from shadowing the ncc package
+import _nccpath  # noqa: F401
+
+from ncc import AsyncSession
+from ncc import Device
+from ncc import Limits
+from ncc import SessionPool
+from ncc import connect
+from ncc import datastores
+from ncc import enable_logging
+from nccutil.collector import load_inventory
 
 #
 # Repository to clone snippets from
@@ -44,12 +43,6 @@ ns_dict = {
     'nc': 'urn:ietf:params:xml:ns:netconf:base:1.0'
 }
 
-#
-# Capability constants
-#
-NC_WRITABLE_RUNNING = 'urn:ietf:params:netconf:capability:writable-running:1.0'
-NC_CANDIDATE = 'urn:ietf:params:netconf:capability:candidate:1.0'
-
 #
 # By default, don't support writeable-running or candidate configs
 #
@@ -199,9 +192,10 @@ def cook_xpath(xpath):
     return filter_template % (namespaces, xpath)
 
 
-def do_templates(m, t_list, default_op='merge', **kwargs):
+async def do_templates(s, t_list, default_op='merge', **kwargs):
     """Execute a list of templates, using the kwargs passed in to
-    complete the rendering.
+    complete the rendering. Edits are applied in order, one at a time,
+    so that a failed edit stops the sequence.
     """
 
     for tmpl in t_list:
@@ -214,38 +208,33 @@ def do_templates(m, t_list, default_op='merge', **kwargs):
             exit(1)
 
         if CANDIDATE:
-            m.edit_config(data,
-                          format='xml',
-                          target='candidate',
-                          default_operation=default_op)
+            await s.edit_config(data,
+                                format='xml',
+                                target='candidate',
+                                default_operation=default_op)
         elif RUNNING:
-            m.edit_config(data,
-                          format='xml',
-                          target='running',
-                          default_operation=default_op)
+            await s.edit_config(data,
+                                format='xml',
+                                target='running',
+                                default_operation=default_op)
     if CANDIDATE:
-        m.commit()
+        await s.commit()
 
 
-def get_running_config(m, filter=None, xpath=None):
+async def get_running_config(s, filter=None, xpath=None):
     """
     Get running config with a passed in filter. If both types of filter
     are passed in for some reason, the subtree filter "wins". When an
     xpath filter is passed in, it is assumed to be the fully created
     XML, and so is not passed to ncclient using the tuple syntax.
     """
-    m.async_mode = True
     if filter and len(filter) > 0:
-        rpc = m.get_config(source='running', filter=('subtree', filter))
+        c = await s.get_config(source='running', filter=('subtree', filter))
     elif xpath and len(xpath) > 0:
-        rpc = m.get_config(source='running', filter=xpath)
+        c = await s.get_config(source='running', filter=xpath)
     else:
-        rpc = m.get_config(source='running')
-
-    rpc.event.wait()
-    rpc.event.wait()
-    c = rpc.reply
-    print(etree.tostring(c.data, pretty_print=True).decode('UTF-8'))
+        c = await s.get_config(source='running')
+    return etree.tostring(c.data, pretty_print=True).decode('UTF-8')
 
 
 def get_running_config_original(m, filter=None, xpath=None):
@@ -264,15 +253,6 @@ def get_running_config_original(m, filter=None, xpath=None):
     print(etree.tostring(c.data, pretty_print=True).decode('UTF-8'))
 
 
-def install_snippets(target_dir='.'):
-    localdir = tempfile.mkdtemp()
-    Repo.clone_from(REPO_URL, localdir)
-    for entry in os.listdir(localdir):
-        if entry.startswith('snippets'):
-            shutil.move(localdir + '/' + entry, target_dir)
-    shutil.rmtree(localdir)
-
-
 def display_env_vars():
     print('export NCC_HOST=127.0.0.1    # --host')
     print('export NCC_PORT=2223         # --port')
@@ -280,7 +260,7 @@ def display_env_vars():
     print('export NCC_PASSWORD=vagrant  # --password\n')
 
 
-def get(m, filter=None, xpath=None):
+async def get(s, filter=None, xpath=None):
     """
     Get state with a passed in filter. If both types of filter are
     passed in for some reason, the subtree filter "wins". When an
@@ -288,14 +268,101 @@ def get(m, filter=None, xpath=None):
     XML, and so is not passed to ncclient using the tuple syntax.
     """
     if filter and len(filter) > 0:
-        c = m.get(filter=('subtree', filter))
+        c = await s.get(filter=('subtree', filter))
     elif xpath and len(xpath) > 0:
-        c = m.get(filter=xpath)
+        c = await s.get(filter=xpath)
     else:
-        print("Need a filter for oper get!")
-        return
+        return "Need a filter for oper get!"
     # Python3 will see this as a byte string
-    print(etree.tostring(c.data, pretty_print=True).decode('UTF-8'))
+    return etree.tostring(c.data, pretty_print=True).decode('UTF-8')
+
+
+async def collect(s, op, filters, xpath):
+    """Run op once per filter (or once for the xpath), all issued
+    concurrently within the session's window, and return the results
+    in order.
+    """
+    if isinstance(filters, list):
+        coros = [op(s, filter=f, xpath=None) for f in filters]
+    else:
+        coros = [op(s, filter=filters, xpath=xpath)]
+    return await asyncio.gather(*coros)
+
+
+async def run_all(s, op, filters, xpath):
+    for result in await collect(s, op, filters, xpath):
+        print(result)
+
+
+async def run_inventory(devices, limits, op, filters, xpath):
+    """Run op with the filters against every device from one event
+    loop, within limits, then print each device's results and a
+    summary.
+    """
+    pool = SessionPool(limits)
+    start = time.perf_counter()
+
+    async def one(s, device):
+        if limits.channels > 1 and isinstance(filters, list):
+            # spread the filters over the device's channels
+            async def each(f):
+                s = await pool.session(device)
+                return (await collect(s, op, [f], xpath))[0]
+            return await asyncio.gather(*[each(f) for f in filters])
+        return await collect(s, op, filters, xpath)
+
+    try:
+        results = await pool.run(devices, one)
+    finally:
+        await pool.close()
+    elapsed = time.perf_counter() - start
+    failed = 0
+    for name in sorted(results):
+        print('==> %s' % name)
+        if isinstance(results[name], Exception):
+            failed += 1
+            print('error: %r' % results[name])
+            continue
+        for result in results[name]:
+            print(result)
+    print('%d device(s), %d failed, %.2fs' % (
+        len(results), failed, elapsed), file=sys.stderr)
+
+
+def benchmark(m, count, windows, filter=None, xpath=None):
+    """Time count get-config RPCs issued one at a time through the
+    synchronous manager, then through AsyncSession with each window
+    size, and print the throughput of each.
+    """
+    if isinstance(filter, list):
+        filter = filter[0]
+    kw = {}
+    if filter:
+        kw['filter'] = ('subtree', filter)
+    elif xpath:
+        kw['filter'] = xpath
+
+    start = time.perf_counter()
+    for _ in range(count):
+        m.get_config(source='running', **kw)
+    sync_elapsed = time.perf_counter() - start
+    print('%-12s %8s %10s %10s %8s' % (
+        'Mode', 'RPCs', 'Elapsed(s)', 'RPC/s', 'Speedup'))
+    print('%-12s %8d %10.3f %10.1f %8s' % (
+        'sync', count, sync_elapsed, count / sync_elapsed, '1.00x'))
+
+    async def run(window):
+        s = AsyncSession(m, window=window)
+        start = time.perf_counter()
+        await asyncio.gather(*[s.get_config(source='running', **kw)
+                               for _ in range(count)])
+        return time.perf_counter() - start
+
+    for window in windows:
+        elapsed = asyncio.run(run(window))
+        print('%-12s %8d %10.3f %10.1f %7.2fx' % (
+            'window=%d' % window, count, elapsed, count / elapsed,
+            sync_elapsed / elapsed))
 
 
 if __name__ == '__main__':
@@ -333,6 +400,26 @@ if __name__ == '__main__':
     parser.add_argument('--device-type', type=str, default=None,
                          help="The device type to pass to ncclient "
                          "(default: None)")
+    parser.add_argument('--window', type=int, default=8,
+                        help="Maximum RPCs outstanding on the session at "
+                        "once (default 8)")
+
+    #
+    # Many devices from one event loop
+    #
+    parser.add_argument('--inventory', type=str,
+                        help="Run --get-running or --get-oper against every "
+                        "device in this inventory file; JSON list of "
+                        "devices, or one host[:port] per line")
+    parser.add_argument('--max-devices', type=int, default=100,
+                        help="Devices worked on at once with --inventory "
+                        "(default 100)")
+    parser.add_argument('--max-connects', type=int, default=16,
+                        help="Connection setups at once with --inventory "
+                        "(default 16)")
+    parser.add_argument('--channels', type=int, default=1,
+                        help="NETCONF sessions per device with --inventory, "
+                        "multiplexed over one SSH connection (default 1)")
 
     #
     # Where we want to source snippets from
@@ -342,6 +429,16 @@ if __name__ == '__main__':
                             'NCC_SNIPPETS', "%s/snippets" % NCC_DIR),
                         help="Directory where 'snippets' can be found; "
                         "default is location of script")
+    parser.add_argument('--snippets-source', type=str,
+                        default=os.environ.get('NCC_SNIPPETS_SOURCE',
+                                               REPO_URL),
+                        help="Where --install-snippets fetches from; a git "
+                        "URL (sparse, shallow clone), a .tar.gz archive "
+                        "path or URL, or a local directory (default %s)"
+                        % REPO_URL)
+    parser.add_argument('--prune-snippets', action='store_true',
+                        help="With --install-snippets, remove installed "
+                        "files that are no longer in the source")
 
     #
     # specify a list of namespaces
@@ -380,8 +477,9 @@ if __name__ == '__main__':
     g.add_argument('--env', action='store_true',
                    help="Display environment variables a user can set.")
     g.add_argument('--install-snippets', action='store_true',
-                   help="Use git to obtain the snippets from GitHub and copy "
-                   "to the current directory")
+                   help="Fetch just the snippets directories from "
+                   "--snippets-source and install them in the current "
+                   "directory, updating only changed files")
     g.add_argument('-c', '--capabilities', action='store_true',
                    help="Display capabilities of the device.")
     g.add_argument('--is-supported', type=str,
@@ -406,6 +504,10 @@ if __name__ == '__main__':
                    "support, ALL operations will be attempted.")
     g.add_argument('-w', '--where', action='store_true',
                    help="Print where script is and exit")
+    g.add_argument('--benchmark', type=int, metavar='COUNT',
+                   help="Time COUNT get-config RPCs (with any filter "
+                   "given) synchronously, then concurrently with windows "
+                   "of 1, 2, 4, ... up to --window")
 
     #
     # Finally, parse the arguments!
@@ -423,7 +525,8 @@ if __name__ == '__main__':
     # install the snippets to the current directory
     #
     if args.install_snippets:
-        install_snippets()
+        from nccutil.snippets import install_snippets
+        install_snippets(args.snippets_source, prune=args.prune_snippets)
         sys.exit(0)
 
     #
@@ -450,11 +553,7 @@ if __name__ == '__main__':
     # If the user specified verbose logging, set it up.
     #
     if args.verbose:
-        handler = logging.StreamHandler()
-        for l in LOGGING_TO_ENABLE:
-            logger = logging.getLogger(l)
-            logger.addHandler(handler)
-            logger.setLevel(logging.DEBUG)
+        enable_logging()
 
     #
     # set up various keyword arguments that have specific arguments
@@ -512,65 +611,74 @@ if __name__ == '__main__':
             exit(1)
 
     #
-    # Could use this extra param instead of the last four arguments
-    # specified below:
-    #
-    # device_params={'name': 'iosxr'}
-    #
-    def unknown_host_cb(host, fingerprint):
-        return True
-
-    device_params = {}
-    if args.device_type is not None:
-        device_params = {'name': args.device_type}
+    # Inventory mode; one event loop, a pool of sessions
+    #
+    if args.inventory:
+        if not (args.get_running or args.get_oper):
+            parser.error('--inventory needs --get-running or --get-oper')
+        devices = load_inventory(args.inventory, defaults={
+            'port': args.port,
+            'username': args.username,
+            'password': args.password,
+            'device_type': args.device_type,
+            'timeout': args.timeout,
+        })
+        limits = Limits(max_devices=args.max_devices,
+                        max_connects=args.max_connects,
+                        window=args.window,
+                        channels=args.channels,
+                        per_device=args.channels)
+        op = get_running_config if args.get_running else get
+        asyncio.run(run_inventory(devices, limits, op,
+                                  args.filter, args.xpath))
+        sys.exit(0)
 
-    m = manager.connect(host=args.host,
-                        port=args.port,
-                        timeout=args.timeout,
-                        username=args.username,
-                        password=args.password,
-                        allow_agent=False,
-                        look_for_keys=False,
-                        hostkey_verify=False,
-                        device_params=device_params,
-                        unknown_host_cb=unknown_host_cb)
+    m = connect(Device(args.host,
+                       port=args.port,
+                       username=args.username,
+                       password=args.password,
+                       device_type=args.device_type,
+                       timeout=args.timeout))
 
     #
     # Extract the key capabilities that determine how we interact with
     # the device. This script will prefer using candidate config.
     #
-    if NC_WRITABLE_RUNNING in m.server_capabilities:
-        RUNNING = True
-    if NC_CANDIDATE in m.server_capabilities:
-        CANDIDATE = True
+    RUNNING, CANDIDATE = datastores(m)
 
     #
     # Main operations
     #
     # TODO: get_running/get_oper are a bit samey, could be done better
     #
+    # Multiple named filters are fetched concurrently, up to --window
+    # RPCs outstanding at once on the one session.
+    #
+    s = AsyncSession(m, window=args.window)
     if args.get_running:
-        if isinstance(args.filter, list):
-            for f in args.filter:
-                get_running_config(m, filter=f, xpath=None)
-        else:
-            get_running_config(m, xpath=args.xpath, filter=args.filter)
+        asyncio.run(run_all(s, get_running_config, args.filter, args.xpath))
 
     elif args.get_oper:
-        if isinstance(args.filter, list):
-            for f in args.filter:
-                get(m, filter=f, xpath=None)
-        else:
-            get(m, filter=args.filter, xpath=args.xpath)
+        asyncio.run(run_all(s, get, args.filter, args.xpath))
+
+    elif args.benchmark:
+        windows = []
+        window = 1
+        while window < args.window:
+            windows.append(window)
+            window *= 2
+        windows.append(args.window)
+        benchmark(m, args.benchmark, windows,
+                  filter=args.filter, xpath=args.xpath)
 
     elif args.do_edits:
         try:
-            do_templates(
-                m,
+            asyncio.run(do_templates(
+                s,
                 [named_templates.get_template('%s.tmpl' % t)
                   for t in args.do_edits],
                 default_op=args.default_op,
-                **kwargs)
+                **kwargs))
         except RPCError as e:
             print("RPC Error")
             print("---------")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+# Collector mode for telemetry: hold subscriptions to every device in
+# an inventory from one process, instead of one
+# ncc-establish-subscription.py or ncc-event-listener.py per device.
+# All notifications feed a shared callback pipeline, and per-device
+# notification rates are reported periodically on stderr.
+#
+import importlib
+import logging
+import os
+import signal
+import sys
+import time
+
+from argparse import ArgumentParser
+from lxml import etree
+
+# keeps ncc.py here from shadowing the ncc package
+import _nccpath  # noqa: F401
+
+from nccutil.collector import CallbackPipeline
+from nccutil.collector import Collector
+from nccutil.collector import load_inventory
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description='Select your collector parameters:')
+
+    # Input parameters
+    parser.add_argument('--inventory', type=str, required=True,
+                        help="Inventory file; JSON list of devices, or one "
+                        "host[:port] per line")
+    parser.add_argument('-u', '--username', type=str,
+                        default=os.environ.get('NCC_USERNAME', 'cisco'),
+                        help="Default username for devices without one "
+                        "(default 'cisco')")
+    parser.add_argument('-p', '--password', type=str,
+                        default=os.environ.get('NCC_PASSWORD', 'cisco'),
+                        help="Default password for devices without one "
+                        "(default 'cisco')")
+    parser.add_argument('--port', type=int,
+                        default=os.environ.get('NCC_PORT', 830),
+                        help="Default port for devices without one "
+                        "(default 830)")
+    parser.add_argument('--device-type', type=str, default='iosxe',
+                        help="Default ncclient device type (default iosxe)")
+    parser.add_argument('--timeout', type=int, default=60,
+                        help="NETCONF connect timeout in seconds (default 60)")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Exceedingly verbose logging to the console")
+    parser.add_argument('--callback', type=str,
+                        help="Module that a callback is defined in")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Callback pipeline worker threads (default 1)")
+    parser.add_argument('--queue-size', type=int, default=10000,
+                        help="Callback pipeline queue size; notifications "
+                        "are dropped when full (default 10000)")
+    parser.add_argument('--connect-workers', type=int, default=16,
+                        help="Concurrent connection setups (default 16)")
+    parser.add_argument('--reconnect', action='store_true',
+                        help="Keep retrying devices that fail or drop, "
+                        "resubscribing on reconnect")
+    parser.add_argument('--max-backoff', type=float, default=60.0,
+                        help="Maximum seconds between reconnect attempts "
+                        "(default 60)")
+    parser.add_argument('--report-interval', type=int, default=10,
+                        help="Seconds between per-device rate reports "
+                        "(default 10)")
+
+    # What to subscribe to
+    parser.add_argument('-x', '--xpaths', type=str, nargs='+',
+                        help="List of xpaths to subscribe to, one or more")
+    parser.add_argument('--streamns', type=str,
+                        help="Namespace for a custom stream identity, "
+                        "e.g. urn:cisco:params:xml:ns:yang:cisco-xe-ietf-yang-push-ext")
+    g = parser.add_mutually_exclusive_group(required=True)
+    g.add_argument('--period', type=int,
+                   help="Period in centiseconds for periodic subscription")
+    g.add_argument('--dampening-period', type=int,
+                   help="Dampening period in centiseconds for on-change subscription")
+    g.add_argument('--streamident', type=str,
+                   help="Custom stream identifier (e.g. yang-notif-native)")
+    g.add_argument('--stream', type=str,
+                   help="RFC 5277 event stream to register on instead of "
+                   "YANG push xpaths")
+
+    args = parser.parse_args()
+    if not args.stream and not args.xpaths:
+        parser.error('--xpaths is required unless --stream is used')
+
+    if args.verbose:
+        handler = logging.StreamHandler()
+        for l in ['ncclient.transport.ssh', 'ncclient.transport.session',
+                  'ncclient.operations.rpc', 'ncc.collector',
+                  'ncc.supervisor']:
+            logger = logging.getLogger(l)
+            logger.addHandler(handler)
+            logger.setLevel(logging.DEBUG)
+
+    #
+    # A really simple default callback, just spit out a header with the
+    # device name plus the XML payload pretty-printed.
+    #
+    def callback(notif):
+        print('-->>')
+        print('(Default Callback)')
+        print('Device          : %s' % notif.device)
+        if hasattr(notif, 'datastore_ele'):
+            print('Event time      : %s' % notif.event_time)
+            print('Subscription Id : %d' % notif.subscription_id)
+            print('Data            :')
+            print(etree.tostring(notif.datastore_ele, pretty_print=True).decode('utf-8'))
+        else:
+            print(etree.tostring(notif.notification_ele, pretty_print=True).decode('utf-8'))
+        print('<<--')
+
+    def errback(notif):
+        pass
+
+    #
+    # Select the callback to use
+    #
+    selected_callback = callback
+    selected_errback = errback
+    if args.callback:
+        module = importlib.import_module(args.callback)
+        getattr(module, 'init')(args.xpaths)
+        selected_callback = getattr(module, 'callback')
+        selected_errback = getattr(module, 'errback')
+
+    devices = load_inventory(args.inventory, defaults={
+        'port': args.port,
+        'username': args.username,
+        'password': args.password,
+        'device_type': args.device_type,
+    })
+
+    pipeline = CallbackPipeline(selected_callback,
+                                errback=selected_errback,
+                                workers=args.workers,
+                                maxsize=args.queue_size)
+    collector = Collector(devices,
+                          pipeline,
+                          xpaths=args.xpaths,
+                          period=args.period,
+                          dampening_period=args.dampening_period,
+                          streamident=args.streamident,
+                          streamns=args.streamns,
+                          stream=args.stream,
+                          connect_workers=args.connect_workers,
+                          timeout=args.timeout,
+                          reconnect=args.reconnect,
+                          max_backoff=args.max_backoff)
+
+    #
+    # set up a ctrl+c handler to tear down all the netconf sessions
+    #
+    def sigint_handler(signal, frame):
+        collector.report()
+        collector.close()
+        sys.exit(0)
+    signal.signal(signal.SIGINT, sigint_handler)
+
+    start = time.time()
+    n = collector.start()
+    print('Connected to %d of %d devices in %.2fs' % (
+        n, len(devices), time.time() - start), file=sys.stderr)
+    for name, e in sorted(collector.failed.items()):
+        print('  %s failed: %r' % (name, e), file=sys.stderr)
+    if n == 0 and not args.reconnect:
+        print('No active subscriptions, exiting.', file=sys.stderr)
+        collector.close()
+        sys.exit(1)
+
+    while True:
+        time.sleep(args.report_interval)
+        collector.report()
@@ -13,6 +13,7 @@ from argparse import ArgumentParser
 from lxml import etree
 from ncclient import manager
 from ncclient.transport.session import SessionListener
+from nccutil.supervisor import SupervisedSession
 
 
 if __name__ == '__main__':
@@ -47,6 +48,23 @@ if __name__ == '__main__':
                         "e.g. urn:cisco:params:xml:ns:yang:cisco-xe-ietf-yang-push-ext")
     parser.add_argument('--callback', type=str,
                         help="Module that a callback is defined in")
+    parser.add_argument('--reconnect', action='store_true',
+                        help="Reconnect and resubscribe if the session is lost")
+    parser.add_argument('--max-backoff', type=float, default=60.0,
+                        help="Maximum seconds between reconnect attempts "
+                        "(default 60)")
+    parser.add_argument('--record', type=str,
+                        help="Directory to append received notifications to, "
+                        "for later replay with ncc-replay.py")
+    parser.add_argument('--record-segment-size', type=int, default=64,
+                        help="Size in MB at which to start a new capture "
+                        "segment (default 64)")
+    parser.add_argument('--metrics-port', type=int,
+                        help="Serve Prometheus metrics on this port at "
+                        "/metrics")
+    parser.add_argument('--metrics-addr', type=str, default='127.0.0.1',
+                        help="Address for the metrics endpoint "
+                        "(default 127.0.0.1)")
     
     g = parser.add_mutually_exclusive_group(required=True)
     g.add_argument('--period', type=int,
@@ -68,25 +86,48 @@ if __name__ == '__main__':
             logger.setLevel(logging.DEBUG)
 
     #
-    # Connect
+    # Optional metrics endpoint: RPC latency, bytes and messages
+    # received, notifications per subscription, callback duration and
+    # reconnects
+    #
+    name = '%s:%s' % (args.host, args.port)
+    exporter = None
+    if args.metrics_port:
+        from nccutil import metrics as exporter
+        exporter.serve(args.metrics_port, addr=args.metrics_addr)
+        exporter.instrument_rpcs()
+
+    #
+    # Connect function, also used to reconnect when --reconnect is set
     #
     def unknown_host_cb(host, fingerprint):
         return True
-    m =  manager.connect(host=args.host,
-                         port=args.port,
-                         username=args.username,
-                         password=args.password,
-                         allow_agent=False,
-                         look_for_keys=False,
-                         hostkey_verify=False,
-                         device_params={'name':'iosxe'},
-                         unknown_host_cb=unknown_host_cb)
+
+    def connect():
+        m = manager.connect(host=args.host,
+                            port=args.port,
+                            username=args.username,
+                            password=args.password,
+                            allow_agent=False,
+                            look_for_keys=False,
+                            hostkey_verify=False,
+                            device_params={'name':'iosxe'},
+                            unknown_host_cb=unknown_host_cb)
+        if exporter:
+            exporter.watch_session(m, name)
+        return m
 
     #
     # set up a ctrl+c handler to tear down the netconf session
     #
+    recorder = None
+    session = None
+
     def sigint_handler(signal, frame):
-        m.close_session()
+        if recorder:
+            recorder.close()
+        if session:
+            session.close()
         sys.exit(0)
     signal.signal(signal.SIGINT, sigint_handler)
 
@@ -128,34 +169,85 @@ if __name__ == '__main__':
         selected_init(args.xpaths)
 
     #
-    # iterate over the list of xpaths and create subscriptions
-    #
-    subs = []
-    for xpath in args.xpaths:
-        s = m.establish_subscription(
-            selected_callback,
-            selected_errback,
-            xpath=xpath,
-            period=args.period,
-            dampening_period=args.dampening_period,
-            streamident=args.streamident,
-            streamns=args.streamns)
-        print('Subscription Result : %s' % s.subscription_result)
-        if s.subscription_result.endswith('ok'):
-            print('Subscription Id     : %d' % s.subscription_id)
-            subs.append(s.subscription_id)
-    if not len(subs):
+    # If recording, wrap the selected callback so every notification
+    # is appended to the capture before it is handled.
+    #
+    if args.record:
+        from nccutil.capture import CaptureWriter
+        recorder = CaptureWriter(
+            args.record,
+            segment_size=args.record_segment_size * 1024 * 1024)
+        handle_callback = selected_callback
+
+        def selected_callback(notif):
+            recorder.write_notification(notif)
+            handle_callback(notif)
+
+    #
+    # iterate over the list of xpaths and create subscriptions; after a
+    # reconnect this is run again for every xpath
+    #
+    def subscribe(m):
+        subs = []
+        for xpath in args.xpaths:
+            s = m.establish_subscription(
+                selected_callback,
+                selected_errback,
+                xpath=xpath,
+                period=args.period,
+                dampening_period=args.dampening_period,
+                streamident=args.streamident,
+                streamns=args.streamns)
+            print('Subscription Result : %s' % s.subscription_result)
+            if s.subscription_result.endswith('ok'):
+                print('Subscription Id     : %d' % s.subscription_id)
+                subs.append(s.subscription_id)
+        if session and session.lost and not len(subs):
+            raise RuntimeError('No subscriptions re-established')
+        return subs
+
+    #
+    # The supervised session detects transport loss; with --reconnect
+    # it reconnects with exponential backoff and resubscribes,
+    # reporting gap and reconnect latency via the ncc.supervisor logger.
+    #
+    if exporter:
+        selected_callback = exporter.instrument_callback(
+            selected_callback, name)
+    session = SupervisedSession(name,
+                                connect,
+                                subscribe,
+                                max_backoff=args.max_backoff)
+    selected_callback = session.wrap(selected_callback)
+    if exporter:
+        exporter.watch_supervised(session)
+    session.start()
+    if not len(session.subscriptions):
         print('No active subscriptions, exiting.')
+        session.close()
         sys.exit(1)
 
+    if args.reconnect:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        logger = logging.getLogger('ncc.supervisor')
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
     #
     # simple forever loop
     #
     if args.delete_after:
         time.sleep(args.delete_after)
-        for s in subs:
-            r = m.delete_subscription(s)
+        for s in session.subscriptions:
+            r = session.manager.delete_subscription(s)
             print('delete subscription result = %s' % r.subscription_result)
+        if recorder:
+            recorder.close()
+    elif args.reconnect:
+        while True:
+            time.sleep(1)
+            session.check()
     else:
         while True:
             time.sleep(5)
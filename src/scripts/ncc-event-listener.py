@@ -16,7 +16,7 @@ if __name__ == '__main__':
     parser = ArgumentParser(description='Select your simple poller parameters:')
 
     # Input parameters
-    parser.add_argument('--host', type=str, required=True,
+    parser.add_argument('--host', type=str,
                         help="The device IP or DN")
     parser.add_argument('-u', '--username', type=str, default='cisco',
                         help="Go on, guess!")
@@ -30,8 +30,31 @@ if __name__ == '__main__':
     # other options
     parser.add_argument('--stream', type=str, required=True,
                         help="Event stream to register on")
+    parser.add_argument('--record', type=str,
+                        help="Directory to append received notifications to, "
+                        "for later replay with ncc-replay.py")
+    parser.add_argument('--record-segment-size', type=int, default=64,
+                        help="Size in MB at which to start a new capture "
+                        "segment (default 64)")
+    parser.add_argument('--record-cassette', type=str, metavar='FILE',
+                        help="Record the NETCONF session (requests, replies "
+                        "and notifications, with timing) to a cassette")
+    parser.add_argument('--replay-cassette', type=str, metavar='FILE',
+                        help="Replay a recorded cassette instead of "
+                        "connecting to a device")
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help="Cassette replay speed; 1 is recorded speed, 0 "
+                        "is as fast as possible (default 1)")
+    parser.add_argument('--metrics-port', type=int,
+                        help="Serve Prometheus metrics on this port at "
+                        "/metrics")
+    parser.add_argument('--metrics-addr', type=str, default='127.0.0.1',
+                        help="Address for the metrics endpoint "
+                        "(default 127.0.0.1)")
 
     args = parser.parse_args()
+    if not (args.host or args.replay_cassette):
+        parser.error('--host or --replay-cassette is required')
 
     if args.verbose:
         handler = logging.StreamHandler()
@@ -40,27 +63,77 @@ if __name__ == '__main__':
             logger.addHandler(handler)
             logger.setLevel(logging.DEBUG)
 
+    #
+    # Optional metrics endpoint
+    #
+    exporter = None
+    if args.metrics_port:
+        from nccutil import metrics as exporter
+        exporter.serve(args.metrics_port, addr=args.metrics_addr)
+        exporter.instrument_rpcs()
+
     #
     # Connect
     #
     def unknown_host_cb(host, fingerprint):
         return True
-    m =  manager.connect(host=args.host,
-                         port=args.port,
-                         username=args.username,
-                         password=args.password,
-                         allow_agent=False,
-                         look_for_keys=False,
-                         hostkey_verify=False,
-                         unknown_host_cb=unknown_host_cb)
+    if args.replay_cassette:
+        from nccutil.cassette import replay
+        m = replay(args.replay_cassette, speed=args.replay_speed)
+    else:
+        m =  manager.connect(host=args.host,
+                             port=args.port,
+                             username=args.username,
+                             password=args.password,
+                             allow_agent=False,
+                             look_for_keys=False,
+                             hostkey_verify=False,
+                             unknown_host_cb=unknown_host_cb)
+    cassette = None
+    if args.record_cassette:
+        from nccutil.cassette import CassetteRecorder
+        cassette = CassetteRecorder(m, args.record_cassette,
+                                    meta={'host': args.host,
+                                          'stream': args.stream})
+
+    name = '%s:%s' % (args.host, args.port)
+    if exporter:
+        exporter.watch_session(m, name)
+
+    #
+    # optionally record notifications to disk as they arrive
+    #
+    recorder = None
+    if args.record:
+        from nccutil.capture import CaptureWriter
+        recorder = CaptureWriter(
+            args.record,
+            segment_size=args.record_segment_size * 1024 * 1024)
 
     #
     # create the subscription
     #
+    def handle(n):
+        if recorder:
+            recorder.write_notification(n)
+        print('----')
+        print(etree.tostring(n.notification_ele, pretty_print=True).decode())
+
+    if exporter:
+        handle = exporter.instrument_callback(handle, name,
+                                              subscription=args.stream)
+
     s = m.create_subscription(stream_name=args.stream)
-    while True:
-        n = m.take_notification()
-        if n:
-            print('----')
-            print(etree.tostring(n.notification_ele, pretty_print=True).decode())
+    try:
+        while True:
+            n = m.take_notification()
+            if n:
+                handle(n)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if recorder:
+            recorder.close()
+        if cassette:
+            cassette.close()
 
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+# Import time budget for the ncc entry point. Imports the module in a
+# fresh interpreter under "python -X importtime" a few times, reports
+# the median cumulative import time and the heaviest imports, and
+# exits non-zero if the time is over budget or if any module that
+# should only be loaded lazily (GitPython, Jinja2, lxml, ncclient) was
+# imported.
+#
+import os
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+
+#
+# Modules the fast paths (--env, --where, --help) must not load
+#
+LAZY_MODULES = ['git', 'jinja2', 'lxml', 'ncclient', 'paramiko', 'asyncio']
+
+
+def measure(module):
+    '''Import module in a fresh interpreter. Returns the cumulative
+    import time of module in microseconds, a list of (cumulative, name)
+    for every import, and the set of modules loaded.
+    '''
+    src = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [src] + [p for p in [env.get('PYTHONPATH')] if p])
+    code = 'import sys, %s; print(" ".join(sys.modules))' % module
+    p = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                       env=env, capture_output=True, text=True)
+    if p.returncode != 0:
+        raise RuntimeError(p.stderr.strip().splitlines()[-1])
+    total = None
+    imports = []
+    for line in p.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative), name.strip()))
+        if name.strip() == module:
+            total = int(cumulative)
+    return total, imports, set(p.stdout.split())
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description='Import time budget parameters:')
+    parser.add_argument('--module', type=str, default='scripts.ncc',
+                        help="Module to import (default scripts.ncc)")
+    parser.add_argument('--runs', type=int, default=5,
+                        help="Number of fresh interpreters to time "
+                        "(default 5)")
+    parser.add_argument('--budget-ms', type=float, default=75.0,
+                        help="Maximum median import time in milliseconds "
+                        "(default 75)")
+    parser.add_argument('--lazy', type=str, nargs='*', default=LAZY_MODULES,
+                        help="Modules that must not be loaded by the import "
+                        "(default %s)" % ' '.join(LAZY_MODULES))
+    parser.add_argument('--top', type=int, default=10,
+                        help="Number of heaviest imports to list (default 10)")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals = [r[0] for r in runs]
+    median = statistics.median(totals) / 1000.0
+    print('%s: median %.1f ms, min %.1f ms, max %.1f ms over %d runs '
+          '(budget %.1f ms)' % (
+              args.module, median, min(totals) / 1000.0,
+              max(totals) / 1000.0, args.runs, args.budget_ms))
+
+    #
+    # heaviest imports from the run closest to the median
+    #
+    _, imports, loaded = min(runs, key=lambda r: abs(r[0] / 1000.0 - median))
+    print('%10s  %s' % ('Cumul(ms)', 'Module'))
+    for cumulative, name in sorted(imports, reverse=True)[:args.top]:
+        print('%10.1f  %s' % (cumulative / 1000.0, name))
+
+    failed = False
+    if median > args.budget_ms:
+        print('FAIL: import time over budget', file=sys.stderr)
+        failed = True
+    eager = sorted(m for m in args.lazy if m in loaded)
+    if eager:
+        print('FAIL: lazily imported modules loaded: %s' % ', '.join(eager),
+              file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+# Microbenchmarks for ncc's CPU-bound client side paths: XPath filter
+# building, capability display and search, template listing and
+# rendering, reply parsing and output, change detection and
+# notification decoding. Fixtures are the synthetic datasets and
+# capability list in nccutil.synthetic, or the server hello of a
+# cassette recorded from a real device (--cassette), and the snippets
+# in this repository.
+#
+# Each benchmark is timed with timeit (auto-ranged loops, best and
+# median of --repeat) and the results can be saved as JSON. --compare
+# OLD NEW flags benchmarks whose median got slower than --threshold
+# percent, and --rev REV runs the suite against a git worktree of REV
+# and compares the current tree with it. Either exits non-zero on a
+# regression. Benchmarks whose code does not exist at a revision are
+# skipped.
+#
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from argparse import ArgumentParser
+
+# keeps ncc.py here from shadowing the ncc package
+import _nccpath  # noqa: F401
+
+_here = os.path.dirname(os.path.realpath(__file__))
+
+_repo = os.path.dirname(os.path.dirname(_here))
+
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    '''Register a benchmark. The function takes the fixtures and
+    returns the callable to time.
+    '''
+    def register(fn):
+        BENCHMARKS.append((name, fn))
+        return fn
+    return register
+
+
+class Fixtures(object):
+    '''Inputs shared by the benchmarks, built once. They can be saved
+    so that a run at another revision, which may not have
+    nccutil.synthetic, times the same inputs.
+    '''
+
+    def __init__(self, args):
+        self.snippets = args.snippets
+        if args.fixtures:
+            with open(args.fixtures) as f:
+                saved = json.load(f)
+            self.capabilities = saved['capabilities']
+            self.reply = saved['reply']
+            return
+        from nccutil import synthetic
+        if args.cassette:
+            from nccutil.cassette import Cassette
+            from lxml import etree
+            hello = etree.fromstring(Cassette(args.cassette).hello.encode())
+            self.capabilities = [c.text.strip() for c in hello.iter()
+                                 if isinstance(c.tag, str) and
+                                 c.tag.endswith('capability')]
+        else:
+            self.capabilities = synthetic.capabilities(args.capabilities)
+        self.reply = ('<rpc-reply xmlns="%s" message-id="101">%s'
+                      '</rpc-reply>' % (
+                          synthetic.NETCONF_NS,
+                          synthetic.data('interfaces', args.entries,
+                                         oper=True)))
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'capabilities': self.capabilities,
+                       'reply': self.reply}, f)
+
+
+class _Manager(object):
+    '''Just enough of a manager for the capability functions.'''
+
+    def __init__(self, capabilities):
+        self.server_capabilities = capabilities
+
+
+def _cli():
+    # the ncc script, imported as a module
+    import scripts.ncc
+    return scripts.ncc
+
+
+def _quiet(fn, *args):
+    def call():
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(*args)
+    return call
+
+
+def _snippet_env(f):
+    from jinja2 import Environment
+    from jinja2 import FileSystemLoader
+    return Environment(loader=FileSystemLoader(
+        [os.path.join(f.snippets, d) for d in ('editconfigs', 'filters')]))
+
+
+@benchmark('cook_xpath')
+def bench_cook_xpath(f):
+    cli = _cli()
+    cli.ns_dict.update({
+        'if': 'urn:ietf:params:xml:ns:yang:ietf-interfaces',
+        'ip': 'urn:ietf:params:xml:ns:yang:ietf-ip',
+    })
+    xpath = ('/if:interfaces/if:interface[if:name="GigabitEthernet1/0/1"]'
+             '/ip:ipv4/ip:address/ip:ip')
+    return lambda: cli.cook_xpath(xpath)
+
+
+@benchmark('display_capabilities')
+def bench_display_capabilities(f):
+    return _quiet(_cli().display_capabilities, _Manager(f.capabilities))
+
+
+@benchmark('query_model_support')
+def bench_query_model_support(f):
+    return lambda: _cli().query_model_support(_Manager(f.capabilities),
+                                              '-oper$')
+
+
+@benchmark('list_templates')
+def bench_list_templates(f):
+    return _quiet(_cli().list_templates, 'Templates:', _snippet_env(f))
+
+
+@benchmark('render_templates')
+def bench_render_templates(f):
+    env = _snippet_env(f)
+    templates = [env.get_template(t) for t in env.list_templates()]
+    params = {'NBR_ID': '172.16.0.1', 'REMOTE_AS': 64512,
+              'INTF_NAME': 'GigabitEthernet1/0/1', 'MTU': 9000}
+
+    def render():
+        for tmpl in templates:
+            tmpl.render(params)
+    return render
+
+
+@benchmark('parse_reply')
+def bench_parse_reply(f):
+    from ncclient.operations.retrieve import GetReply
+
+    def parse():
+        GetReply(f.reply, huge_tree=True).parse()
+    return parse
+
+
+def _data(f):
+    from ncclient.operations.retrieve import GetReply
+    reply = GetReply(f.reply, huge_tree=True)
+    reply.parse()
+    return reply.data
+
+
+@benchmark('tostring_pretty')
+def bench_tostring_pretty(f):
+    from lxml import etree
+    data = _data(f)
+    return lambda: etree.tostring(data, pretty_print=True).decode('UTF-8')
+
+
+@benchmark('write_raw')
+def bench_write_raw(f):
+    from nccutil.rawreply import write_data
+    return lambda: write_data(f.reply, io.StringIO())
+
+
+@benchmark('delta_index')
+def bench_delta_index(f):
+    from nccutil.delta import build_index
+    data = _data(f)
+    return lambda: build_index(data)
+
+
+@benchmark('notification_decode')
+def bench_notification_decode(f):
+    from nccutil.notifdecoder import NotificationDecoder
+    decoder = NotificationDecoder('/interfaces-state/interface/statistics')
+    data = _data(f)
+    return lambda: decoder.decode(data[0])
+
+
+@benchmark('notification_jxmlease')
+def bench_notification_jxmlease(f):
+    # how the callback modules used to decode notifications
+    import jxmlease
+    from lxml import etree
+    xml = etree.tostring(_data(f)[0]).decode()
+    return lambda: jxmlease.parse(xml)
+
+
+def run(fixtures, names, repeat):
+    '''Time the benchmarks; returns name -> stats, or the reason it was
+    skipped.
+    '''
+    results = {}
+    for name, setup in BENCHMARKS:
+        if names and name not in names:
+            continue
+        try:
+            fn = setup(fixtures)
+        except (ImportError, AttributeError) as e:
+            results[name] = {'skipped': repr(e)}
+            continue
+        timer = timeit.Timer(fn)
+        number, _ = timer.autorange()
+        times = [t / number for t in timer.repeat(repeat, number)]
+        results[name] = {
+            'loops': number,
+            'min': min(times),
+            'median': statistics.median(times),
+        }
+    return results
+
+
+def commit(path):
+    '''The git commit of the tree at path, if it is a checkout.'''
+    try:
+        return subprocess.run(
+            ['git', '-C', path, 'rev-parse', '--short', 'HEAD'],
+            check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_at_rev(rev, args, fixtures):
+    '''Run this benchmark suite with the given fixtures against the
+    code of git revision rev, in a temporary worktree, and return its
+    results.
+    '''
+    tmp = tempfile.mkdtemp(prefix='ncc-microbench-')
+    tree = os.path.join(tmp, 'tree')
+    subprocess.run(['git', '-C', _repo, 'worktree', 'add', '--detach',
+                    tree, rev], check=True, stdout=subprocess.DEVNULL)
+    try:
+        output = os.path.join(tmp, 'results.json')
+        saved = os.path.join(tmp, 'fixtures.json')
+        fixtures.save(saved)
+        cmd = [sys.executable, os.path.realpath(__file__),
+               '--output', output,
+               '--fixtures', saved,
+               '--repeat', str(args.repeat),
+               '--snippets', args.snippets]
+        if args.only:
+            cmd += ['--only'] + args.only
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.path.join(tree, 'src')
+        subprocess.run(cmd, check=True, env=env, stdout=subprocess.DEVNULL)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        subprocess.run(['git', '-C', _repo, 'worktree', 'remove', '--force',
+                        tree], stdout=subprocess.DEVNULL)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def report(results):
+    print('%-24s %8s %12s %12s' % ('Benchmark', 'Loops', 'Min(us)',
+                                   'Median(us)'))
+    for name, r in results['benchmarks'].items():
+        if 'skipped' in r:
+            print('%-24s skipped: %s' % (name, r['skipped']))
+            continue
+        print('%-24s %8d %12.1f %12.1f' % (name, r['loops'], r['min'] * 1e6,
+                                           r['median'] * 1e6))
+
+
+def compare(old, new, threshold):
+    '''Print old and new medians side by side and return the names of
+    the benchmarks that regressed by more than threshold percent.
+    '''
+    print('%-24s %12s %12s %9s' % ('Benchmark', 'Old(us)', 'New(us)',
+                                   'Change'))
+    regressions = []
+    for name, r in new['benchmarks'].items():
+        o = old['benchmarks'].get(name, {})
+        if 'median' not in r or 'median' not in o:
+            print('%-24s %12s %12s %9s' % (
+                name, '-' if 'median' not in o else '%.1f' % (
+                    o['median'] * 1e6),
+                '-' if 'median' not in r else '%.1f' % (r['median'] * 1e6),
+                '-'))
+            continue
+        change = 100.0 * (r['median'] / o['median'] - 1)
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print('%-24s %12.1f %12.1f %+8.1f%%%s' % (
+            name, o['median'] * 1e6, r['median'] * 1e6, change, flag))
+    return regressions
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description='Microbenchmark parameters:')
+    parser.add_argument('--entries', type=int, default=1000,
+                        help="Interfaces in the fixture reply (default "
+                        "1000)")
+    parser.add_argument('--capabilities', type=int, default=1200,
+                        help="Size of the fixture capability list "
+                        "(default 1200)")
+    parser.add_argument('--cassette', type=str,
+                        help="Take the capabilities from the server hello "
+                        "in this cassette instead")
+    parser.add_argument('--fixtures', type=str,
+                        help="Internal; load fixtures saved by --rev")
+    parser.add_argument('--snippets', type=str,
+                        default=os.path.join(_repo, 'snippets-cl'),
+                        help="Snippets directory for the template "
+                        "benchmarks (default snippets-cl)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="Timing repeats per benchmark (default 5)")
+    parser.add_argument('--only', type=str, nargs='+',
+                        choices=[n for n, _ in BENCHMARKS],
+                        help="Benchmarks to run (default all)")
+    parser.add_argument('--output', type=str,
+                        help="Write the results as JSON to this file")
+    parser.add_argument('--compare', type=str, nargs=2,
+                        metavar=('OLD', 'NEW'),
+                        help="Compare two saved results instead of running")
+    parser.add_argument('--rev', type=str,
+                        help="Also run at this git revision and compare "
+                        "the current tree with it")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="Percent slowdown of a median that counts as "
+                        "a regression (default 10)")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        sys.exit(1 if compare(old, new, args.threshold) else 0)
+
+    fixtures = Fixtures(args)
+    baseline = run_at_rev(args.rev, args, fixtures) if args.rev else None
+
+    import ncc
+    results = {
+        'commit': commit(os.path.dirname(os.path.realpath(ncc.__file__))),
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'benchmarks': run(fixtures, args.only, args.repeat),
+    }
+    report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if baseline is not None:
+        print('\nCompared with %s (%s):' % (args.rev, baseline['commit']))
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+# Output benchmark for large get-config replies: the usual path, where
+# ncclient parses the reply into a tree and ncc pretty-prints it again,
+# against ncc --raw, which writes the reply's <data> as received. For
+# each reply size, each mode runs in a fresh process so its peak memory
+# can be measured, and the wall time, CPU time and peak RSS growth are
+# reported. Replies come from a device (--host and --filter) or from a
+# local stand-in NETCONF server, as filler of --sizes or as --counts
+# entries of a synthetic --dataset (nccutil.synthetic).
+#
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+
+# keeps ncc.py here from shadowing the ncc package
+import _nccpath  # noqa: F401
+
+from ncc.device import Device
+from ncc.device import connect
+
+
+MODES = ['parsed', 'raw']
+
+BENCH_FILTER = '<bench xmlns="urn:ncc:bench" bytes="%d"/>'
+
+DATASET_FILTER = '<bench xmlns="urn:ncc:bench" dataset="%s" count="%d"/>'
+
+UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def parse_size(s):
+    '''"64K", "1M", "500M" or a plain number of bytes.'''
+    s = s.strip().upper()
+    if s and s[-1] in UNITS:
+        return int(float(s[:-1]) * UNITS[s[-1]])
+    return int(s)
+
+
+def peak_rss():
+    '''Peak resident set size of this process in bytes.'''
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure(device, mode, subtree, sink):
+    '''Fetch one reply and write it to sink in the given mode. Runs in
+    its own process; CPU time covers every thread, including SSH.
+    '''
+    from lxml import etree
+    from nccutil.rawreply import get_config_raw
+    from nccutil.rawreply import write_data
+
+    m = connect(device)
+    m.huge_tree = True
+    f = ('subtree', subtree) if subtree else None
+    try:
+        base = peak_rss()
+        start = time.perf_counter()
+        cpu = time.process_time()
+        if mode == 'raw':
+            reply = get_config_raw(m, filter=f)
+            size = len(reply)
+            fetched = time.perf_counter()
+            write_data(reply, sink)
+        else:
+            reply = m.get_config(source='running', filter=f)
+            size = len(reply._raw)
+            fetched = time.perf_counter()
+            print(etree.tostring(reply.data,
+                                 pretty_print=True).decode('UTF-8'),
+                  file=sink)
+        end = time.perf_counter()
+        return {
+            'mode': mode,
+            'bytes': size,
+            'seconds': end - start,
+            'fetch_seconds': fetched - start,
+            'output_seconds': end - fetched,
+            'cpu_seconds': time.process_time() - cpu,
+            'peak_rss_growth': peak_rss() - base,
+        }
+    finally:
+        m.close_session()
+
+
+def run_child(args, mode, name, subtree):
+    '''Run one measurement in a fresh interpreter and return it.'''
+    cmd = [sys.executable, os.path.realpath(__file__),
+           '--child', mode,
+           '--host', args.host,
+           '--port', str(args.port),
+           '-u', args.username,
+           '-p', args.password,
+           '--timeout', str(args.timeout),
+           '--sink', args.sink]
+    if args.device_type:
+        cmd += ['--device-type', args.device_type]
+    if subtree:
+        cmd += ['--filter', subtree]
+    out = subprocess.run(cmd, check=True, stdout=subprocess.PIPE).stdout
+    result = json.loads(out)
+    result['name'] = name
+    return result
+
+
+def report(results):
+    print('%-17s %-7s %12s %9s %9s %9s %9s %11s' % (
+        'Reply', 'Mode', 'Bytes', 'Total(s)', 'Fetch(s)', 'Output(s)',
+        'CPU(s)', 'Peak+(MB)'))
+    for r in results['runs']:
+        print('%-17s %-7s %12d %9.3f %9.3f %9.3f %9.3f %11.1f' % (
+            r['name'], r['mode'], r['bytes'], r['seconds'],
+            r['fetch_seconds'], r['output_seconds'], r['cpu_seconds'],
+            r['peak_rss_growth'] / float(1 << 20)))
+    by_name = {}
+    for r in results['runs']:
+        by_name.setdefault(r['name'], {})[r['mode']] = r
+    print()
+    for name, modes in by_name.items():
+        if 'parsed' in modes and 'raw' in modes:
+            p, r = modes['parsed'], modes['raw']
+            print('%-17s raw saves %.3fs CPU (%.0f%%) and %.1fMB peak '
+                  'memory' % (
+                      name, p['cpu_seconds'] - r['cpu_seconds'],
+                      100.0 * (1 - r['cpu_seconds'] / p['cpu_seconds'])
+                      if p['cpu_seconds'] else 0.0,
+                      (p['peak_rss_growth'] - r['peak_rss_growth']) /
+                      float(1 << 20)))
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description='Output benchmark parameters:')
+    parser.add_argument('--host', type=str,
+                        help="Device to benchmark; without it a local "
+                        "stand-in NETCONF server is started")
+    parser.add_argument('-u', '--username', type=str,
+                        default=os.environ.get('NCC_USERNAME', 'cisco'),
+                        help="Username (default 'cisco')")
+    parser.add_argument('-p', '--password', type=str,
+                        default=os.environ.get('NCC_PASSWORD', 'cisco'),
+                        help="Password (default 'cisco')")
+    parser.add_argument('--port', type=int,
+                        default=os.environ.get('NCC_PORT', 830),
+                        help="Port (default 830)")
+    parser.add_argument('--device-type', type=str,
+                        help="ncclient device handler name, e.g. iosxe")
+    parser.add_argument('--timeout', type=int, default=600,
+                        help="RPC timeout in seconds (default 600)")
+    parser.add_argument('--sizes', type=str, nargs='+',
+                        default=['10M', '100M'],
+                        help="Reply sizes for the stand-in server "
+                        "(default 10M 100M)")
+    parser.add_argument('--dataset', type=str,
+                        choices=['interfaces', 'acl', 'bgp'],
+                        help="Serve this synthetic dataset from the "
+                        "stand-in server instead of --sizes")
+    parser.add_argument('--counts', type=int, nargs='+',
+                        default=[10000, 100000],
+                        help="With --dataset, entry counts (default 10000 "
+                        "100000)")
+    parser.add_argument('--filter', type=str, nargs='+',
+                        help="Subtree filters to fetch from a device "
+                        "(default the whole running config)")
+    parser.add_argument('--modes', type=str, nargs='+', choices=MODES,
+                        default=MODES,
+                        help="Modes to run (default parsed raw)")
+    parser.add_argument('--sink', type=str, default=os.devnull,
+                        help="Where replies are written (default %s)"
+                        % os.devnull)
+    parser.add_argument('--output', type=str,
+                        help="Write the results as JSON to this file")
+    parser.add_argument('--child', type=str, choices=MODES,
+                        help="Internal; run one measurement")
+    args = parser.parse_args()
+
+    if args.child:
+        device = Device(args.host,
+                        port=args.port,
+                        username=args.username,
+                        password=args.password,
+                        device_type=args.device_type,
+                        timeout=args.timeout)
+        with open(args.sink, 'w') as sink:
+            result = measure(device, args.child,
+                             args.filter[0] if args.filter else None, sink)
+        print(json.dumps(result))
+        sys.exit(0)
+
+    standin = None
+    if args.host:
+        replies = [('running' if f is None else 'filter-%d' % i, f)
+                   for i, f in enumerate(args.filter or [None])]
+    else:
+        from nccutil.standin import StandinServer
+        standin = StandinServer().start()
+        args.host, args.port = standin.addr, standin.port
+        if args.dataset:
+            replies = [('%s-%d' % (args.dataset, c),
+                        DATASET_FILTER % (args.dataset, c))
+                       for c in args.counts]
+        else:
+            replies = [(s, BENCH_FILTER % parse_size(s))
+                       for s in args.sizes]
+
+    results = {
+        'target': 'standin' if standin else '%s:%s' % (args.host,
+                                                       args.port),
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'runs': [],
+    }
+    try:
+        for name, subtree in replies:
+            for mode in args.modes:
+                results['runs'].append(run_child(args, mode, name, subtree))
+    finally:
+        if standin:
+            standin.close()
+
+    report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
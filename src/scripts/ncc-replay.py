@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+# Replay notifications captured with the --record option of
+# ncc-establish-subscription.py or ncc-event-listener.py, or recorded
+# in a --record-cassette session cassette, into one or more callback
+# modules (anything with init/callback/errback, e.g. the
+# sample or redis-pub modules), at recorded speed, N times recorded
+# speed, or as fast as possible. Reports per-callback throughput and
+# latency.
+#
+import importlib
+import sys
+import time
+
+from argparse import ArgumentParser
+from nccutil.capture import read_capture
+from nccutil.capture import ReplayNotification
+from nccutil.cassette import cassette_notifications
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    i = int(round((len(sorted_values) - 1) * p / 100.0))
+    return sorted_values[i]
+
+
+class CallbackStats(object):
+    '''Latency and error accounting for a single callback module.'''
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.busy = 0.0
+
+    def report(self, elapsed):
+        lat = sorted(self.latencies)
+        n = len(lat)
+        print('%s:' % self.name)
+        print('  notifications : %d (%d errors)' % (n, self.errors))
+        if n == 0:
+            return
+        print('  throughput    : %.1f/s wall, %.1f/s in callback'
+              % (n / elapsed if elapsed else 0.0,
+                 n / self.busy if self.busy else 0.0))
+        print('  latency (ms)  : min %.3f  mean %.3f  p50 %.3f  '
+              'p99 %.3f  max %.3f'
+              % (lat[0] * 1000, self.busy / n * 1000,
+                 percentile(lat, 50) * 1000, percentile(lat, 99) * 1000,
+                 lat[-1] * 1000))
+
+
+def replay(records, modules, speed=1.0):
+    '''Feed records to each (name, callback, errback) module. A speed of
+    0 replays as fast as possible, otherwise inter-arrival gaps are
+    divided by speed. Returns the list of CallbackStats and the wall
+    time taken.
+    '''
+    stats = [CallbackStats(name) for name, _, _ in modules]
+    first_rx = None
+    last_rx = None
+    start = time.monotonic()
+    for record in records:
+        notif = ReplayNotification(record)
+        if speed > 0:
+            if first_rx is None:
+                first_rx = record.rx_time
+            elif record.rx_time < last_rx:
+                # looped back to the start of the capture
+                first_rx -= last_rx - record.rx_time
+            last_rx = record.rx_time
+            due = start + (record.rx_time - first_rx) / speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        for (name, callback, errback), st in zip(modules, stats):
+            t0 = time.perf_counter()
+            try:
+                callback(notif)
+            except Exception as e:
+                st.errors += 1
+                if errback:
+                    errback(e)
+            dt = time.perf_counter() - t0
+            st.latencies.append(dt)
+            st.busy += dt
+    return stats, time.monotonic() - start
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description='Select your replay parameters:')
+    g = parser.add_mutually_exclusive_group(required=True)
+    g.add_argument('--capture', type=str,
+                   help="Capture directory written with --record")
+    g.add_argument('--cassette', type=str,
+                   help="Session cassette written with --record-cassette")
+    parser.add_argument('--callback', type=str, nargs='+', required=True,
+                        help="One or more modules with init/callback/errback "
+                        "defined")
+    parser.add_argument('-x', '--xpaths', type=str, nargs='+', default=[],
+                        help="List of xpaths to pass to each module's init")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Replay speed multiplier; 1 is recorded speed, "
+                        "0 is as fast as possible (default 1)")
+    parser.add_argument('--loops', type=int, default=1,
+                        help="Number of times to replay the capture "
+                        "(default 1)")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="Suppress callback output to stdout")
+    args = parser.parse_args()
+
+    modules = []
+    for name in args.callback:
+        module = importlib.import_module(name)
+        getattr(module, 'init')(args.xpaths)
+        modules.append((name,
+                        getattr(module, 'callback'),
+                        getattr(module, 'errback', None)))
+
+    def records():
+        for _ in range(args.loops):
+            if args.cassette:
+                records = cassette_notifications(args.cassette)
+            else:
+                records = read_capture(args.capture)
+            for r in records:
+                yield r
+
+    #
+    # callbacks tend to print; when measuring, that can be sent to
+    # /dev/null so the terminal doesn't dominate the numbers
+    #
+    stdout = sys.stdout
+    if args.quiet:
+        import os
+        sys.stdout = open(os.devnull, 'w')
+    try:
+        stats, elapsed = replay(records(), modules, speed=args.speed)
+    finally:
+        if args.quiet:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    print('Replayed in %.3fs at %s speed' % (
+        elapsed, 'max' if args.speed <= 0 else '%gx' % args.speed))
+    for st in stats:
+        st.report(elapsed)
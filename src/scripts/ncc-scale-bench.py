@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+# Scaling benchmark. For each synthetic dataset (nccutil.synthetic:
+# interfaces, ACL entries, BGP neighbours) and each entry count, fetch
+# the config (get-config) and operational (get) forms from a stand-in
+# NETCONF server, and time each stage ncc puts a reply through: the
+# fetch, parsing it, converting it to a change detection index
+# (nccutil.delta), pretty-printed output and --raw output. The config
+# form is also sent back as an edit-config payload. Per entry times
+# that grow with the count show where ncc stops scaling linearly.
+#
+# Without --host a local stand-in server is started; --host can point
+# at one running elsewhere (python -m nccutil.standin --port 8830).
+#
+import datetime
+import json
+import os
+import platform
+import time
+from argparse import ArgumentParser
+
+# keeps ncc.py here from shadowing the ncc package
+import _nccpath  # noqa: F401
+
+from lxml import etree
+from ncc.device import Device
+from ncc.device import connect
+from nccutil.delta import build_index
+from nccutil.rawreply import get_config_raw
+from nccutil.rawreply import get_raw
+from nccutil.rawreply import write_data
+from nccutil.synthetic import DATASETS
+from nccutil.synthetic import edit_config
+
+
+DATASET_FILTER = '<bench xmlns="urn:ncc:bench" dataset="%s" count="%d"/>'
+
+FORMS = ['config', 'oper']
+
+STAGES = ['fetch', 'parse', 'convert', 'pretty', 'raw', 'render', 'edit']
+
+
+def timed_call(times, stage, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    times[stage] = time.perf_counter() - start
+    return result
+
+
+def write_pretty(ele, sink):
+    sink.write(etree.tostring(ele, pretty_print=True).decode())
+
+
+def bench_one(m, dataset, count, form, sink):
+    '''Time every stage for one dataset, count and form.'''
+    times = {}
+    f = ('subtree', DATASET_FILTER % (dataset, count))
+    if form == 'oper':
+        raw = timed_call(times, 'fetch', get_raw, m, filter=f)
+    else:
+        raw = timed_call(times, 'fetch', get_config_raw, m, filter=f)
+    parser = etree.XMLParser(huge_tree=True)
+    root = timed_call(times, 'parse', etree.fromstring, raw.encode(),
+                      parser=parser)
+    data = root[0]
+    timed_call(times, 'convert', build_index, data)
+    timed_call(times, 'pretty', write_pretty, data, sink)
+    timed_call(times, 'raw', write_data, raw, sink)
+    size = len(raw)
+    del raw, root, data
+    if form == 'config':
+        payload = timed_call(times, 'render', edit_config, dataset, count,
+                             operation='merge')
+        timed_call(times, 'edit', m.edit_config, payload, format='xml',
+                   target='running')
+    return {
+        'dataset': dataset,
+        'form': form,
+        'count': count,
+        'bytes': size,
+        'seconds': times,
+    }
+
+
+def report(results):
+    print('%-10s %-6s %8s %11s %s %9s' % (
+        'Dataset', 'Form', 'Count', 'Bytes',
+        ' '.join('%8s' % s.capitalize() for s in STAGES), 'us/entry'))
+    for r in results['runs']:
+        t = r['seconds']
+        # the client side stages, without the stand-in's own time
+        client = sum(t.get(s, 0.0) for s in ('parse', 'convert', 'pretty',
+                                             'raw'))
+        print('%-10s %-6s %8d %11d %s %9.2f' % (
+            r['dataset'], r['form'], r['count'], r['bytes'],
+            ' '.join('%8.3f' % t[s] if s in t else '%8s' % '-'
+                     for s in STAGES),
+            client / r['count'] * 1e6))
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description='Scaling benchmark parameters:')
+    parser.add_argument('--host', type=str,
+                        help="Stand-in NETCONF server to use; without it "
+                        "one is started locally")
+    parser.add_argument('-u', '--username', type=str, default='cisco',
+                        help="Username (default 'cisco')")
+    parser.add_argument('-p', '--password', type=str, default='cisco',
+                        help="Password (default 'cisco')")
+    parser.add_argument('--port', type=int, default=8830,
+                        help="Port of the stand-in server (default 8830)")
+    parser.add_argument('--timeout', type=int, default=600,
+                        help="RPC timeout in seconds (default 600)")
+    parser.add_argument('--datasets', type=str, nargs='+',
+                        choices=sorted(DATASETS), default=sorted(DATASETS),
+                        help="Datasets to run (default all)")
+    parser.add_argument('--counts', type=int, nargs='+',
+                        default=[1000, 10000, 100000],
+                        help="Entry counts (default 1000 10000 100000)")
+    parser.add_argument('--forms', type=str, nargs='+', choices=FORMS,
+                        default=FORMS,
+                        help="Config (get-config and edit-config) and/or "
+                        "oper (get) (default both)")
+    parser.add_argument('--sink', type=str, default=os.devnull,
+                        help="Where output is written (default %s)"
+                        % os.devnull)
+    parser.add_argument('--output', type=str,
+                        help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    standin = None
+    if args.host:
+        host, port = args.host, args.port
+    else:
+        from nccutil.standin import StandinServer
+        standin = StandinServer().start()
+        host, port = standin.addr, standin.port
+
+    results = {
+        'target': 'standin' if standin else '%s:%s' % (host, port),
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'runs': [],
+    }
+    m = None
+    try:
+        m = connect(Device(host, port=port, username=args.username,
+                           password=args.password, timeout=args.timeout))
+        m.huge_tree = True
+        with open(args.sink, 'w') as sink:
+            for dataset in args.datasets:
+                for form in args.forms:
+                    for count in args.counts:
+                        results['runs'].append(
+                            bench_one(m, dataset, count, form, sink))
+    finally:
+        if m is not None:
+            m.close_session()
+        if standin:
+            standin.close()
+
+    report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
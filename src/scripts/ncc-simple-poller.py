@@ -2,17 +2,33 @@
 #
 # Copyright (c) 2018 Cisco and/or its affiliates
 #
+import json
 import sys
 from argparse import ArgumentParser
-from ncclient import manager
+from ncclient.operations.errors import TimeoutExpiredError
 from lxml import etree
-from bs4 import BeautifulSoup
+
+# keeps ncc.py here from shadowing the ncc package
+import _nccpath  # noqa: F401
+
+from ncc import Device
+from ncc import connect
+from ncc import enable_logging
+from nccutil.collector import connect_device
+from nccutil.collector import load_inventory
+from nccutil.delta import DeltaTracker
+from nccutil.delta import format_change
+from nccutil.poller import AdaptiveCadence
+from nccutil.poller import JsonLinesSink
+from nccutil.poller import PollingEngine
+from nccutil.poller import Scheduler
+from nccutil.poller import StdoutSink
+from nccutil.poller import TagExtractor
+from nccutil.poller import load_jobs
 import logging
 import time
 import datetime
 
-soup = None
-
 def get(m, filter=None, xpath=None):
     if filter and len(filter) > 0:
         return m.get(filter=('subtree', filter))
@@ -28,8 +44,8 @@ if __name__ == '__main__':
     parser = ArgumentParser(description='Select your simple poller parameters:')
 
     # Input parameters
-    parser.add_argument('--host', type=str, required=True,
-                        help="The device IP or DN")
+    parser.add_argument('--host', type=str,
+                        help="The device IP or DN (single device mode)")
     parser.add_argument('-u', '--username', type=str, default='cisco',
                         help="Go on, guess!")
     parser.add_argument('-p', '--password', type=str, default='cisco',
@@ -40,10 +56,77 @@ if __name__ == '__main__':
                         help="Do I really need to explain?")
 
     # other options
-    parser.add_argument('--cadence', type=int, default=5,
-                        help="Cadence of gets")
+    parser.add_argument('--cadence', type=float, default=5,
+                        help="Cadence of gets in seconds, measured start to "
+                        "start (default 5)")
     parser.add_argument('--display-tags', type=str, nargs='+',
                         help="A list of display XML tags; first value matching displayed")
+    parser.add_argument('--rpc-timeout', type=int, default=30,
+                        help="Seconds before a get times out (default 30)")
+
+    # Adaptive cadence; back off when the device is slow
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Stretch the cadence while gets are slow or "
+                        "time out, and recover when they speed up again")
+    parser.add_argument('--max-cadence', type=float,
+                        help="Longest adaptive cadence in seconds "
+                        "(default 8x --cadence)")
+    parser.add_argument('--slow-latency', type=float,
+                        help="Get latency in seconds above which the device "
+                        "is considered slow (default half of --cadence)")
+    parser.add_argument('--narrow-subtree', type=str,
+                        help="Narrower subtree filter to poll while backed "
+                        "off to --max-cadence; in polling engine mode, for "
+                        "jobs that don't name their own")
+    parser.add_argument('--narrow-xpath', type=str,
+                        help="Narrower XPath filter to poll while backed "
+                        "off to --max-cadence; in polling engine mode, for "
+                        "jobs that don't name their own")
+    parser.add_argument('--metrics-file', type=str,
+                        help="Append adaptive cadence metrics as a JSON line "
+                        "per poll to this file (single device mode)")
+    parser.add_argument('--record-cassette', type=str, metavar='FILE',
+                        help="Record the NETCONF session (requests, replies "
+                        "and notifications, with timing) to a cassette")
+    parser.add_argument('--replay-cassette', type=str, metavar='FILE',
+                        help="Replay a recorded cassette, looping over it, "
+                        "instead of connecting to a device")
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help="Cassette replay speed; 1 is recorded speed, 0 "
+                        "is as fast as possible (default 1)")
+    parser.add_argument('--changes-only', action='store_true',
+                        help="After the first reply, only print leaves that "
+                        "were added (+), removed (-) or changed (~)")
+
+    # Polling engine mode, many devices and filters
+    parser.add_argument('--inventory', type=str,
+                        help="Inventory file for polling engine mode; JSON "
+                        "list of devices, or one host[:port] per line")
+    parser.add_argument('--jobs', type=str,
+                        help="JSON list of jobs for polling engine mode, each "
+                        "with device (or \"*\"), cadence and subtree or xpath")
+    parser.add_argument('--max-inflight', type=int, default=32,
+                        help="Maximum RPCs in flight across all devices "
+                        "(default 32)")
+    parser.add_argument('--per-device', type=int, default=1,
+                        help="Maximum RPCs in flight per device (default 1)")
+    parser.add_argument('--channels', type=int, default=1,
+                        help="NETCONF sessions per device, multiplexed over "
+                        "one SSH connection; use with --per-device "
+                        "(default 1)")
+    parser.add_argument('--sink', type=str,
+                        help="Append results as JSON lines to this file "
+                        "instead of printing them")
+    parser.add_argument('--report-interval', type=int, default=60,
+                        help="Seconds between job statistics reports on "
+                        "stderr (default 60)")
+    parser.add_argument('--metrics-port', type=int,
+                        help="Serve Prometheus metrics (RPC latency, bytes "
+                        "received, poll counts and queue depths) on this "
+                        "port at /metrics")
+    parser.add_argument('--metrics-addr', type=str, default='127.0.0.1',
+                        help="Address for the metrics endpoint "
+                        "(default 127.0.0.1)")
 
     # Only one type of filter
     g = parser.add_mutually_exclusive_group()
@@ -58,48 +141,196 @@ if __name__ == '__main__':
                    help="Get oper data")
     
     args = parser.parse_args()
+    if not (args.host or args.replay_cassette) and \
+       not (args.inventory and args.jobs):
+        parser.error('either --host, --replay-cassette or both --inventory '
+                     'and --jobs are required')
+    if bool(args.inventory) != bool(args.jobs):
+        parser.error('--inventory and --jobs must be given together')
+    if args.jobs and (args.record_cassette or args.replay_cassette):
+        parser.error('cassettes are for a single device, not with --jobs')
 
     if args.verbose:
-        handler = logging.StreamHandler()
-        for l in ['ncclient.transport.ssh', 'ncclient.transport.session', 'ncclient.operations.rpc']:
-            logger = logging.getLogger(l)
-            logger.addHandler(handler)
-            logger.setLevel(logging.DEBUG)
+        enable_logging()
+
+    #
+    # cadence adjustments are always logged to stderr, whether --adaptive
+    # or a job in the jobs file asked for them
+    #
+    if args.adaptive:
+        enable_logging(['ncc.poller'], level=logging.INFO)
+
+    #
+    # Optional metrics endpoint
+    #
+    exporter = None
+    if args.metrics_port:
+        from nccutil import metrics as exporter
+        exporter.serve(args.metrics_port, addr=args.metrics_addr)
+        exporter.instrument_rpcs()
 
     #
-    # Could use this extra param instead of the last four arguments
-    # specified below:
+    # Polling engine mode; runs every job in the jobs file against the
+    # devices in the inventory until interrupted.
     #
-    def unknown_host_cb(host, fingerprint):
-        return True
-    m =  manager.connect(host=args.host,
-                         port=args.port,
-                         username=args.username,
-                         password=args.password,
-                         allow_agent=False,
-                         look_for_keys=False,
-                         hostkey_verify=False,
-                         unknown_host_cb=unknown_host_cb)
+    if args.jobs:
+        devices = load_inventory(args.inventory, defaults={
+            'port': args.port,
+            'username': args.username,
+            'password': args.password,
+        })
+        jobs = load_jobs(args.jobs, devices)
+        for job in jobs:
+            if args.changes_only:
+                job.delta = DeltaTracker()
+            if not (job.narrow_subtree or job.narrow_xpath):
+                job.narrow_subtree = args.narrow_subtree
+                job.narrow_xpath = args.narrow_xpath
+                if job.adaptive:
+                    job.adaptive.can_narrow = bool(job.narrow_subtree or
+                                                   job.narrow_xpath)
+            if args.adaptive and not job.adaptive:
+                job.adaptive = AdaptiveCadence(
+                    job.cadence,
+                    max_cadence=args.max_cadence,
+                    slow_latency=args.slow_latency,
+                    can_narrow=bool(job.narrow_subtree or job.narrow_xpath),
+                    name=job.name)
+        if not args.adaptive and any(job.adaptive for job in jobs):
+            enable_logging(['ncc.poller'], level=logging.INFO)
+        sink = JsonLinesSink(args.sink) if args.sink else StdoutSink()
+
+        def connect_polled(device):
+            m = connect_device(device)
+            m.timeout = args.rpc_timeout
+            return m
+
+        engine = PollingEngine(devices,
+                               jobs,
+                               sink,
+                               connect_polled,
+                               max_inflight=args.max_inflight,
+                               per_device=args.per_device,
+                               channels=args.channels,
+                               opened=exporter.watch_session if exporter
+                               else None)
+        if exporter:
+            exporter.watch_poller(engine)
+        engine.start()
+        try:
+            while True:
+                time.sleep(args.report_interval)
+                engine.report()
+        except KeyboardInterrupt:
+            engine.report()
+            engine.close()
+            if args.sink:
+                sink.close()
+        sys.exit(0)
+
+    if args.replay_cassette:
+        from nccutil.cassette import replay
+        m = replay(args.replay_cassette, speed=args.replay_speed, loop=True)
+    else:
+        m = connect(Device(args.host,
+                           port=args.port,
+                           username=args.username,
+                           password=args.password))
+    recorder = None
+    if args.record_cassette:
+        from nccutil.cassette import CassetteRecorder
+        recorder = CassetteRecorder(m, args.record_cassette,
+                                    meta={'host': args.host})
+    m.timeout = args.rpc_timeout
+    if exporter:
+        exporter.watch_session(m, '%s:%s' % (args.host, args.port))
 
     kw = {}
     if args.xpath:
         kw['xpath'] = args.xpath
     elif args.subtree:
         kw['filter'] = args.subtree
-    while True:
-        st = datetime.datetime.fromtimestamp(time.time()).strftime('%Y-%m-%d %H:%M:%S')
-        result = get(m, **kw)
-        if not args.display_tags:
-            print(st)
-            print(etree.tostring(result.data, pretty_print=True))
-        else:
-            values = []
-            for p in args.display_tags:
+    narrow_kw = {}
+    if args.narrow_xpath:
+        narrow_kw['xpath'] = args.narrow_xpath
+    elif args.narrow_subtree:
+        narrow_kw['filter'] = args.narrow_subtree
+
+    #
+    # display tags are compiled once into a single XPath pass
+    #
+    extractor = None
+    if args.display_tags:
+        extractor = TagExtractor(args.display_tags)
+
+    #
+    # with --changes-only, each reply is indexed and diffed against the
+    # previous one, so only what changed is printed
+    #
+    tracker = None
+    if args.changes_only:
+        tracker = DeltaTracker()
+
+    #
+    # with --adaptive, get latency and timeouts drive the cadence
+    #
+    adaptive = None
+    metrics = None
+    if args.adaptive:
+        adaptive = AdaptiveCadence(args.cadence,
+                                   max_cadence=args.max_cadence,
+                                   slow_latency=args.slow_latency,
+                                   can_narrow=bool(narrow_kw),
+                                   name=args.host)
+        if args.metrics_file:
+            metrics = open(args.metrics_file, 'a')
+
+    #
+    # gets start on a fixed cadence; if a get takes longer than the
+    # cadence, the missed slots are skipped and reported
+    #
+    scheduler = Scheduler(args.cadence)
+    try:
+        while True:
+            missed = scheduler.wait()
+            if missed:
+                print("overrun: skipped {} slot(s), {} overrun(s) so far".format(
+                    missed, scheduler.overruns), file=sys.stderr)
+            st = datetime.datetime.fromtimestamp(time.time()).strftime('%Y-%m-%d %H:%M:%S')
+            if not adaptive:
+                result = get(m, **kw)
+            else:
+                t0 = time.monotonic()
                 try:
-                    soup = BeautifulSoup(result.data_xml)
-                    for n in soup.find_all(p):
-                        values.append(p + " = " + n.getText())
-                except AttributeError as e:
-                    values.append(p + " = <not_found>")
-            print("{}: {}".format(st, ", ".join(values)))
-        time.sleep(args.cadence)
+                    result = get(m, **(narrow_kw if adaptive.narrowed else kw))
+                    timed_out = False
+                except TimeoutExpiredError:
+                    result = None
+                    timed_out = True
+                if adaptive.observe(time.monotonic() - t0, timed_out):
+                    scheduler.set_cadence(adaptive.cadence)
+                if metrics:
+                    record = adaptive.stats()
+                    record['time'] = st
+                    metrics.write(json.dumps(record) + '\n')
+                    metrics.flush()
+                if timed_out:
+                    print("{}: get timed out".format(st), file=sys.stderr)
+                    continue
+            if tracker:
+                changes = tracker.update(result.data_ele)
+                if changes:
+                    print("{}: {} change(s)".format(st, len(changes)))
+                    for change in changes:
+                        print(format_change(change))
+            elif not extractor:
+                print(st)
+                print(etree.tostring(result.data, pretty_print=True))
+            else:
+                values = extractor.format(result.data_ele)
+                print("{}: {}".format(st, ", ".join(values)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if recorder:
+            recorder.close()
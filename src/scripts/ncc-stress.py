@@ -7,13 +7,10 @@ import json
 import logging
 import os
 import re
-import shutil
 import sys
-import tempfile
 import time
 
 from argparse import ArgumentParser
-from git import Repo
 from jinja2 import Environment
 from jinja2 import FileSystemLoader
 from jinja2 import StrictUndefined
@@ -247,15 +244,6 @@ def get_running_config(m, filter=None, xpath=None):
     print(etree.tostring(c.data, pretty_print=True).decode('UTF-8'))
 
 
-def install_snippets(target_dir='.'):
-    localdir = tempfile.mkdtemp()
-    Repo.clone_from(REPO_URL, localdir)
-    for entry in os.listdir(localdir):
-        if entry.startswith('snippets'):
-            shutil.move(localdir + '/' + entry, target_dir)
-    shutil.rmtree(localdir)
-
-
 def display_env_vars():
     print('export NCC_HOST=127.0.0.1    # --host')
     print('export NCC_PORT=2223         # --port')
@@ -325,6 +313,16 @@ if __name__ == '__main__':
                             'NCC_SNIPPETS', "%s/snippets" % NCC_DIR),
                         help="Directory where 'snippets' can be found; "
                         "default is location of script")
+    parser.add_argument('--snippets-source', type=str,
+                        default=os.environ.get('NCC_SNIPPETS_SOURCE',
+                                               REPO_URL),
+                        help="Where --install-snippets fetches from; a git "
+                        "URL (sparse, shallow clone), a .tar.gz archive "
+                        "path or URL, or a local directory (default %s)"
+                        % REPO_URL)
+    parser.add_argument('--prune-snippets', action='store_true',
+                        help="With --install-snippets, remove installed "
+                        "files that are no longer in the source")
 
     #
     # specify a list of namespaces
@@ -372,8 +370,9 @@ if __name__ == '__main__':
     g.add_argument('--env', action='store_true',
                    help="Display environment variables a user can set.")
     g.add_argument('--install-snippets', action='store_true',
-                   help="Use git to obtain the snippets from GitHub and copy "
-                   "to the current directory")
+                   help="Fetch just the snippets directories from "
+                   "--snippets-source and install them in the current "
+                   "directory, updating only changed files")
     g.add_argument('-c', '--capabilities', action='store_true',
                    help="Display capabilities of the device.")
     g.add_argument('--is-supported', type=str,
@@ -417,7 +416,8 @@ if __name__ == '__main__':
     # install the snippets to the current directory
     #
     if args.install_snippets:
-        install_snippets()
+        from nccutil.snippets import install_snippets
+        install_snippets(args.snippets_source, prune=args.prune_snippets)
         sys.exit(0)
 
     #
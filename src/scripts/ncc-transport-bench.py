@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+# Transport benchmark. For each SSH transport ncclient can use
+# (paramiko, and libssh when ssh-python is installed), and paramiko
+# with ncc's WAN profile, measure connect time, small RPC latency and
+# bulk reply throughput and bytes on the wire against a device, or
+# against a local stand-in NETCONF server when no --host is given, and
+# write the results as JSON so transports can be chosen per device
+# class. --rate slows the stand-in to a low bandwidth link. --channels
+# N also compares N separate connections with N NETCONF sessions
+# multiplexed over one connection: the time to open them and small RPC
+# throughput with one thread per session.
+#
+# Note that ncclient's session thread only sends queued requests
+# between selector ticks (ncclient.transport.session.TICK, 0.1s), so
+# on an otherwise idle session small RPC latency is dominated by the
+# tick rather than the transport. --tick overrides it to measure the
+# transport itself.
+#
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+
+# keeps ncc.py here from shadowing the ncc package
+import _nccpath  # noqa: F401
+
+from ncc.channels import close_channels
+from ncc.channels import connect_channels
+from ncc.device import Device
+from ncc.device import connect
+from ncc.wan import WAN_PROFILE
+from ncc.wan import open_socket
+from ncc.wan import wire_bytes
+from nccutil.timing import PhaseTimer
+from nccutil.timing import rpc_timing
+
+
+#
+# wan is paramiko with the WAN profile
+#
+TRANSPORTS = ['paramiko', 'libssh', 'wan']
+
+#
+# Small reply for a real device: just the datastore names
+#
+SMALL_FILTER = '''
+<netconf-state xmlns="urn:ietf:params:xml:ns:yang:ietf-netconf-monitoring">
+  <datastores><datastore><name/></datastore></datastores>
+</netconf-state>'''
+
+BENCH_FILTER = '<bench xmlns="urn:ncc:bench" bytes="%d"/>'
+
+UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def parse_size(s):
+    '''"64K", "1M", "500M" or a plain number of bytes.'''
+    s = s.strip().upper()
+    if s and s[-1] in UNITS:
+        return int(float(s[:-1]) * UNITS[s[-1]])
+    return int(s)
+
+
+def available(transport):
+    '''None if transport can be used, else the reason it cannot.'''
+    if transport == 'libssh' and importlib.util.find_spec('ssh') is None:
+        return 'ssh-python (libssh bindings) is not installed'
+    return None
+
+
+def summary(samples):
+    '''Stats in seconds for a list of samples.'''
+    ordered = sorted(samples)
+    return {
+        'samples': len(ordered),
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1],
+    }
+
+
+def connect_counted(device):
+    '''Connect over a socket that counts bytes on the wire, where the
+    transport allows.'''
+    sock = None
+    if not device.use_libssh:
+        sock = open_socket(device.host, device.port, device.timeout,
+                           profile=WAN_PROFILE if device.wan else None)
+    return connect(device, sock=sock)
+
+
+def bench_connect(device, count):
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        m = connect_counted(device)
+        times.append(time.perf_counter() - start)
+        m.close_session()
+    return summary(times)
+
+
+def bench_small(m, count, small_filter, op):
+    f = ('subtree', small_filter)
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        if op == 'get':
+            m.get(filter=f)
+        else:
+            m.get_config(source='running', filter=f)
+        times.append(time.perf_counter() - start)
+    return summary(times)
+
+
+def bench_bulk(m, name, bulk_filter, repeat):
+    '''Time get-config replies, split into the wait for the reply (the
+    device plus transport) and parsing it, and return the best run.
+    '''
+    best = None
+    for _ in range(repeat):
+        timer = PhaseTimer()
+        wire = wire_bytes(m)
+        start = time.perf_counter()
+        with rpc_timing(timer):
+            if bulk_filter is None:
+                reply = m.get_config(source='running')
+            else:
+                reply = m.get_config(source='running',
+                                     filter=('subtree', bulk_filter))
+        elapsed = time.perf_counter() - start
+        if wire is not None:
+            wire = wire_bytes(m)[1] - wire[1]
+        size = len(reply._raw)
+        del reply
+        run = {
+            'name': name,
+            'bytes': size,
+            'wire_bytes': wire,
+            'seconds': elapsed,
+            'wait_seconds': timer.totals.get('rpc-wait', 0.0),
+            'parse_seconds': timer.totals.get('reply-parse', 0.0),
+            'mb_per_s': size / elapsed / (1 << 20),
+        }
+        if best is None or run['seconds'] < best['seconds']:
+            best = run
+    return best
+
+
+def bench_sessions(managers, count, small_filter, op):
+    '''Run count small RPCs spread over the managers, one thread each,
+    and return the throughput.
+    '''
+    per_session = max(1, count // len(managers))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(managers)) as executor:
+        for f in [executor.submit(bench_small, m, per_session,
+                                  small_filter, op) for m in managers]:
+            f.result()
+    elapsed = time.perf_counter() - start
+    return {
+        'rpcs': per_session * len(managers),
+        'seconds': elapsed,
+        'rpcs_per_s': per_session * len(managers) / elapsed,
+    }
+
+
+def bench_channels(device, count, args):
+    '''Compare count connections opened concurrently with one
+    connection carrying count channels.
+    '''
+    result = {'count': count}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        managers = list(executor.map(connect, [device] * count))
+    result['connections'] = {'open_s': time.perf_counter() - start}
+    try:
+        result['connections'].update(bench_sessions(
+            managers, args.rpcs, args.small_filter, args.small_op))
+    finally:
+        close_channels(managers)
+    start = time.perf_counter()
+    managers = connect_channels(device, count)
+    result['channels'] = {'open_s': time.perf_counter() - start}
+    try:
+        result['channels'].update(bench_sessions(
+            managers, args.rpcs, args.small_filter, args.small_op))
+    finally:
+        close_channels(managers)
+    return result
+
+
+def bench_transport(device, args, bulk):
+    '''All benchmarks for one transport; bulk is a list of (name,
+    filter).'''
+    result = {'connect_s': bench_connect(device, args.connects)}
+    m = connect_counted(device)
+    m.huge_tree = True
+    try:
+        result['small_rpc_s'] = bench_small(m, args.rpcs, args.small_filter,
+                                            args.small_op)
+        result['bulk'] = []
+        for name, f in bulk:
+            run = bench_bulk(m, name, f, args.bulk_repeat)
+            print('  %-10s %-12s %12d bytes %8.3fs %8.1f MB/s' % (
+                device.name, name, run['bytes'], run['seconds'],
+                run['mb_per_s']), file=sys.stderr)
+            result['bulk'].append(run)
+    finally:
+        m.close_session()
+    if args.channels:
+        if device.use_libssh:
+            result['channels'] = {'error': 'channels need paramiko'}
+        else:
+            result['channels'] = bench_channels(device, args.channels, args)
+    return result
+
+
+def report(results):
+    print('%-10s %12s %12s %12s' % (
+        'Transport', 'Connect(ms)', 'RPC p50(ms)', 'RPC p95(ms)'))
+    for transport, r in results['transports'].items():
+        if 'error' in r:
+            print('%-10s skipped: %s' % (transport, r['error']))
+            continue
+        print('%-10s %12.1f %12.2f %12.2f' % (
+            transport, r['connect_s']['median'] * 1000,
+            r['small_rpc_s']['median'] * 1000,
+            r['small_rpc_s']['p95'] * 1000))
+    print('\n%-10s %-12s %14s %14s %10s %10s %10s %10s' % (
+        'Transport', 'Bulk', 'Bytes', 'Wire', 'Total(s)', 'Wait(s)',
+        'Parse(s)', 'MB/s'))
+    for transport, r in results['transports'].items():
+        for run in r.get('bulk', []):
+            wire = run['wire_bytes']
+            print('%-10s %-12s %14d %14s %10.3f %10.3f %10.3f %10.1f' % (
+                transport, run['name'], run['bytes'],
+                '-' if wire is None else wire, run['seconds'],
+                run['wait_seconds'], run['parse_seconds'],
+                run['mb_per_s']))
+    rows = [(t, r['channels']) for t, r in results['transports'].items()
+            if 'count' in r.get('channels', {})]
+    if rows:
+        print('\n%-10s %8s %-12s %10s %10s' % (
+            'Transport', 'Sessions', 'Over', 'Open(ms)', 'RPC/s'))
+    for transport, c in rows:
+        for over in ('connections', 'channels'):
+            print('%-10s %8d %-12s %10.1f %10.1f' % (
+                transport, c['count'], over, c[over]['open_s'] * 1000,
+                c[over]['rpcs_per_s']))
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description='Transport benchmark parameters:')
+    parser.add_argument('--host', type=str,
+                        help="Device to benchmark; without it a local "
+                        "stand-in NETCONF server is started")
+    parser.add_argument('-u', '--username', type=str,
+                        default=os.environ.get('NCC_USERNAME', 'cisco'),
+                        help="Username (default 'cisco')")
+    parser.add_argument('-p', '--password', type=str,
+                        default=os.environ.get('NCC_PASSWORD', 'cisco'),
+                        help="Password (default 'cisco')")
+    parser.add_argument('--port', type=int,
+                        default=os.environ.get('NCC_PORT', 830),
+                        help="Port (default 830)")
+    parser.add_argument('--device-type', type=str,
+                        help="ncclient device handler name, e.g. iosxe")
+    parser.add_argument('--timeout', type=int, default=600,
+                        help="RPC timeout in seconds (default 600)")
+    parser.add_argument('--transports', type=str, nargs='+',
+                        choices=TRANSPORTS, default=TRANSPORTS,
+                        help="Transports to benchmark (default all; ones "
+                        "not installed are recorded as skipped)")
+    parser.add_argument('--connects', type=int, default=5,
+                        help="Connections to time (default 5)")
+    parser.add_argument('--rpcs', type=int, default=50,
+                        help="Small RPCs to time (default 50)")
+    parser.add_argument('--small-filter', type=str,
+                        help="Subtree filter for the small RPC (default "
+                        "the netconf-state datastore names on a device)")
+    parser.add_argument('--small-op', type=str, default='get',
+                        choices=['get', 'get-config'],
+                        help="Operation for the small RPC (default get)")
+    parser.add_argument('--bulk-sizes', type=str, nargs='+',
+                        default=['1M', '10M', '100M'],
+                        help="Reply sizes for the stand-in server, e.g. 1M "
+                        "10M 100M 500M (default 1M 10M 100M)")
+    parser.add_argument('--bulk-filter', type=str, nargs='+',
+                        help="Subtree filters for bulk get-configs against "
+                        "a device (default the whole running config)")
+    parser.add_argument('--bulk-repeat', type=int, default=1,
+                        help="Runs of each bulk get-config; the best is "
+                        "kept (default 1)")
+    parser.add_argument('--channels', type=int, metavar='N',
+                        help="Also compare N connections with N channels "
+                        "over one connection (paramiko only)")
+    parser.add_argument('--rate', type=str,
+                        help="Limit what the stand-in server sends to this "
+                        "many bytes per second, e.g. 256K, to stand in for "
+                        "a slow link")
+    parser.add_argument('--tick', type=float,
+                        help="Override ncclient's session selector tick in "
+                        "seconds (default ncclient's, 0.1)")
+    parser.add_argument('--label', type=str,
+                        help="Device class to record with the results, "
+                        "e.g. asr1k-17.9")
+    parser.add_argument('--output', type=str,
+                        help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    import ncclient.transport.session
+    if args.tick is not None:
+        ncclient.transport.session.TICK = args.tick
+
+    standin = None
+    if args.host:
+        host, port = args.host, args.port
+        if args.small_filter is None:
+            args.small_filter = SMALL_FILTER
+        bulk = [('running' if f is None else 'filter-%d' % i, f)
+                for i, f in enumerate(args.bulk_filter or [None])]
+    else:
+        from nccutil.standin import StandinServer
+        standin = StandinServer(
+            rate=parse_size(args.rate) if args.rate else None).start()
+        host, port = standin.addr, standin.port
+        if args.small_filter is None:
+            args.small_filter = BENCH_FILTER % 200
+        bulk = [(s, BENCH_FILTER % parse_size(s)) for s in args.bulk_sizes]
+
+    results = {
+        'target': 'standin' if standin else '%s:%s' % (host, port),
+        'label': args.label,
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'ncclient_tick': ncclient.transport.session.TICK,
+        'standin_rate': standin.rate if standin else None,
+        'transports': {},
+    }
+    try:
+        for transport in args.transports:
+            reason = available(transport)
+            if reason is not None:
+                results['transports'][transport] = {'error': reason}
+                continue
+            device = Device(host,
+                            port=port,
+                            username=args.username,
+                            password=args.password,
+                            device_type=args.device_type,
+                            timeout=args.timeout,
+                            use_libssh=(transport == 'libssh'),
+                            wan=(transport == 'wan'),
+                            name=transport)
+            try:
+                results['transports'][transport] = bench_transport(
+                    device, args, bulk)
+            except Exception as e:
+                results['transports'][transport] = {'error': repr(e)}
+    finally:
+        if standin:
+            standin.close()
+
+    report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -4,24 +4,22 @@
 #
 from __future__ import print_function
 import json
-import logging
 import os
 import re
-import shutil
 import sys
-import tempfile
 import time
 
 from argparse import ArgumentParser
-from git import Repo
-from jinja2 import Environment
-from jinja2 import FileSystemLoader
-from jinja2 import StrictUndefined
-from jinja2 import meta
-from jinja2.exceptions import UndefinedError
-from lxml import etree
-from ncclient import manager
-from ncclient.operations.rpc import RPCError
+from contextlib import ExitStack
+from contextlib import nullcontext
+from ncc.device import LOGGING_TO_ENABLE
+
+#
+# GitPython, Jinja2, lxml and ncclient are slow to import (GitPython
+# even runs "git --version"), so they are imported only on the code
+# paths that use them; --env, --where and --help never load them. See
+# ncc-importtime.py for the import time budget.
+#
 
 #
 # Namespaces starting point for xpath queries
@@ -30,16 +28,6 @@ ns_dict = {
     'nc': 'urn:ietf:params:xml:ns:netconf:base:1.0'
 }
 
-#
-# Add things people want logged here. Just various netconf things for
-# now. SSH disabled as it is just too much right now.
-#
-LOGGING_TO_ENABLE = [
-    'ncclient.transport.ssh',
-    'ncclient.transport.session',
-    'ncclient.operations.rpc'
-]
-
 #
 # default bytes to display when UnicodeDecodeError exceptions are caught
 #
@@ -50,18 +38,23 @@ UNICODE_ERRB = 30
 #
 REPO_URL = 'https://github.com/CiscoDevNet/ncc.git'
 
-#
-# Capability constants
-#
-NC_WRITABLE_RUNNING = 'urn:ietf:params:netconf:capability:writable-running:1.0'
-NC_CANDIDATE = 'urn:ietf:params:netconf:capability:candidate:1.0'
-
 #
 # By default, don't support writeable-running or candidate configs
 #
 RUNNING = False
 CANDIDATE = False
 
+#
+# nccutil.timing.PhaseTimer when --profile is given
+#
+TIMER = None
+
+#
+# With --chunk-entries or --chunk-bytes, a ChunkSizer splitting
+# candidate edit-configs into chunks
+#
+CHUNKS = None
+
 #
 # Get where the script is; we will use this to find snippets for
 # templates and filters unless overriden.
@@ -69,6 +62,13 @@ CANDIDATE = False
 NCC_DIR, _ = os.path.split(os.path.realpath(__file__))
 
 
+def timed(name):
+    """Time a phase of the run when --profile is in effect."""
+    if TIMER is None:
+        return nullcontext()
+    return TIMER.phase(name)
+
+
 def strip_leading_trailing_ws(to_strip):
     s1 = re.sub(r"^\s*", "", to_strip)
     s2 = re.sub(r"\s*$", "", s1)
@@ -162,6 +162,8 @@ def list_templates(header, source_env):
     and extract variables that should be provided.
     UPDATED To present the VARS as JSON dict with enpty values
     """
+    from jinja2 import Environment
+    from jinja2 import meta
     print(header)
     env = Environment()
     for tname in sorted(source_env.list_templates()):
@@ -204,14 +206,79 @@ def cook_xpath(xpath):
     return filter_template % (namespaces, xpath)
 
 
-def do_templates(m, t_list, default_op='merge', **kwargs):
+def confirmed_commit(m, confirm_timeout=None, persist=None,
+                     verify_filter=None):
+    """Confirmed commit of the candidate. If a verify filter is given,
+    get the running config it selects while the commit is pending, and
+    cancel the commit if nothing is there; otherwise confirm it. Prints
+    the time spent in each step and in the confirm window.
+    """
+    timeout = None
+    if confirm_timeout is not None:
+        timeout = str(confirm_timeout)
+    start = time.time()
+    m.commit(confirmed=True, timeout=timeout, persist=persist)
+    committed = time.time()
+    verified = True
+    if verify_filter is not None:
+        try:
+            reply = m.get_config(source='running',
+                                 filter=('subtree', verify_filter))
+        except Exception:
+            # don't leave the commit pending until the device reverts it
+            m.cancel_commit(persist_id=persist)
+            raise
+        verified = len(reply.data) > 0
+    checked = time.time()
+    if verified:
+        m.commit(persist_id=persist)
+    else:
+        m.cancel_commit(persist_id=persist)
+    end = time.time()
+    print("Confirmed commit %s: commit %.3fs, verify %.3fs, "
+          "%s %.3fs, confirm window %.3fs" % (
+              'confirmed' if verified else 'CANCELLED, verification failed',
+              committed - start, checked - committed,
+              'confirm' if verified else 'cancel', end - checked,
+              end - committed))
+    return verified
+
+
+def edit_config(m, data, target, default_op):
+    """edit-config data, in chunks when --chunk-entries/--chunk-bytes is
+    given (candidate only).
+    """
+    if CHUNKS is not None and target == 'candidate':
+        from ncclient.operations.rpc import RPCError
+        from nccutil.chunkedit import edit_chunked
+        try:
+            edit_chunked(m, data, CHUNKS, target=target,
+                         default_operation=default_op)
+        except RPCError:
+            # earlier chunks are in the candidate
+            m.discard_changes()
+            raise
+    else:
+        m.edit_config(data,
+                      format='xml',
+                      target=target,
+                      default_operation=default_op)
+
+
+def do_templates(m, t_list, default_op='merge', confirmed=False,
+                 confirm_timeout=None, persist=None, verify_filter=None,
+                 **kwargs):
     """Execute a list of templates, using the kwargs passed in to
-    complete the rendering.
+    complete the rendering. With confirmed, and candidate config
+    supported, make the commit a confirmed commit (see
+    confirmed_commit).
     """
+    from jinja2.exceptions import UndefinedError
 
     for tmpl in t_list:
         try:
-            data = tmpl.render(kwargs)
+            with timed('render'):
+                data = tmpl.render(kwargs)
         except UndefinedError as e:
             print("Undefined variable %s.  Use --params to specify json dict"
                   % e.message)
@@ -219,45 +286,147 @@ def do_templates(m, t_list, default_op='merge', **kwargs):
             exit(1)
 
         if CANDIDATE:
-            m.edit_config(data,
-                          format='xml',
-                          target='candidate',
-                          default_operation=default_op)
+            edit_config(m, data, 'candidate', default_op)
         elif RUNNING:
-            m.edit_config(data,
-                          format='xml',
-                          target='running',
-                          default_operation=default_op)
+            edit_config(m, data, 'running', default_op)
+    if CANDIDATE and confirmed:
+        return confirmed_commit(m, confirm_timeout=confirm_timeout,
+                                persist=persist, verify_filter=verify_filter)
+    elif CANDIDATE:
+        m.commit()
+    return True
+
+
+def do_template_stream(m, t_list, stream, default_op='merge',
+                       batch_size=1000, confirmed=False, confirm_timeout=None,
+                       persist=None, verify_filter=None, **kwargs):
+    """Execute a list of templates once per line of an NDJSON stream of
+    parameter dicts (a file name, or - for stdin), with kwargs as
+    defaults under each line. The rendered configs are merged into an
+    edit-config per batch_size lines and, with candidate config, all
+    committed once at the end (see do_templates).
+    """
+    from ncclient.operations.rpc import RPCError
+    from nccutil.paramstream import RowError
+    from nccutil.paramstream import payloads
+    from nccutil.paramstream import read_rows
+
     if CANDIDATE:
+        target = 'candidate'
+    elif RUNNING:
+        target = 'running'
+    else:
+        return True
+    f = sys.stdin if stream == '-' else open(stream)
+    batches = payloads(t_list, read_rows(f, stream), batch_size=batch_size,
+                       base=kwargs, name=stream)
+    rows = 0
+    edits = 0
+    try:
+        while True:
+            with timed('render'):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            edit_config(m, batch[1], target, default_op)
+            rows += batch[0]
+            edits += 1
+            if default_op == 'replace':
+                # later batches would replace the earlier ones
+                default_op = 'merge'
+    except (RowError, RPCError) as e:
+        # don't leave a partial change in the candidate
+        if CANDIDATE:
+            m.discard_changes()
+        if isinstance(e, RPCError):
+            raise
+        print(e)
+        exit(1)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    if TIMER is not None:
+        TIMER.info.update({'stream_rows': rows, 'stream_edits': edits})
+    if CANDIDATE and confirmed:
+        return confirmed_commit(m, confirm_timeout=confirm_timeout,
+                                persist=persist, verify_filter=verify_filter)
+    elif CANDIDATE:
         m.commit()
+    return True
 
 
-def get_running_config(m, filter=None, xpath=None, with_defaults=None):
+def do_transaction(devices, t_list, default_op='merge', allow_running=False,
+                   max_devices=100, confirmed=False, confirm_timeout=None,
+                   persist=None, verify_tmpl=None, **kwargs):
+    """Execute a list of templates on every device in an inventory as
+    one coordinated change: lock, edit and validate everywhere, and
+    only commit once every device has validated. Each device's
+    "params" dict from the inventory is merged over kwargs when
+    rendering. With confirmed, the commit is only confirmed once the
+    filter rendered from verify_tmpl finds config on every device.
+    Returns the outcome.
+    """
+    import asyncio
+    from jinja2.exceptions import UndefinedError
+    from ncc.pool import Limits
+    from ncc.pool import SessionPool
+    from ncc.transaction import Transaction
+    from ncc.transaction import config_present
+
+    edits = {}
+    filters = {}
+    for device in devices:
+        params = dict(kwargs)
+        params.update(device.get('params', {}))
+        try:
+            edits[device['name']] = [tmpl.render(params) for tmpl in t_list]
+            if verify_tmpl is not None:
+                filters[device['name']] = verify_tmpl.render(params)
+        except UndefinedError as e:
+            print("%s: undefined variable %s.  Use --params or inventory "
+                  "params to specify json dict" % (device['name'], e.message))
+            exit(1)
+
+    async def run():
+        pool = SessionPool(Limits(max_devices=max_devices))
+        t = Transaction(pool, devices, edits, default_op=default_op,
+                        allow_running=allow_running, confirmed=confirmed,
+                        confirm_timeout=confirm_timeout, persist=persist,
+                        verify=config_present(filters) if filters else None)
+        try:
+            await t.run()
+        finally:
+            await pool.close()
+        t.report()
+        return t.outcome
+
+    return asyncio.run(run())
+
+
+def get_running_config(m, filter=None, xpath=None, with_defaults=None,
+                       raw=False):
     """
     Get running config with a passed in filter. If both types of filter
     are passed in for some reason, the subtree filter "wins". When an
     xpath filter is passed in, it is assumed to be the fully created
-    XML, and so is not passed to ncclient using the tuple syntax.
+    XML, and so is not passed to ncclient using the tuple syntax. With
+    raw, the unparsed reply text is returned.
     """
+    fetch = m.get_config
+    if raw:
+        from functools import partial
+        from nccutil.rawreply import get_config_raw
+        fetch = partial(get_config_raw, m)
     c = None
     if filter and len(filter) > 0:
-        c = m.get_config(source='running', filter=('subtree', filter), with_defaults=with_defaults)
+        c = fetch(source='running', filter=('subtree', filter), with_defaults=with_defaults)
     elif xpath and len(xpath) > 0:
-        c = m.get_config(source='running', filter=xpath, with_defaults=with_defaults)
+        c = fetch(source='running', filter=xpath, with_defaults=with_defaults)
     else:
-        c = m.get_config(source='running', with_defaults=with_defaults)
+        c = fetch(source='running', with_defaults=with_defaults)
     return c
 
 
-def install_snippets(target_dir='.'):
-    localdir = tempfile.mkdtemp()
-    Repo.clone_from(REPO_URL, localdir)
-    for entry in os.listdir(localdir):
-        if entry.startswith('snippets'):
-            shutil.move(localdir + '/' + entry, target_dir)
-    shutil.rmtree(localdir)
-
-
 def display_env_vars():
     print('export NCC_HOST=127.0.0.1')
     print('export NCC_PORT=2223')
@@ -265,20 +434,26 @@ def display_env_vars():
     print('export NCC_PASSWORD=vagrant')
 
 
-def get(m, filter=None, xpath=None, with_defaults=None):
+def get(m, filter=None, xpath=None, with_defaults=None, raw=False):
     """
     Get state with a passed in filter. If both types of filter are
     passed in for some reason, the subtree filter "wins". When an
     xpath filter is passed in, it is assumed to be the fully created
-    XML, and so is not passed to ncclient using the tuple syntax.
+    XML, and so is not passed to ncclient using the tuple syntax. With
+    raw, the unparsed reply text is returned.
     """
+    fetch = m.get
+    if raw:
+        from functools import partial
+        from nccutil.rawreply import get_raw
+        fetch = partial(get_raw, m)
     c = None
     if filter and len(filter) > 0:
-        c = m.get(filter=('subtree', filter), with_defaults=with_defaults)
+        c = fetch(filter=('subtree', filter), with_defaults=with_defaults)
     elif xpath and len(xpath) > 0:
-        c = m.get(filter=xpath, with_defaults=with_defaults)
+        c = fetch(filter=xpath, with_defaults=with_defaults)
     else:
-        c = m.get(with_defaults=with_defaults)
+        c = fetch(with_defaults=with_defaults)
         return
     return c
 
@@ -304,13 +479,12 @@ def main():
     # function correctly
     #
     global UNICODE_ERRB
+    global TIMER
+    global CHUNKS
     global RUNNING
     global CANDIDATE
     global NCC_DIR
-    global LOGGING_TO_ENABLE
     global REPO_URL
-    global NC_WRITABLE_RUNNING
-    global NC_CANDIDATE
     global ns_dict
 
     parser = ArgumentParser(
@@ -347,8 +521,25 @@ def main():
                         "(default 'merge')")
     parser.add_argument('--with-defaults', type=str,
                         help="RFC 6243 with-defaults value to use")
+    parser.add_argument('--raw', action='store_true',
+                        help="Write the <data> of --get-running and "
+                        "--get-oper replies as received, without parsing "
+                        "or pretty-printing them")
     parser.add_argument('--use-libssh', action='store_true',
                         help="Use libssh instead of Paramiko for SSH")
+    parser.add_argument('--wan', action='store_true',
+                        help="Connect with the WAN profile: SSH compression, "
+                        "larger channel windows and packets, keepalives "
+                        "(Paramiko only)")
+    parser.add_argument('--record-cassette', type=str, metavar='FILE',
+                        help="Record the NETCONF session (requests and "
+                        "replies, with timing) to a cassette")
+    parser.add_argument('--replay-cassette', type=str, metavar='FILE',
+                        help="Replay a recorded cassette instead of "
+                        "connecting to a device")
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help="Cassette replay speed; 1 is recorded speed, 0 "
+                        "is as fast as possible (default 1)")
     parser.add_argument('--device-type', type=str, default=None,
                          help="The device type to pass to ncclient "
                          "(default: None)")
@@ -366,6 +557,16 @@ def main():
                             'NCC_SNIPPETS', "%s/snippets" % NCC_DIR),
                         help="Directory where 'snippets' can be found; "
                         "default is location of script")
+    parser.add_argument('--snippets-source', type=str,
+                        default=os.environ.get('NCC_SNIPPETS_SOURCE',
+                                               REPO_URL),
+                        help="Where --install-snippets fetches from; a git "
+                        "URL (sparse, shallow clone), a .tar.gz archive "
+                        "path or URL, or a local directory (default %s)"
+                        % REPO_URL)
+    parser.add_argument('--prune-snippets', action='store_true',
+                        help="With --install-snippets, remove installed "
+                        "files that are no longer in the source")
 
     #
     # specify a list of namespaces
@@ -386,6 +587,61 @@ def main():
     parser.add_argument('--params-file', type=str,
                         help="JSON-encoded file of parameters dictionary "
                         "for templates")
+    parser.add_argument('--params-stream', type=str, metavar='FILE',
+                        help="With --do-edits, NDJSON file (- for stdin) "
+                        "with a parameters dictionary per line; the "
+                        "templates are rendered for every line, over any "
+                        "--params/--params-file, and sent in edit-configs "
+                        "of --batch-size lines with a single commit")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help="Lines of --params-stream per edit-config "
+                        "(default 1000)")
+    parser.add_argument('--chunk-entries', type=int, metavar='N',
+                        help="With --do-edits and candidate config, split "
+                        "each edit-config along its list entries into "
+                        "edit-configs of at most N entries, with a single "
+                        "commit")
+    parser.add_argument('--chunk-bytes', type=int, metavar='N',
+                        help="Like --chunk-entries, limiting chunks to "
+                        "about N bytes of entries (with --chunk-entries, "
+                        "whichever is smaller; default 1000 entries)")
+    parser.add_argument('--chunk-latency', type=float, metavar='SECONDS',
+                        help="With --chunk-entries/--chunk-bytes, size "
+                        "chunks from the measured throughput to take about "
+                        "SECONDS each, up to --chunk-entries")
+    #
+    # Coordinated edits across many devices
+    #
+    parser.add_argument('--inventory', type=str,
+                        help="With --do-edits, apply the edits to every "
+                        "device in an inventory file (JSON list of dicts, "
+                        "or one host[:port] per line) as one change, "
+                        "committed only if all devices validate")
+    parser.add_argument('--max-devices', type=int, default=100,
+                        help="Devices worked on at once with --inventory "
+                        "(default 100)")
+    parser.add_argument('--allow-running', action='store_true',
+                        help="With --inventory, apply edits directly to "
+                        "running on devices without a candidate datastore, "
+                        "after all others have validated")
+
+    #
+    # Confirmed commit for --do-edits
+    #
+    parser.add_argument('--confirmed', action='store_true',
+                        help="With --do-edits, use a confirmed commit that "
+                        "the device reverts unless confirmed")
+    parser.add_argument('--confirm-timeout', type=int, default=None,
+                        help="Seconds before an unconfirmed commit is "
+                        "reverted (device default 600)")
+    parser.add_argument('--persist', type=str, default=None,
+                        help="Persist token, so the confirmed commit "
+                        "survives loss of the session")
+    parser.add_argument('--verify-filter', type=str, default=None,
+                        help="Named filter for the running config to check "
+                        "while the commit is pending; the commit is "
+                        "cancelled if it selects nothing")
+
     #
     # Only one type of filter allowed.
     #
@@ -404,8 +660,9 @@ def main():
     g.add_argument('--env', action='store_true',
                    help="Display environment variables a user can set.")
     g.add_argument('--install-snippets', action='store_true',
-                   help="Use git to obtain the snippets from GitHub and copy "
-                   "to the current directory")
+                   help="Fetch just the snippets directories from "
+                   "--snippets-source and install them in the current "
+                   "directory, updating only changed files")
     g.add_argument('-c', '--capabilities', action='store_true',
                    help="Display capabilities of the device.")
     g.add_argument('--is-supported', type=str,
@@ -431,6 +688,21 @@ def main():
     g.add_argument('-w', '--where', action='store_true',
                    help="Print where script is and exit")
 
+    #
+    # Where the time goes
+    #
+    parser.add_argument('--profile', type=str, nargs='?', const='table',
+                        choices=['table', 'json'],
+                        help="Print a per-phase timing breakdown (imports, "
+                        "template rendering, connect, RPC build/send/wait, "
+                        "reply parsing, output) to stderr as a table "
+                        "(default) or JSON")
+    parser.add_argument('--profile-hook', type=str,
+                        choices=['cprofile', 'pyinstrument'],
+                        help="Also run the connect, operation and output "
+                        "under a Python profiler and print its report to "
+                        "stderr")
+
     #
     # Finally, parse the arguments!
     #
@@ -443,11 +715,19 @@ def main():
         display_env_vars()
         sys.exit(0)
 
+    #
+    # Display where the script is
+    #
+    if args.where:
+        print(NCC_DIR)
+        sys.exit(0)
+
     #
     # install the snippets to the current directory
     #
     if args.install_snippets:
-        install_snippets()
+        from nccutil.snippets import install_snippets
+        install_snippets(args.snippets_source, prune=args.prune_snippets)
         sys.exit(0)
 
     #
@@ -455,15 +735,32 @@ def main():
     #
     UNICODE_ERRB = args.unicode_error_bytes
 
+    if args.profile:
+        from nccutil.timing import PhaseTimer
+        TIMER = PhaseTimer()
+
+    if args.chunk_entries or args.chunk_bytes:
+        from nccutil.chunkedit import ChunkSizer
+        CHUNKS = ChunkSizer(entries=args.chunk_entries or 1000,
+                            max_bytes=args.chunk_bytes,
+                            latency=args.chunk_latency)
+
+    with timed('import'):
+        from jinja2 import Environment
+        from jinja2 import FileSystemLoader
+        from jinja2 import StrictUndefined
+        from jinja2.exceptions import UndefinedError
+
     #
     # Setup the templates for use.
     #
-    named_filters = Environment(loader=FileSystemLoader(
-        '%s/filters' % args.snippets),
-        undefined=StrictUndefined)
-    named_templates = Environment(loader=FileSystemLoader(
-        '%s/editconfigs' % args.snippets),
-        undefined=StrictUndefined)
+    with timed('templates'):
+        named_filters = Environment(loader=FileSystemLoader(
+            '%s/filters' % args.snippets),
+            undefined=StrictUndefined)
+        named_templates = Environment(loader=FileSystemLoader(
+            '%s/editconfigs' % args.snippets),
+            undefined=StrictUndefined)
 
     #
     # Do the named template/filter listing first, then exit.
@@ -478,12 +775,17 @@ def main():
     #
     # If the user specified verbose logging, set it up.
     #
+    with timed('import'):
+        from lxml import etree
+        from ncclient.operations.rpc import RPCError
+        from ncc.device import Device
+        from ncc.device import connect
+        from ncc.device import datastores
+        from ncc.device import enable_logging
+        from nccutil.rawreply import write_data
+
     if args.verbose:
-        handler = logging.StreamHandler()
-        for l in LOGGING_TO_ENABLE:
-            logger = logging.getLogger(l)
-            logger.addHandler(handler)
-            logger.setLevel(logging.DEBUG)
+        enable_logging(LOGGING_TO_ENABLE)
 
     #
     # set up various keyword arguments that have specific arguments
@@ -533,56 +835,119 @@ def main():
         try:
             args.filter = []
             for f in args.named_filter:
-                args.filter.append(named_filters.get_template(
-                    '%s.tmpl' % f).render(**kwargs))
+                with timed('render'):
+                    args.filter.append(named_filters.get_template(
+                        '%s.tmpl' % f).render(**kwargs))
         except UndefinedError as e:
             print("Undefined variable %s.  Use --params to specify json dict" % e.message)
             exit(1)
 
     #
-    # Could use this extra param instead of the last four arguments
-    # specified below:
+    # The verify filter is rendered per device for --inventory
     #
-    # device_params={'name': 'iosxr'}
+    verify_tmpl = None
+    verify_filter = None
+    if args.verify_filter is not None:
+        verify_tmpl = named_filters.get_template(
+            '%s.tmpl' % args.verify_filter)
+        if not args.inventory:
+            try:
+                verify_filter = verify_tmpl.render(**kwargs)
+            except UndefinedError as e:
+                print("Undefined variable %s.  Use --params to specify json dict" % e.message)
+                exit(1)
+
+    if args.params_stream and (not args.do_edits or args.inventory):
+        print("--params-stream requires --do-edits on a single device")
+        sys.exit(1)
+    if CHUNKS is not None and (not args.do_edits or args.inventory):
+        print("--chunk-entries/--chunk-bytes require --do-edits on a single "
+              "device")
+        sys.exit(1)
+
+    if args.inventory:
+        if not args.do_edits:
+            print("--inventory requires --do-edits")
+            sys.exit(1)
+        from nccutil.collector import load_inventory
+        devices = load_inventory(args.inventory, defaults={
+            'port': args.port,
+            'username': args.username,
+            'password': args.password,
+            'device_type': args.device_type,
+            'timeout': args.timeout,
+            'use_libssh': args.use_libssh,
+            'wan': args.wan})
+        start_time = time.time()
+        outcome = do_transaction(
+            devices,
+            [named_templates.get_template('%s.tmpl' % t)
+             for t in args.do_edits],
+            default_op=args.default_op,
+            allow_running=args.allow_running,
+            max_devices=args.max_devices,
+            confirmed=args.confirmed,
+            confirm_timeout=args.confirm_timeout,
+            persist=args.persist,
+            verify_tmpl=verify_tmpl,
+            **kwargs)
+        if args.time:
+            print("\nTotal Operation Time = {}".format(time.time()-start_time))
+        sys.exit(0 if outcome == 'committed' else 1)
+
     #
-    def unknown_host_cb(host, fingerprint):
-        return True
+    # With --profile, split every RPC into build/send/wait/parse, and
+    # optionally run the rest under a Python profiler.
+    #
+    profiling = ExitStack()
+    if args.profile_hook:
+        from nccutil.timing import profile
+        profiling.enter_context(profile(args.profile_hook))
+    if TIMER is not None:
+        from nccutil.timing import rpc_timing
+        profiling.enter_context(rpc_timing(TIMER))
 
-    device_params = {}
-    if args.device_type is not None:
-        device_params = {'name': args.device_type}
-
-    if args.use_libssh:
-        m = manager.connect(host=args.host,
-                            port=args.port,
-                            timeout=args.timeout,
-                            username=args.username,
-                            password=args.password,
-                            allow_agent=False,
-                            hostkey_verify=False,
-                            device_params=device_params,
-                            use_libssh=args.use_libssh,
-                            unknown_host_cb=unknown_host_cb)
-    else:
-        m = manager.connect(host=args.host,
-                            port=args.port,
-                            timeout=args.timeout,
-                            username=args.username,
-                            password=args.password,
-                            allow_agent=False,
-                            look_for_keys=False,
-                            hostkey_verify=False,
-                            device_params=device_params,
-                            unknown_host_cb=unknown_host_cb)
+    with timed('connect'):
+        device = Device(args.host,
+                        port=args.port,
+                        username=args.username,
+                        password=args.password,
+                        device_type=args.device_type,
+                        timeout=args.timeout,
+                        use_libssh=args.use_libssh,
+                        wan=args.wan)
+        sock = None
+        if args.replay_cassette:
+            from nccutil.cassette import replay
+            m = replay(args.replay_cassette, speed=args.replay_speed,
+                       device_type=args.device_type, timeout=args.timeout)
+        else:
+            if TIMER is not None and not args.use_libssh:
+                # count the bytes on the wire for the report
+                from ncc.wan import WAN_PROFILE
+                from ncc.wan import open_socket
+                sock = open_socket(device.host, device.port, device.timeout,
+                                   profile=WAN_PROFILE if device.wan
+                                   else None)
+            m = connect(device, sock=sock)
+    cassette = None
+    if args.record_cassette:
+        from nccutil.cassette import CassetteRecorder
+        cassette = CassetteRecorder(m, args.record_cassette,
+                                    meta={'host': args.host,
+                                          'device_type': args.device_type})
 
     #
     # Extract the key capabilities that determine how we interact with
     # the device. This script will prefer using candidate config.
     #
-    if NC_WRITABLE_RUNNING in m.server_capabilities:
-        RUNNING = True
-    if NC_CANDIDATE in m.server_capabilities:
-        CANDIDATE = True
+    RUNNING, CANDIDATE = datastores(m)
+    if CHUNKS is not None and not CANDIDATE:
+        print("Chunked edits need candidate config")
+        exit(1)
+    if args.confirmed and args.do_edits and not CANDIDATE:
+        print("--confirmed needs candidate config")
+        exit(1)
 
     #
     # Main operations
@@ -590,6 +955,7 @@ def main():
     # TODO: get_running/get_oper are a bit samey, could be done better
     #
     results = []
+    committed = True
     start_time = 0.0
     end_time = 0.0
     if args.get_running:
@@ -601,13 +967,15 @@ def main():
                         m,
                         filter=f,
                         xpath=None,
-                        with_defaults=args.with_defaults))
+                        with_defaults=args.with_defaults,
+                        raw=args.raw))
             else:
                 results.append(get_running_config(
                     m,
                     xpath=args.xpath,
                     filter=args.filter,
-                    with_defaults=args.with_defaults))
+                    with_defaults=args.with_defaults,
+                    raw=args.raw))
             end_time = time.time()
         except UnicodeDecodeError as u:
             report_unicode_decode_error(u)
@@ -621,13 +989,15 @@ def main():
                         m,
                         filter=f,
                         xpath=None,
-                        with_defaults=args.with_defaults))
+                        with_defaults=args.with_defaults,
+                        raw=args.raw))
             else:
                 results.append(get(
                     m,
                     filter=args.filter,
                     xpath=args.xpath,
-                    with_defaults=args.with_defaults))
+                    with_defaults=args.with_defaults,
+                    raw=args.raw))
             end_time = time.time()
         except UnicodeDecodeError as u:
             report_unicode_decode_error(u)
@@ -635,12 +1005,30 @@ def main():
     elif args.do_edits:
         try:
             start_time = time.time()
-            do_templates(
-                m,
-                [named_templates.get_template('%s.tmpl' % t)
-                  for t in args.do_edits],
-                default_op=args.default_op,
-                **kwargs)
+            t_list = [named_templates.get_template('%s.tmpl' % t)
+                      for t in args.do_edits]
+            if args.params_stream:
+                committed = do_template_stream(
+                    m,
+                    t_list,
+                    args.params_stream,
+                    default_op=args.default_op,
+                    batch_size=args.batch_size,
+                    confirmed=args.confirmed,
+                    confirm_timeout=args.confirm_timeout,
+                    persist=args.persist,
+                    verify_filter=verify_filter,
+                    **kwargs)
+            else:
+                committed = do_templates(
+                    m,
+                    t_list,
+                    default_op=args.default_op,
+                    confirmed=args.confirmed,
+                    confirm_timeout=args.confirm_timeout,
+                    persist=args.persist,
+                    verify_filter=verify_filter,
+                    **kwargs)
             end_time = time.time()
         except RPCError as e:
             end_time = time.time()
@@ -663,9 +1051,13 @@ def main():
     # display any get results
     #
     if len(results) > 0:
-        for c in results:
-            if c:
-                print(etree.tostring(c.data, pretty_print=True).decode('UTF-8'))
+        with timed('output'):
+            for c in results:
+                if c and args.raw:
+                    write_data(c, sys.stdout)
+                elif c:
+                    print(etree.tostring(c.data,
+                                         pretty_print=True).decode('UTF-8'))
 
     #
     # dsplay operation time if requested
@@ -673,10 +1065,44 @@ def main():
     if args.time:
         print("\nTotal Operation Time = {}".format(end_time-start_time))
 
+    if CHUNKS is not None and CHUNKS.chunks:
+        print(CHUNKS.summary())
+        if TIMER is not None:
+            TIMER.info.update({
+                'chunk_entries': CHUNKS.sent,
+                'chunks': CHUNKS.chunks,
+                'chunk_entries_per_s': round(
+                    CHUNKS.sent / CHUNKS.seconds if CHUNKS.seconds else 0.0,
+                    1)})
+
+    if TIMER is not None and sock is not None:
+        from ncc.wan import compression
+        from ncc.wan import wire_bytes
+        sent, received = wire_bytes(m)
+        TIMER.info.update({'wire_sent_bytes': sent,
+                           'wire_received_bytes': received,
+                           'compression': compression(m)})
+
     #
     # Orderly teardown of the netconf session.
     # Ignore Value error sometimes returned in cleanup
     try:
-        m.close_session()
+        with timed('close'):
+            m.close_session()
     except ValueError:
         pass
+    if cassette:
+        cassette.close()
+
+    #
+    # display the timing breakdown if requested
+    #
+    profiling.close()
+    if args.profile:
+        TIMER.report(format=args.profile)
+
+    #
+    # a confirmed commit that was cancelled fails, as with --inventory
+    #
+    if not committed:
+        sys.exit(1)
@@ -5,20 +5,15 @@
 import sys
 from argparse import ArgumentParser
 from functools import partial
-from ncclient import manager
-from lxml import etree
-import logging
+from ncc import Device
+from ncc import NC_CANDIDATE
+from ncc import NC_NOTIF_1_1
+from ncc import connect
+from ncc import enable_logging
+from ncc import has_capability
 import time
 import os
 
-
-#
-# Capability constants
-#
-NC_WRITABLE_RUNNING = 'urn:ietf:params:netconf:capability:writable-running:1.0'
-NC_CANDIDATE = 'urn:ietf:params:netconf:capability:candidate:1.0'
-NC_NOTIF_1_1 = 'urn:ietf:params:netconf:capability:notification:1.1'
-
 #
 # simple XML template to replace periodic suscriptions via netconf
 #
@@ -271,36 +266,22 @@ def main():
     args = parser.parse_args()
 
     if args.verbose:
-        handler = logging.StreamHandler()
-        for l in ['ncclient.transport.ssh', 'ncclient.transport.session', 'ncclient.operations.rpc']:
-            logger = logging.getLogger(l)
-            logger.addHandler(handler)
-            logger.setLevel(logging.DEBUG)
+        enable_logging()
 
     #
     # Connect
     #
-    def unknown_host_cb(host, fingerprint):
-        return True
-    m =  manager.connect(host=args.host,
-                         port=args.port,
-                         username=args.username,
-                         password=args.password,
-                         allow_agent=False,
-                         look_for_keys=False,
-                         hostkey_verify=False,
-                         unknown_host_cb=unknown_host_cb)
+    m = connect(Device(args.host,
+                       port=args.port,
+                       username=args.username,
+                       password=args.password))
 
     #
-    # check we can do this; looks ugly because IOS XE advertises
-    # NC_NOTIF_1_1 with extra whitespace characters :-(
+    # check we can do this; has_capability does a substring match
+    # because IOS XE advertises NC_NOTIF_1_1 with extra whitespace
+    # characters :-(
     #
-    has_yang_push = False
-    for cap in m.server_capabilities:
-        if NC_NOTIF_1_1 in cap:
-            has_yang_push = True
-            break
-    if not has_yang_push:
+    if not has_capability(m, NC_NOTIF_1_1):
         print('NETCONF server does not have capability {}'.format(NC_NOTIF_1_1),
               file=sys.stderr)
         m.close_session()
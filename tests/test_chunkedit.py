@@ -0,0 +1,156 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+from lxml import etree
+from nccutil.chunkedit import ChunkSizer
+from nccutil.chunkedit import EntrySplitter
+from nccutil.chunkedit import edit_chunked
+
+NC = 'urn:ietf:params:xml:ns:netconf:base:1.0'
+
+ACLS = '''<config xmlns="%s" xmlns:nc="%s">
+<native xmlns="urn:x">
+  <hostname>r1</hostname>
+  <acl nc:operation="replace">
+    <name>A</name>
+    <rule><seq>10</seq></rule>
+    <rule><seq>20</seq></rule>
+    <rule><seq>30</seq></rule>
+  </acl>
+  <acl>
+    <name>B</name>
+    <rule><seq>10</seq></rule>
+    <rule><seq>20</seq></rule>
+  </acl>
+</native>
+</config>''' % (NC, NC)
+
+
+class Manager(object):
+    '''Records the edit-configs sent to it.'''
+
+    def __init__(self):
+        self.edits = []
+
+    def edit_config(self, config, format=None, target=None,
+                    default_operation=None):
+        self.edits.append((etree.fromstring(config), default_operation))
+
+
+def chunks(config, entries):
+    splitter = EntrySplitter(config)
+    result = []
+    while True:
+        chunk = splitter.next_chunk(entries)
+        if chunk is None:
+            return result
+        result.append((etree.fromstring(chunk[0]), chunk[1]))
+
+
+def rules(chunk):
+    return [(acl.findtext('{urn:x}name'), rule.findtext('{urn:x}seq'))
+            for acl in chunk.iter('{urn:x}acl')
+            for rule in acl.iter('{urn:x}rule')]
+
+
+def test_splits_innermost_entries():
+    result = chunks(ACLS, 2)
+    assert [n for _, n in result] == [2, 2, 1]
+    assert [rules(c) for c, _ in result] == [
+        [('A', '10'), ('A', '20')],
+        [('A', '30'), ('B', '10')],
+        [('B', '20')],
+    ]
+
+
+def test_keys_in_every_chunk():
+    for chunk, _ in chunks(ACLS, 2):
+        for acl in chunk.iter('{urn:x}acl'):
+            assert acl.findtext('{urn:x}name') is not None
+
+
+def test_operations_and_other_content_in_first_chunk_only():
+    result = chunks(ACLS, 2)
+    op = '{%s}operation' % NC
+    first = [acl.get(op) for acl in result[0][0].iter('{urn:x}acl')]
+    later = [acl.get(op) for c, _ in result[1:]
+             for acl in c.iter('{urn:x}acl')]
+    assert first == ['replace']
+    assert later == [None, None, None]
+    hostnames = [len(c.findall('.//{urn:x}hostname')) for c, _ in result]
+    assert hostnames == [1, 1, 1]
+
+
+def test_no_entries_sent_whole():
+    config = '<config xmlns="%s"><system><a>1</a></system></config>' % NC
+    result = chunks(config, 2)
+    assert len(result) == 1 and result[0][1] == 0
+
+
+TWO_LISTS = '''<config xmlns="%s">
+<native xmlns="urn:x">
+  <acl><name>A</name></acl>
+  <acl><name>B</name></acl>
+  <acl><name>C</name></acl>
+  <acl><name>D</name></acl>
+</native>
+<interfaces xmlns="urn:y">
+  <interface><name>e0</name></interface>
+  <interface><name>e1</name></interface>
+  <interface><name>e2</name></interface>
+  <interface><name>e3</name></interface>
+</interfaces>
+</config>''' % NC
+
+
+def test_default_replace_on_each_top_level_container_once():
+    m = Manager()
+    edit_chunked(m, TWO_LISTS, ChunkSizer(entries=3),
+                 default_operation='replace')
+    assert [op for _, op in m.edits] == ['merge', 'merge', 'merge']
+    op = '{%s}operation' % NC
+    sent = [[(c.tag, c.get(op)) for c in chunk] for chunk, _ in m.edits]
+    assert sent == [
+        [('{urn:x}native', 'replace')],
+        [('{urn:x}native', None), ('{urn:y}interfaces', 'replace')],
+        [('{urn:y}interfaces', None)],
+    ]
+
+
+def test_default_replace_keeps_explicit_operations():
+    m = Manager()
+    edit_chunked(m, ACLS, ChunkSizer(entries=2),
+                 default_operation='replace')
+    op = '{%s}operation' % NC
+    assert [chunk.find('{urn:x}native').get(op)
+            for chunk, _ in m.edits] == ['replace', None, None]
+    acls = [[acl.get(op) for acl in chunk.iter('{urn:x}acl')]
+            for chunk, _ in m.edits]
+    assert acls == [['replace'], [None, None], [None]]
+
+
+def test_default_replace_unsplit_config():
+    m = Manager()
+    config = '<config xmlns="%s"><native xmlns="urn:x"/></config>' % NC
+    edit_chunked(m, config, ChunkSizer(entries=2),
+                 default_operation='replace')
+    [(chunk, default)] = m.edits
+    assert default == 'merge'
+    assert chunk[0].get('{%s}operation' % NC) == 'replace'
+
+
+def test_other_default_operations_kept():
+    for op in ('merge', 'none', None):
+        m = Manager()
+        edit_chunked(m, ACLS, ChunkSizer(entries=2), default_operation=op)
+        assert [o for _, o in m.edits] == [op, op, op]
+
+
+def test_sizer_adapts_to_latency():
+    sizer = ChunkSizer(entries=1000, latency=1.0)
+    assert sizer.entries == 100
+    sizer.record(100, 0.1)
+    assert sizer.entries == 200
+    sizer.record(200, 10.0)
+    assert sizer.entries < 200
+    assert sizer.chunks == 2 and sizer.sent == 300
@@ -0,0 +1,102 @@
+#
+# Copyright (c) 2026 Cisco and/or its affiliates
+#
+from lxml import etree
+from nccutil.delta import DeltaTracker
+from nccutil.delta import build_index
+from nccutil.delta import diff
+
+
+def index(xml):
+    return build_index(etree.fromstring(xml))
+
+
+def test_unchanged():
+    xml = ('<data><interface><name>Gi1</name><mtu>1500</mtu></interface>'
+           '</data>')
+    assert diff(index(xml), index(xml)) == []
+
+
+def test_changed_leaf():
+    old = index('<data><interface><name>Gi1</name><mtu>1500</mtu>'
+                '</interface></data>')
+    new = index('<data><interface><name>Gi1</name><mtu>9000</mtu>'
+                '</interface></data>')
+    assert diff(old, new) == [('~', '/interface[name=Gi1]/mtu', '9000')]
+
+
+def test_leaf_list_changed():
+    old = index('<data><vlan><allowed>10</allowed><allowed>20</allowed>'
+                '<allowed>30</allowed></vlan></data>')
+    new = index('<data><vlan><allowed>10</allowed><allowed>99</allowed>'
+                '<allowed>30</allowed></vlan></data>')
+    assert diff(old, new) == [('+', '/vlan/allowed', '99'),
+                              ('-', '/vlan/allowed', '20')]
+
+
+def test_leaf_list_grows_from_one_value():
+    old = index('<data><vlan><allowed>10</allowed></vlan></data>')
+    new = index('<data><vlan><allowed>10</allowed><allowed>20</allowed>'
+                '</vlan></data>')
+    assert diff(old, new) == [('+', '/vlan/allowed', '20')]
+
+
+def test_leaf_list_reordered():
+    old = index('<data><vlan><allowed>10</allowed><allowed>20</allowed>'
+                '</vlan></data>')
+    new = index('<data><vlan><allowed>20</allowed><allowed>10</allowed>'
+                '</vlan></data>')
+    assert diff(old, new) == []
+
+
+def test_keyed_list_reordered():
+    old = index('<data><interface><name>Gi1</name><mtu>1500</mtu>'
+                '</interface><interface><name>Gi2</name><mtu>9000</mtu>'
+                '</interface></data>')
+    new = index('<data><interface><name>Gi2</name><mtu>9000</mtu>'
+                '</interface><interface><name>Gi1</name><mtu>1500</mtu>'
+                '</interface></data>')
+    assert diff(old, new) == []
+
+
+def test_keyless_list():
+    old = index('<data><route><prefix>10.0.0.0/8</prefix></route>'
+                '<route><prefix>172.16.0.0/12</prefix></route></data>')
+    new = index('<data><route><prefix>10.0.0.0/8</prefix></route>'
+                '<route><prefix>192.168.0.0/16</prefix></route></data>')
+    assert diff(old, new) == [('~', '/route[2]/prefix', '192.168.0.0/16')]
+
+
+def test_keyless_list_reordered_by_position():
+    old = index('<data><route><prefix>a</prefix></route>'
+                '<route><prefix>b</prefix></route></data>')
+    new = index('<data><route><prefix>b</prefix></route>'
+                '<route><prefix>a</prefix></route></data>')
+    assert sorted(diff(old, new)) == [('~', '/route/prefix', 'b'),
+                                      ('~', '/route[2]/prefix', 'a')]
+
+
+def test_removed_entry():
+    old = index('<data><interface><name>Gi1</name></interface>'
+                '<interface><name>Gi2</name></interface></data>')
+    new = index('<data><interface><name>Gi1</name></interface></data>')
+    assert diff(old, new) == [('-', '/interface[name=Gi2]/name', 'Gi2')]
+
+
+def test_tracker_reports_everything_first():
+    tracker = DeltaTracker()
+    ele = etree.fromstring('<data><a><b>1</b></a></data>')
+    assert tracker.update(ele) == [('+', '/a/b', '1')]
+    assert tracker.update(ele) == []
+
+
+def test_entries_sharing_a_key_value():
+    xml = ('<data><cpu-usage-process><name>Chunk Manager</name>'
+           '<pid>1</pid><five-seconds>%d</five-seconds></cpu-usage-process>'
+           '<cpu-usage-process><name>Chunk Manager</name><pid>2</pid>'
+           '<five-seconds>0</five-seconds></cpu-usage-process></data>')
+    assert diff(index(xml % 0), index(xml % 7)) == [
+        ('~', '/cpu-usage-process[name=Chunk Manager]/five-seconds', '7')]
+    changes = diff(None, index(xml % 0))
+    assert ('+', '/cpu-usage-process[name=Chunk Manager][2]/pid',
+            '2') in changes